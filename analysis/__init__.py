@@ -0,0 +1,3 @@
+"""
+밸런스 분석용 오프라인 스크립트 모음 (저장소 루트에서 python -m analysis.<모듈> 로 실행)
+"""
@@ -0,0 +1,234 @@
+"""
+전투 엔진 벤치마크
+고정 시드 시나리오로 Battle 처리 속도(전투/초)와 메모리 할당을 측정하고 기준 JSON과 비교합니다.
+밸런스 패치 배포 전에 전투 코어 성능 회귀를 잡기 위한 스크립트입니다.
+기기마다 속도가 다르므로 시나리오를 반복 측정할 때마다 엔진과 무관한 고정 작업(calibrate)도 바로 앞에서
+측정해 두고, 기준을 기록한 기기와의 속도 비율만큼 기준 전투/초를 보정한 뒤 비교합니다.
+
+    python -m analysis.battle_bench                   # 측정 + 기준과 비교 (회귀 시 종료 코드 1)
+    python -m analysis.battle_bench --save-baseline   # 현재 결과를 기준으로 저장
+    python -m analysis.battle_bench --only mystic --repeat 5
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from battle_engine import Battle, ENGINE_VERSION, get_skill_master
+from stage_table import StageEnemyTable, battle_only_instance
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "battle_bench_baseline.json")
+# 기기 속도 측정용 고정 작업 반복 수
+CALIBRATION_STEPS = 100000
+
+# 시나리오 = (플레이어, 적, 시드) 목록을 만드는 함수
+Workload = List[Tuple[Dict, Dict, int]]
+
+
+def _instance(name: str, hp: int, atk: int, ms: int, skills: Tuple[Optional[str], ...] = ()) -> Dict:
+    """벤치마크용 최소 개체 dict (Battle이 읽는 필드만)"""
+    instance = {"name": name, "stats": {"hp": hp, "atk": atk, "ms": ms}}
+    for slot in range(1, 4):
+        skill_id = skills[slot - 1] if slot <= len(skills) else None
+        instance[f"accessory_{slot}"] = {"id": skill_id} if skill_id else None
+    return instance
+
+
+def _skills_of_grade(grade: str, index: int) -> Tuple[Optional[str], ...]:
+    """슬롯별 해당 등급 스킬 (ID 정렬 기준 index번째, 없으면 None)"""
+    skills = get_skill_master()
+    picked = []
+    for slot in range(1, 4):
+        candidates = sorted(k for k, v in skills.items() if v["grade"] == grade and v["slot"] == slot)
+        picked.append(candidates[index % len(candidates)] if candidates else None)
+    return tuple(picked)
+
+
+def workload_stat_only(n: int = 1000) -> Workload:
+    """스킬 없는 비슷한 전투력 전투"""
+    player = _instance("P", 2000, 120, 60)
+    enemy = _instance("E", 2100, 110, 55)
+    return [(player, enemy, seed) for seed in range(n)]
+
+
+def workload_mystic(n: int = 1000) -> Workload:
+    """양쪽 모두 Mystic 스킬 3개 (시간 초과 없이 평균 25턴 안팎에 끝나는 공격력)"""
+    player = _instance("P", 2000, 200, 60, _skills_of_grade("Mystic", 0))
+    enemy = _instance("E", 2100, 190, 55, _skills_of_grade("Mystic", 1))
+    return [(player, enemy, seed) for seed in range(n)]
+
+
+def workload_stalemate(n: int = 300) -> Workload:
+    """서로 거의 못 깎아 최대 턴(시간 초과)까지 가는 전투"""
+    player = _instance("P", 10 ** 7, 1, 50, _skills_of_grade("Normal", 0))
+    enemy = _instance("E", 10 ** 7, 1, 50, _skills_of_grade("Normal", 1))
+    return [(player, enemy, seed) for seed in range(n)]
+
+
+def workload_ms_gap(n: int = 1000) -> Workload:
+    """MS 차이가 큰 전투 (느린 쪽 게이지가 오래 빈 틱으로 진행)"""
+    player = _instance("P", 3000, 60, 2000, _skills_of_grade("Rare", 0))
+    enemy = _instance("E", 20000, 400, 3, _skills_of_grade("Rare", 1))
+    return [(player, enemy, seed) for seed in range(n)]
+
+
+def workload_stage_sweep(n: int = 10000, stages: int = 100) -> Workload:
+    """한 개체로 스테이지 1~stages 보스를 고르게 상대하는 밸런스 스윕"""
+    table = StageEnemyTable(get_skill_master(), battle_only_instance)
+    player = _instance("P", 5000, 200, 120, _skills_of_grade("Epic", 0))
+    return [(player, table.get(i % stages + 1), i) for i in range(n)]
+
+
+WORKLOADS: Dict[str, Callable[[], Workload]] = {
+    "stat_only": workload_stat_only,
+    "mystic": workload_mystic,
+    "stalemate": workload_stalemate,
+    "ms_gap": workload_ms_gap,
+    "stage_sweep": workload_stage_sweep
+}
+
+
+def _run(workload: Workload) -> Iterator[Battle]:
+    for player, enemy, seed in workload:
+        battle = Battle(player, enemy, headless=True, seed=seed)
+        battle.run_battle()
+        yield battle
+
+
+def calibrate() -> float:
+    """기기 속도 기준값 - 엔진과 무관한 고정 순수 Python 작업의 소요 시간 (초)
+
+    전투 코어와 비슷하게 난수/dict 접근/정수 연산을 반복한다. 엔진 코드를 바꿔도 값이 변하지 않으므로
+    기준 기록 시점과의 비율이 곧 기기(또는 Python) 속도 차이다.
+    """
+    rng = random.Random(0)
+    state = {"hp": 10 ** 6, "total": 0}
+    start = time.perf_counter()
+    for _ in range(CALIBRATION_STEPS):
+        state["hp"] = max(0, state["hp"] - max(1, int(100 * rng.uniform(0.8, 1.2)))) or 10 ** 6
+        state["total"] += state["hp"]
+    return time.perf_counter() - start
+
+
+def run_workload(workload: Workload, repeat: int = 3, alloc_sample: int = 200) -> Dict:
+    """시나리오 1개 측정 (시간은 repeat회 중 최솟값, 메모리는 앞쪽 alloc_sample회만 tracemalloc으로 별도 측정)
+
+    Returns:
+        {"fights", "fights_per_sec", "us_per_fight", "peak_kib_per_fight", "calibration_ms", "checksum"}
+        calibration_ms는 반복마다 바로 앞에서 잰 calibrate()의 최솟값 (기기 속도 보정용)
+        peak_kib_per_fight는 전투 1회 동안 늘어난 메모리 최대치의 평균 (일시 할당량 근사),
+        checksum은 (플레이어 승리 수, 총 턴 수) - 같은 엔진이면 항상 같은 값
+    """
+    best = float("inf")
+    calibration = float("inf")
+    checksum = None
+    for _ in range(max(1, repeat)):
+        calibration = min(calibration, calibrate())
+        wins = turns = 0
+        start = time.perf_counter()
+        for battle in _run(workload):
+            wins += battle.winner == "player"
+            turns += battle.turn
+        best = min(best, time.perf_counter() - start)
+        checksum = [wins, turns]
+
+    # 계측 오버헤드가 커서 시간 측정과 분리
+    sample = workload[:alloc_sample]
+    peak_total = 0
+    tracemalloc.start()
+    try:
+        for player, enemy, seed in sample:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            Battle(player, enemy, headless=True, seed=seed).run_battle()
+            _, peak = tracemalloc.get_traced_memory()
+            peak_total += peak - base
+    finally:
+        tracemalloc.stop()
+
+    fights = len(workload)
+    return {
+        "fights": fights,
+        "fights_per_sec": round(fights / best, 1) if best > 0 else None,
+        "us_per_fight": round(best / fights * 1e6, 2) if fights else None,
+        "peak_kib_per_fight": round(peak_total / 1024 / len(sample), 2) if sample else None,
+        "calibration_ms": round(calibration * 1000, 2),
+        "checksum": checksum
+    }
+
+
+def compare_to_baseline(results: Dict[str, Dict], baseline: Dict[str, Dict],
+                        tolerance: float) -> List[str]:
+    """기준 대비 회귀 목록 (속도가 tolerance 이상 느려졌거나 checksum이 바뀐 시나리오)
+
+    양쪽에 calibration_ms가 있으면 기준 전투/초에 (기준 calibration / 현재 calibration)을 곱해
+    기기 속도 차이를 보정한 뒤 비교한다.
+    """
+    problems = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if base.get("checksum") != result["checksum"]:
+            problems.append(f"{name}: 결과 checksum 변경 {base.get('checksum')} → {result['checksum']} "
+                            f"(전투 규칙 변경이면 --save-baseline으로 갱신)")
+        base_speed = base.get("fights_per_sec")
+        if base_speed and base.get("calibration_ms") and result.get("calibration_ms"):
+            base_speed *= base["calibration_ms"] / result["calibration_ms"]
+        if base_speed and result["fights_per_sec"] < base_speed * (1 - tolerance):
+            problems.append(f"{name}: {base_speed:,.0f} → {result['fights_per_sec']:,.0f} 전투/초 "
+                            f"({(result['fights_per_sec'] / base_speed - 1) * 100:+.1f}%)")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="전투 엔진 고정 시나리오 벤치마크")
+    parser.add_argument("--only", nargs="*", choices=sorted(WORKLOADS), help="실행할 시나리오 (기본: 전체)")
+    parser.add_argument("--repeat", type=int, default=3, help="시간 측정 반복 횟수 (최솟값 사용)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="기준 JSON 경로")
+    parser.add_argument("--save-baseline", action="store_true", help="현재 결과를 기준 JSON으로 저장")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 속도 저하 비율 (기본 20%%)")
+    args = parser.parse_args(argv)
+
+    calibrate()  # 첫 호출은 워밍업이라 느리므로 버림
+    results = {}
+    for name in args.only or WORKLOADS:
+        result = run_workload(WORKLOADS[name](), repeat=args.repeat)
+        results[name] = result
+        print(f"{name:<12} {result['fights']:>6}회  {result['fights_per_sec']:>10,.0f} 전투/초  "
+              f"{result['us_per_fight']:>8.1f}µs/전투  메모리 피크 {result['peak_kib_per_fight']:.1f}KiB/전투  "
+              f"기기 기준 {result['calibration_ms']:.1f}ms")
+
+    if args.save_baseline:
+        # --only로 일부만 돌렸으면 나머지 시나리오 기준은 유지
+        saved = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                saved = json.load(f).get("results", {})
+        saved.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"engine_version": ENGINE_VERSION, "python": sys.version.split()[0], "results": saved},
+                      f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"✅ 기준 저장: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("ℹ️ 기준 JSON이 없습니다 (--save-baseline으로 생성)")
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    problems = compare_to_baseline(results, baseline.get("results", {}), args.tolerance)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if not problems:
+        print(f"✅ 기준 대비 회귀 없음 (허용 {args.tolerance*100:.0f}%)")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
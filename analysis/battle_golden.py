@@ -0,0 +1,210 @@
+"""
+전투 결정성 회귀 코퍼스
+현재 엔진으로 (개체, 스테이지, 시드) → (승자, 턴 수, 최종 HP, 이벤트 스트림)을 기록해 두고,
+Battle을 최적화한 뒤 같은 결과가 나오는지 빠르게 검증합니다.
+기록은 실제 전투 화면과 같은 1틱 단위 진행(run_timeline)으로 만들고, 검증은 run_battle(빈 틱 건너뛰기,
+일반/헤드리스)과 run_timeline을 모두 돌려 비교합니다.
+
+    python -m analysis.battle_golden record   # 코퍼스 생성 (전투 규칙을 의도적으로 바꿨을 때만)
+    python -m analysis.battle_golden verify   # 검증 (불일치 시 종료 코드 1)
+"""
+import argparse
+import contextlib
+import gzip
+import io
+import json
+import os
+import random
+import sys
+from typing import Dict, List, Optional
+
+from battle_engine import (Battle, ENGINE_VERSION, battle_genotype, get_skill_master, get_skill_master_digest,
+                           set_skill_master)
+from stage_table import StageEnemyTable, battle_only_instance, stage_curve
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "battle_golden.json.gz")
+DEFAULT_CASES = 400
+# 보스 스킬 개수 구간(0~3개)을 모두 포함하는 스테이지 범위
+MAX_STAGE = 120
+# 예전에 빈 틱 건너뛰기와 1틱 진행 결과가 갈렸던 케이스 (generate_cases 시드, 번호)
+# 반사 데미지로 양쪽이 함께 쓰러진 뒤 한쪽만 부활하는 전투 - 스킬 데이터가 바뀌면 다시 찾아 갱신
+REGRESSION_CASES = [(7, 568), (12345, 3088), (12345, 12939)]
+# 레거시 스키마 변환 확인용 가상 스킬 (data/skills.json에는 레거시 스킬이 없음)
+# heal_dodge의 회피 부여 확률 판정이 예전 변환(사용 시점 random 1회)과 같은 순서로 난수를 쓰는지 고정
+LEGACY_SKILLS = {
+    "golden_legacy_heal_dodge": {"name": "Legacy Heal Dodge", "grade": "Rare", "slot": 1, "cooldown": 2,
+                                 "effect": "heal_dodge", "value": 0.2, "block_chance": 0.5},
+    "golden_legacy_strike": {"name": "Legacy Strike", "grade": "Rare", "slot": 2, "cooldown": 1,
+                             "effects": [{"type": "damage", "value": 1.5}]}
+}
+LEGACY_CASES = 40
+
+
+def generate_cases(n_cases: int = DEFAULT_CASES, seed: int = 20260101) -> List[Dict]:
+    """코퍼스 입력 생성 (스테이지 보스 전투력 근처의 랜덤 개체 + 랜덤 스킬)"""
+    rng = random.Random(seed)
+    skills = get_skill_master()
+    by_slot = {slot: sorted(k for k, v in skills.items() if v["slot"] == slot) for slot in (1, 2, 3)}
+    bosses = StageEnemyTable(skills, battle_only_instance)
+
+    cases = []
+    for index in range(n_cases):
+        stage = index % MAX_STAGE + 1
+        boss_stats = stage_curve(stage)["boss_stats"]
+        player = {
+            "name": f"Golden {index}",
+            "stats": {stat: max(1, int(boss_stats[stat] * rng.uniform(0.7, 1.4))) for stat in ("hp", "atk", "ms")}
+        }
+        for slot in (1, 2, 3):
+            player[f"accessory_{slot}"] = {"id": rng.choice(by_slot[slot])} if rng.random() < 0.7 else None
+        cases.append({
+            "player": player,
+            "enemy": battle_genotype(bosses.get(stage)),
+            "stage": stage,
+            "seed": rng.getrandbits(63)
+        })
+    return cases
+
+
+def regression_cases() -> List[Dict]:
+    """REGRESSION_CASES 입력"""
+    cases = []
+    for seed, index in REGRESSION_CASES:
+        case = generate_cases(index + 1, seed=seed)[index]
+        case["player"]["name"] = f"Regression {seed}-{index}"
+        cases.append(case)
+    return cases
+
+
+def legacy_cases(n_cases: int = LEGACY_CASES, seed: int = 20260102) -> List[Dict]:
+    """LEGACY_SKILLS를 쓰는 케이스 입력 (플레이어 heal_dodge + 공격, 적은 공격만)"""
+    rng = random.Random(seed)
+    cases = []
+    for index in range(n_cases):
+        def combatant(name: str, heal_dodge: bool) -> Dict:
+            return {"name": name,
+                    "stats": {"hp": rng.randint(100, 300), "atk": rng.randint(5, 30), "ms": rng.randint(10, 150)},
+                    "accessory_1": {"id": "golden_legacy_heal_dodge"} if heal_dodge else None,
+                    "accessory_2": {"id": "golden_legacy_strike"},
+                    "accessory_3": None}
+        cases.append({"player": combatant(f"Legacy {index}", True), "enemy": combatant("Legacy Enemy", False),
+                      "stage": "legacy", "seed": rng.getrandbits(63)})
+    return cases
+
+
+@contextlib.contextmanager
+def legacy_skill_master():
+    """LEGACY_SKILLS를 추가한 스킬 마스터로 잠시 교체 (끝나면 원래 마스터로 복원)"""
+    original = get_skill_master()
+    set_skill_master({**original, **LEGACY_SKILLS})
+    try:
+        yield
+    finally:
+        set_skill_master(original)
+
+
+def run_case(case: Dict, headless: bool = False, timeline: bool = False) -> Dict:
+    """케이스 1개 실행 → 기록 형식 결과 (이벤트는 JSON 왕복과 같은 리스트 형태)
+
+    timeline=True면 전투 화면처럼 run_timeline으로 1틱씩 진행한다 (headless 무시).
+    """
+    battle = Battle(case["player"], case["enemy"], headless=headless and not timeline, seed=case["seed"])
+    if timeline:
+        battle.run_timeline()
+    else:
+        battle.run_battle()
+    return {
+        "winner": battle.winner,
+        "turns": battle.turn,
+        "player_hp": battle.player.current_hp,
+        "enemy_hp": battle.enemy.current_hp,
+        "events": json.loads(json.dumps(battle.events, ensure_ascii=False))
+    }
+
+
+def record(path: str, n_cases: int = DEFAULT_CASES) -> Dict:
+    """현재 엔진 결과로 코퍼스 저장 (기대값은 1틱 단위 진행 결과)"""
+    cases = generate_cases(n_cases) + regression_cases()
+    for case in cases:
+        case["expected"] = run_case(case, timeline=True)
+    digest = get_skill_master_digest()
+    legacy = legacy_cases()
+    with legacy_skill_master():
+        for case in legacy:
+            case["expected"] = run_case(case, timeline=True)
+    corpus = {"engine_version": ENGINE_VERSION, "skill_master": digest, "cases": cases, "legacy_cases": legacy}
+    # mtime=0: 같은 결과면 같은 파일 바이트 (불필요한 git diff 방지)
+    with gzip.GzipFile(path, "wb", mtime=0) as raw, io.TextIOWrapper(raw, encoding="utf-8") as f:
+        json.dump(corpus, f, ensure_ascii=False, separators=(",", ":"))
+    return corpus
+
+
+def verify(path: str, max_reports: int = 10) -> List[str]:
+    """코퍼스 재실행 후 불일치 목록 반환
+
+    run_battle 일반 모드와 run_timeline은 전체 결과, run_battle 헤드리스 모드는 이벤트 외 결과를 비교한다.
+    레거시 케이스는 LEGACY_SKILLS를 추가한 스킬 마스터로 실행한다.
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    problems = []
+    # 코퍼스와 스킬 데이터가 같은지 확인
+    if corpus.get("skill_master") != get_skill_master_digest():
+        problems.append("스킬 마스터가 코퍼스 기록 시점과 다릅니다 (data/skills.json 변경 시 record로 재생성)")
+
+    _compare_cases(corpus["cases"], "case", problems, max_reports)
+    if len(problems) < max_reports:
+        with legacy_skill_master():
+            _compare_cases(corpus.get("legacy_cases", []), "legacy case", problems, max_reports)
+    return problems
+
+
+def _compare_cases(cases: List[Dict], label: str, problems: List[str], max_reports: int):
+    """케이스를 세 가지 방식으로 실행해 기록과 다른 점을 problems에 추가 (max_reports개까지)"""
+    for index, case in enumerate(cases):
+        expected = case["expected"]
+        for mode in ("full", "headless", "timeline"):
+            actual = run_case(case, headless=mode == "headless", timeline=mode == "timeline")
+            keys = ("winner", "turns", "player_hp", "enemy_hp") if mode == "headless" else tuple(expected)
+            diff = [key for key in keys if actual[key] != expected[key]]
+            if not diff:
+                continue
+            detail = ", ".join(f"{key} {expected[key]!r} → {actual[key]!r}" for key in diff if key != "events")
+            if "events" in diff:
+                first = next((i for i, (a, b) in enumerate(zip(actual["events"], expected["events"])) if a != b),
+                             min(len(actual["events"]), len(expected["events"])))
+                got = actual["events"][first] if first < len(actual["events"]) else None
+                want = expected["events"][first] if first < len(expected["events"]) else None
+                detail = (detail + "; " if detail else "") + f"이벤트 #{first}: {want} → {got}"
+            problems.append(f"{label} {index} (stage {case['stage']}, seed {case['seed']}, {mode}): {detail}")
+            if len(problems) >= max_reports:
+                return
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="전투 결정성 회귀 코퍼스 기록/검증")
+    parser.add_argument("command", choices=["record", "verify"])
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="코퍼스 경로 (.json.gz)")
+    parser.add_argument("--cases", type=int, default=DEFAULT_CASES, help="record 시 케이스 수")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        corpus = record(args.corpus, args.cases)
+        cases = corpus["cases"] + corpus["legacy_cases"]
+        events = sum(len(case["expected"]["events"]) for case in cases)
+        print(f"✅ {len(corpus['cases'])}개 케이스 + 레거시 {len(corpus['legacy_cases'])}개, "
+              f"이벤트 {events:,}개 → {args.corpus}")
+        return 0
+
+    problems = verify(args.corpus)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        return 1
+    print("✅ 코퍼스와 결과 일치")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
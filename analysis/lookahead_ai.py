@@ -0,0 +1,91 @@
+"""
+탐색형 보스 AI 효과/비용 측정
+스테이지 보스를 기본 AI(Battle)와 탐색형 AI(LookaheadBattle)로 같은 플레이어/시드에 대해 싸워 보고
+플레이어 승률 변화와 전투당 시간, 결정당 탐색 시간을 비교합니다.
+
+    python -m analysis.lookahead_ai                          # 스테이지 100/150/200, 보스 전투력 빌드
+    python -m analysis.lookahead_ai --stages 120 --fights 500 --depth 6 --budget-ms 3
+"""
+import argparse
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+from battle_ai import DEFAULT_DEPTH, DEFAULT_SAMPLES, DEFAULT_TIME_BUDGET, LookaheadBattle, TranspositionTable
+from battle_engine import Battle, get_skill_master
+from stage_table import StageEnemyTable, battle_only_instance, reward_stats_for_power, stage_curve
+
+
+def sample_players(stage: int, n: int, seed: int = 0) -> List[Dict]:
+    """보스와 같은 전투력 예산의 랜덤 스킬 플레이어 n명"""
+    skills = get_skill_master()
+    by_slot = {slot: sorted(k for k, v in skills.items() if v["slot"] == slot) for slot in (1, 2, 3)}
+    stats = reward_stats_for_power(stage_curve(stage)["boss_power"])
+    rng = random.Random(seed * 1000003 + stage)
+    players = []
+    for index in range(n):
+        player = {"name": f"P{index}", "stats": dict(stats)}
+        for slot in (1, 2, 3):
+            player[f"accessory_{slot}"] = {"id": rng.choice(by_slot[slot])}
+        players.append(player)
+    return players
+
+
+def compare_stage(boss: Dict, players: List[Dict], depth: int, samples: int, time_budget: float) -> Dict:
+    """같은 (플레이어, 시드)로 기본 AI / 탐색형 AI 보스 전투 비교"""
+    table = TranspositionTable()
+    base_wins = ai_wins = 0
+    base_time = ai_time = 0.0
+    totals = {"decisions": 0, "actions_simulated": 0, "table_hits": 0, "budget_exceeded": 0, "search_time": 0.0}
+    for seed, player in enumerate(players):
+        start = time.perf_counter()
+        battle = Battle(player, boss, headless=True, seed=seed)
+        battle.run_battle()
+        base_time += time.perf_counter() - start
+        base_wins += battle.winner == "player"
+
+        start = time.perf_counter()
+        battle = LookaheadBattle(player, boss, headless=True, seed=seed, depth=depth, samples=samples,
+                                 time_budget=time_budget, table=table)
+        battle.run_battle()
+        ai_time += time.perf_counter() - start
+        ai_wins += battle.winner == "player"
+        for key in totals:
+            totals[key] += battle.ai_stats[key]
+
+    n = len(players)
+    return {
+        "fights": n,
+        "base_win_rate": base_wins / n,
+        "ai_win_rate": ai_wins / n,
+        "base_us_per_fight": base_time / n * 1e6,
+        "ai_us_per_fight": ai_time / n * 1e6,
+        "us_per_decision": totals["search_time"] / max(1, totals["decisions"]) * 1e6,
+        **totals
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="탐색형 보스 AI 효과/비용 측정")
+    parser.add_argument("--stages", type=int, nargs="+", default=[100, 150, 200])
+    parser.add_argument("--fights", type=int, default=300, help="스테이지당 전투 수")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH)
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_TIME_BUDGET * 1000, help="결정당 시간 상한 (ms)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    bosses = StageEnemyTable(get_skill_master(), battle_only_instance)
+    for stage in args.stages:
+        result = compare_stage(bosses.get(stage), sample_players(stage, args.fights, args.seed),
+                               args.depth, args.samples, args.budget_ms / 1000)
+        print(f"Stage {stage:>4}: 플레이어 승률 {result['base_win_rate']*100:5.1f}% → {result['ai_win_rate']*100:5.1f}%  "
+              f"전투당 {result['base_us_per_fight']:,.0f}µs → {result['ai_us_per_fight']:,.0f}µs  "
+              f"결정 {result['decisions']:,}회 (평균 {result['us_per_decision']:,.0f}µs, "
+              f"치환표 적중 {result['table_hits']:,}, 시간 초과 {result['budget_exceeded']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+"""
+오프라인 PvP 래더
+모든 유저의 대표 유닛끼리 시뮬레이션 전투로 리그전(인원이 많으면 스위스 방식)을 치르고
+Elo 레이팅을 pvp_ladder 테이블(또는 로컬 JSON)에 저장합니다. 랭킹 화면은 저장된 결과만 읽습니다.
+
+    python -m analysis.pvp_ladder                        # Supabase 대표 유닛 → Supabase pvp_ladder
+    python -m analysis.pvp_ladder --source local --out saves/pvp_ladder.json
+    python -m analysis.pvp_ladder --dry-run              # 결과만 출력
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from battle_engine import battle_genotype, get_skill_master, set_skill_master, simulate_battle
+from stage_table import power_score
+
+INITIAL_RATING = 1500.0
+ELO_K = 32.0
+# 이 인원까지는 전원 리그전, 초과하면 스위스 방식
+ROUND_ROBIN_LIMIT = 64
+
+
+def collect_representatives(user_rows: List[Dict]) -> List[Dict]:
+    """[{"username", "data": 게임 데이터}] → [{"username", "instance"}]
+
+    streamlit_app.get_all_users_representatives와 같은 규칙 (representative_id로 지정한 개체, 스탯 필수)
+    """
+    representatives = []
+    for row in user_rows:
+        username = row.get("username")
+        game_data = row.get("data")
+        if not username or not game_data:
+            continue
+        rep_id = game_data.get("representative_id")
+        if not rep_id:
+            continue
+        rep_inst = next((inst for inst in game_data.get("instances", []) if inst.get("id") == rep_id), None)
+        if rep_inst and rep_inst.get("stats"):
+            representatives.append({"username": username, "instance": rep_inst})
+    return representatives
+
+
+def load_local_user_rows(saves_dir: str = "saves") -> List[Dict]:
+    """로컬 saves/*_data.json → [{"username", "data"}]"""
+    rows = []
+    if not os.path.isdir(saves_dir):
+        return rows
+    for filename in sorted(os.listdir(saves_dir)):
+        if filename.endswith("_data.json"):
+            try:
+                with open(os.path.join(saves_dir, filename), "r", encoding="utf-8") as f:
+                    rows.append({"username": filename.replace("_data.json", ""), "data": json.load(f)})
+            except Exception as e:
+                print(f"⚠️ {filename} 로드 실패: {e}")
+    return rows
+
+
+def expected_score(rating: float, opponent_rating: float) -> float:
+    return 1 / (1 + 10 ** ((opponent_rating - rating) / 400))
+
+
+def run_match(a: Dict, b: Dict, n_fights: int, seed: int) -> Tuple[int, int, int]:
+    """a vs b 시뮬레이션 n_fights회 (진영 교대) → (a 승, b 승, 무승부)"""
+    rng = random.Random(seed)
+    a_wins = b_wins = draws = 0
+    for index in range(n_fights):
+        a_is_player = index % 2 == 0
+        first, second = (a, b) if a_is_player else (b, a)
+        winner = simulate_battle(first, second, seed=rng.getrandbits(63))["winner"]
+        if winner == "player":
+            a_wins += a_is_player
+            b_wins += not a_is_player
+        elif winner == "enemy":
+            a_wins += not a_is_player
+            b_wins += a_is_player
+        else:
+            draws += 1
+    return a_wins, b_wins, draws
+
+
+def _run_match_task(task: tuple) -> Tuple[int, int, int]:
+    return run_match(*task)
+
+
+def round_robin_rounds(n: int) -> List[List[Tuple[int, int]]]:
+    """서클 방식 리그전 대진 (라운드마다 모두 최대 1경기, 홀수면 1명 휴식)"""
+    players = list(range(n)) + ([None] if n % 2 else [])
+    rounds = []
+    for _ in range(len(players) - 1):
+        half = len(players) // 2
+        pairs = [(players[i], players[-1 - i]) for i in range(half)]
+        rounds.append([(a, b) for a, b in pairs if a is not None and b is not None])
+        players = [players[0]] + [players[-1]] + players[1:-1]
+    return rounds
+
+
+def swiss_pairs(ratings: List[float], played: set) -> List[Tuple[int, int]]:
+    """스위스 대진 (레이팅 순으로 가까운 상대와, 이미 만난 상대는 가능하면 피함, 홀수면 최하위 휴식)"""
+    order = sorted(range(len(ratings)), key=lambda i: -ratings[i])
+    if len(order) % 2:
+        order.pop()
+    pairs = []
+    while order:
+        a = order.pop(0)
+        partner = next((b for b in order if (min(a, b), max(a, b)) not in played), order[0])
+        order.remove(partner)
+        pairs.append((a, partner))
+    return pairs
+
+
+def run_ladder(representatives: List[Dict], fights_per_match: int = 20, rounds: Optional[int] = None,
+               seed: int = 0, workers: Optional[int] = None) -> List[Dict]:
+    """래더 진행 → 레이팅 내림차순 결과 행 목록
+
+    라운드 안의 경기는 병렬로 시뮬레이션하고, 라운드가 끝날 때마다 결과를 순서대로 Elo에 반영한다.
+    경기 점수는 전투 승률(무승부 0.5)이므로 압도적인 차이일수록 레이팅이 크게 움직인다.
+    """
+    n = len(representatives)
+    genotypes = [battle_genotype(rep["instance"]) for rep in representatives]
+    ratings = [INITIAL_RATING] * n
+    records = [[0, 0, 0, 0] for _ in range(n)]  # 경기 수, 승, 패, 무 (전투 단위)
+    played = set()
+
+    use_round_robin = n <= ROUND_ROBIN_LIMIT
+    schedule = round_robin_rounds(n) if use_round_robin else None
+    if rounds is None:
+        rounds = len(schedule) if use_round_robin else math.ceil(math.log2(max(n, 2))) + 2
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=set_skill_master,
+                                   initargs=(get_skill_master(),))
+    try:
+        for round_index in range(rounds):
+            if use_round_robin:
+                pairs = schedule[round_index % len(schedule)]
+            else:
+                pairs = swiss_pairs(ratings, played)
+            # 경기별 고정 시드 (워커 수와 무관하게 같은 결과)
+            tasks = [(genotypes[a], genotypes[b], fights_per_match,
+                      (seed * 1000003 + round_index * 7919
+                       + zlib.crc32(f"{representatives[a]['username']}|{representatives[b]['username']}".encode())))
+                     for a, b in pairs]
+            if pool is None:
+                results = [_run_match_task(task) for task in tasks]
+            else:
+                results = list(pool.map(_run_match_task, tasks))
+
+            for (a, b), (a_wins, b_wins, draws) in zip(pairs, results):
+                total = a_wins + b_wins + draws
+                score = (a_wins + draws * 0.5) / total if total else 0.5
+                delta = ELO_K * (score - expected_score(ratings[a], ratings[b]))
+                ratings[a] += delta
+                ratings[b] -= delta
+                played.add((min(a, b), max(a, b)))
+                for index, wins, losses in ((a, a_wins, b_wins), (b, b_wins, a_wins)):
+                    records[index][0] += 1
+                    records[index][1] += wins
+                    records[index][2] += losses
+                    records[index][3] += draws
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    order = sorted(range(n), key=lambda i: (-ratings[i], representatives[i]["username"]))
+    rows = []
+    for rank, index in enumerate(order, start=1):
+        instance = representatives[index]["instance"]
+        matches, wins, losses, draws = records[index]
+        rows.append({
+            "username": representatives[index]["username"],
+            "instance_id": instance.get("id"),
+            "instance_name": instance.get("name"),
+            "rating": round(ratings[index], 1),
+            "rank": rank,
+            "matches": matches,
+            "wins": wins,
+            "losses": losses,
+            "draws": draws,
+            "power_score": power_score(instance["stats"])
+        })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="대표 유닛 오프라인 PvP 래더 (Elo)")
+    parser.add_argument("--source", choices=["supabase", "local"], default="supabase",
+                        help="대표 유닛 출처 (local: saves/*_data.json)")
+    parser.add_argument("--saves-dir", default="saves")
+    parser.add_argument("--fights", type=int, default=20, help="경기당 전투 수 (진영 교대)")
+    parser.add_argument("--rounds", type=int, default=None,
+                        help="라운드 수 (기본: 리그전은 전체 1회전, 스위스는 log2(N)+2)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--out", default=None, help="결과 JSON 경로 (지정 시 파일로도 저장)")
+    parser.add_argument("--dry-run", action="store_true", help="저장하지 않고 결과만 출력")
+    args = parser.parse_args(argv)
+
+    if args.source == "supabase":
+        from supabase_db import get_all_user_data, load_master_skills
+        skills = load_master_skills()
+        if skills:
+            set_skill_master(skills)
+        user_rows = get_all_user_data()
+    else:
+        user_rows = load_local_user_rows(args.saves_dir)
+
+    representatives = collect_representatives(user_rows)
+    if len(representatives) < 2:
+        print(f"ℹ️ 대표 유닛이 {len(representatives)}명이라 래더를 진행할 수 없습니다.")
+        return 0
+
+    rows = run_ladder(representatives, args.fights, args.rounds, args.seed, args.workers)
+    mode = "리그전" if len(representatives) <= ROUND_ROBIN_LIMIT else "스위스"
+    print(f"⚔️ {len(rows)}명 {mode} · 경기당 {args.fights}전")
+    for row in rows[:20]:
+        print(f"  {row['rank']:>3}. {row['rating']:7.1f}  {row['username']} ({row['instance_name']}) "
+              f"{row['wins']}승 {row['losses']}패 {row['draws']}무")
+
+    if args.dry_run:
+        return 0
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(rows, f, ensure_ascii=False, indent=2)
+        print(f"✅ 저장: {args.out}")
+    if args.source == "supabase":
+        from supabase_db import save_pvp_ladder
+        if not save_pvp_ladder(rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
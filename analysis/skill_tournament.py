@@ -0,0 +1,226 @@
+"""
+스킬 티어 리스트 토너먼트
+같은 스탯 예산의 개체에 스킬 구성만 바꿔 리그전(라운드 로빈)을 시뮬레이션하고
+승률 행렬과 티어 리스트를 CSV로 저장합니다.
+
+    python -m analysis.skill_tournament                          # 스킬 1개씩 (102종 + 스킬 없음)
+    python -m analysis.skill_tournament --mode combos --combos 64 --budget 5000 20000
+
+슬롯 1/2/3 조합은 34×34×34 ≈ 4만 종이라 전부 리그전을 돌릴 수 없으므로
+combos 모드는 조합을 시드 고정으로 샘플링한다.
+매치업 결과는 캐시 파일에 저장되어 같은 조건으로 다시 돌리면 시뮬레이션을 건너뛴다.
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from battle_engine import ENGINE_VERSION, get_skill_master, get_skill_master_digest, set_skill_master, simulate_battle
+from stage_table import reward_stats_for_power
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output")
+DEFAULT_CACHE = os.path.join(OUTPUT_DIR, "skill_tournament_cache.json")
+
+# 평균 승률 순위 상위 비율 → 티어
+TIER_QUANTILES = (("S", 0.10), ("A", 0.30), ("B", 0.70), ("C", 0.90), ("D", 1.00))
+
+Loadout = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+def loadout_name(loadout: Loadout) -> str:
+    return "/".join(skill_id or "-" for skill_id in loadout)
+
+
+def single_skill_loadouts() -> List[Loadout]:
+    """스킬 없음 + 스킬 1개만 장착한 구성 전체"""
+    loadouts = [(None, None, None)]
+    for skill_id, skill in sorted(get_skill_master().items()):
+        loadout = [None, None, None]
+        loadout[skill["slot"] - 1] = skill_id
+        loadouts.append(tuple(loadout))
+    return loadouts
+
+
+def sampled_combo_loadouts(n: int, seed: int = 0) -> List[Loadout]:
+    """슬롯 1/2/3을 모두 채운 조합 n개 (중복 없음, 시드 고정)"""
+    skills = get_skill_master()
+    by_slot = [sorted(k for k, v in skills.items() if v["slot"] == slot) for slot in (1, 2, 3)]
+    total = len(by_slot[0]) * len(by_slot[1]) * len(by_slot[2])
+    rng = random.Random(seed)
+    picked = set()
+    while len(picked) < min(n, total):
+        picked.add(tuple(rng.choice(ids) for ids in by_slot))
+    return sorted(picked)
+
+
+def _instance(loadout: Loadout, stats: Dict, name: str) -> Dict:
+    instance = {"name": name, "stats": dict(stats)}
+    for slot, skill_id in enumerate(loadout, start=1):
+        instance[f"accessory_{slot}"] = {"id": skill_id} if skill_id else None
+    return instance
+
+
+def _matchup_seed(base_seed: int, key: str) -> int:
+    """매치업별 고정 시드 (실행 순서/워커 수와 무관)"""
+    return (base_seed * 1000003 + zlib.crc32(key.encode("utf-8"))) & ((1 << 63) - 1)
+
+
+def run_matchup(a: Loadout, b: Loadout, stats: Dict, n_fights: int, seed: int) -> List[int]:
+    """a vs b를 n_fights회 (절반씩 진영 교대) → [a 승, b 승, 무승부]"""
+    rng = random.Random(seed)
+    a_wins = b_wins = draws = 0
+    for index in range(n_fights):
+        a_is_player = index % 2 == 0
+        first, second = (a, b) if a_is_player else (b, a)
+        winner = simulate_battle(_instance(first, stats, "A" if a_is_player else "B"),
+                                 _instance(second, stats, "B" if a_is_player else "A"),
+                                 seed=rng.getrandbits(63))["winner"]
+        if winner == "draw" or winner is None:
+            draws += 1
+        elif (winner == "player") == a_is_player:
+            a_wins += 1
+        else:
+            b_wins += 1
+    return [a_wins, b_wins, draws]
+
+
+def _run_matchup_task(task: tuple) -> List[int]:
+    return run_matchup(*task)
+
+
+def run_tournament(loadouts: List[Loadout], budget: int, n_fights: int = 200, seed: int = 0,
+                   workers: Optional[int] = None, cache: Optional[Dict[str, List[int]]] = None) -> Dict:
+    """라운드 로빈 리그전
+
+    Returns:
+        {"loadouts", "stats", "matrix": [[행 구성의 열 구성 상대 승률, ...]], "mean": [평균 승률],
+         "simulated": 새로 시뮬레이션한 매치업 수}
+        무승부는 0.5승으로 계산한다.
+    """
+    stats = reward_stats_for_power(budget)
+    cache = {} if cache is None else cache
+    prefix = f"v{ENGINE_VERSION}|{get_skill_master_digest()}|{stats['hp']},{stats['atk']},{stats['ms']}|{n_fights}|{seed}"
+
+    pairs = [(i, j) for i in range(len(loadouts)) for j in range(i + 1, len(loadouts))]
+    keys = {pair: f"{prefix}|{loadout_name(loadouts[pair[0]])}|{loadout_name(loadouts[pair[1]])}" for pair in pairs}
+    missing = [pair for pair in pairs if keys[pair] not in cache]
+    tasks = [(loadouts[i], loadouts[j], stats, n_fights, _matchup_seed(seed, keys[(i, j)])) for i, j in missing]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(tasks) <= 1:
+        results = [_run_matchup_task(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=set_skill_master,
+                                 initargs=(get_skill_master(),)) as pool:
+            results = list(pool.map(_run_matchup_task, tasks, chunksize=max(1, len(tasks) // (workers * 8))))
+    for pair, result in zip(missing, results):
+        cache[keys[pair]] = result
+
+    size = len(loadouts)
+    matrix = [[0.5] * size for _ in range(size)]
+    for i, j in pairs:
+        a_wins, b_wins, draws = cache[keys[(i, j)]]
+        total = a_wins + b_wins + draws
+        rate = (a_wins + draws * 0.5) / total if total else 0.5
+        matrix[i][j] = rate
+        matrix[j][i] = 1 - rate
+    mean = [(sum(row) - 0.5) / (size - 1) if size > 1 else 0.5 for row in matrix]
+    return {"loadouts": loadouts, "stats": stats, "matrix": matrix, "mean": mean, "simulated": len(tasks)}
+
+
+def tier_list(result: Dict) -> List[Dict]:
+    """평균 승률 순위 → 티어 (TIER_QUANTILES 기준)"""
+    order = sorted(range(len(result["loadouts"])), key=lambda i: -result["mean"][i])
+    skills = get_skill_master()
+    rows = []
+    for rank, index in enumerate(order, start=1):
+        tier = next(name for name, quantile in TIER_QUANTILES if rank <= max(1, round(quantile * len(order))))
+        loadout = result["loadouts"][index]
+        rows.append({
+            "rank": rank,
+            "tier": tier,
+            "loadout": loadout_name(loadout),
+            "skills": " + ".join(skills[s]["name"] for s in loadout if s) or "스킬 없음",
+            "grades": "/".join(skills[s]["grade"] for s in loadout if s),
+            "mean_win_rate": round(result["mean"][index], 4)
+        })
+    return rows
+
+
+def write_outputs(result: Dict, tiers: List[Dict], out_dir: str, tag: str):
+    """승률 행렬/티어 리스트 CSV 저장"""
+    os.makedirs(out_dir, exist_ok=True)
+    names = [loadout_name(loadout) for loadout in result["loadouts"]]
+    with open(os.path.join(out_dir, f"win_matrix_{tag}.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["loadout"] + names)
+        for name, row in zip(names, result["matrix"]):
+            writer.writerow([name] + [f"{rate:.4f}" for rate in row])
+    with open(os.path.join(out_dir, f"tier_list_{tag}.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(tiers[0]), lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(tiers)
+
+
+def load_cache(path: str) -> Dict[str, List[int]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_cache(path: str, cache: Dict[str, List[int]]):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="스킬 티어 리스트 리그전 시뮬레이션")
+    parser.add_argument("--mode", choices=["single", "combos"], default="single",
+                        help="single: 스킬 1개씩, combos: 슬롯 1/2/3 조합 샘플")
+    parser.add_argument("--combos", type=int, default=64, help="combos 모드 조합 수")
+    parser.add_argument("--budget", type=int, nargs="+", default=[5000], help="스탯 예산 (전투력, 여러 개 가능)")
+    parser.add_argument("--fights", type=int, default=200, help="매치업당 전투 수 (진영 교대)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="워커 프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--out-dir", default=OUTPUT_DIR)
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="매치업 결과 캐시 JSON (빈 문자열이면 사용 안 함)")
+    parser.add_argument("--top", type=int, default=15, help="출력할 상위 순위 수")
+    args = parser.parse_args(argv)
+
+    if args.mode == "single":
+        loadouts = single_skill_loadouts()
+    else:
+        loadouts = sampled_combo_loadouts(args.combos, args.seed)
+    cache = load_cache(args.cache) if args.cache else {}
+
+    for budget in args.budget:
+        result = run_tournament(loadouts, budget, args.fights, args.seed, args.workers, cache)
+        if args.cache:
+            save_cache(args.cache, cache)
+        tiers = tier_list(result)
+        tag = f"{args.mode}_{budget}"
+        write_outputs(result, tiers, args.out_dir, tag)
+
+        stats = result["stats"]
+        pairs = len(loadouts) * (len(loadouts) - 1) // 2
+        print(f"🏆 예산 {budget:,} (HP {stats['hp']:,} / ATK {stats['atk']:,} / MS {stats['ms']:,}) · "
+              f"구성 {len(loadouts)}개 · 매치업 {pairs:,}개 (신규 {result['simulated']:,}) · "
+              f"전투 {result['simulated'] * args.fights:,}회")
+        for row in tiers[:args.top]:
+            print(f"  {row['rank']:>3}. [{row['tier']}] {row['mean_win_rate']*100:5.1f}%  {row['skills']}")
+        print(f"  → {os.path.join(args.out_dir, f'tier_list_{tag}.csv')}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
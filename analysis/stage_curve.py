@@ -0,0 +1,47 @@
+"""
+스테이지 곡선 CSV 생성
+stage_table.stage_curve에서 analysis/stage_power_mix.csv를 다시 만듭니다.
+
+    python -m analysis.stage_curve --max-stage 235 --out analysis/stage_power_mix.csv
+"""
+import argparse
+import csv
+import os
+import sys
+from typing import List, Optional
+
+from stage_table import stage_curve
+
+CSV_COLUMNS = ["stage", "boss_power", "reward_power", "next_boss_power", "mix_needed_default", "mix_needed_bonus"]
+DEFAULT_OUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stage_power_mix.csv")
+
+
+def write_stage_curve_csv(path: str, max_stage: int, min_stage: int = 1) -> int:
+    """스테이지 곡선을 CSV로 저장
+
+    Returns:
+        기록한 행 수
+    """
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(CSV_COLUMNS)
+        for stage in range(min_stage, max_stage + 1):
+            curve = stage_curve(stage)
+            writer.writerow([curve[column] for column in CSV_COLUMNS])
+    return max(0, max_stage - min_stage + 1)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="스테이지 곡선(보스/보상 전투력, 필요 믹스 수) CSV 생성")
+    parser.add_argument("--min-stage", type=int, default=1)
+    parser.add_argument("--max-stage", type=int, default=235)
+    parser.add_argument("--out", default=DEFAULT_OUT, help="출력 CSV 경로 (기본: analysis/stage_power_mix.csv)")
+    args = parser.parse_args(argv)
+
+    rows = write_stage_curve_csv(args.out, args.max_stage, args.min_stage)
+    print(f"✅ {rows}개 스테이지 → {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+탐색형 스킬 AI
+Battle.select_skill(고정 우선순위 + 랜덤 노이즈) 대신 후보 스킬마다 같은 턴을 미리 진행해 보고
+몇 행동 뒤의 상태를 평가해 고르는 LookaheadBattle을 제공합니다.
+
+- 탐색은 snapshot()/restore()로 전투 상태를 되감으며 진행한다 (deepcopy 없음).
+- 확률 분기(회피/치명타 등)는 후보별 표본 전투 몇 개의 평균으로 근사한다 (샘플링 expectimax).
+  표본의 RNG 시드는 상태에서 만들기 때문에 AI가 실제 전투의 다음 난수를 미리 보는 일은 없다.
+- 평가값은 (전투 상태, 후보, 탐색 설정)만의 함수이므로 치환표에 저장해 같은 상태에서 재사용한다.
+  치환표는 프로세스 전체가 공유하며, 적중 여부와 무관하게 같은 seed면 같은 전투가 나온다.
+- 결정 1회당 시간 상한(time_budget)을 넘기면 그때까지 평가한 후보 중에서 고른다.
+  이 경우에만 결과가 기기 속도에 따라 달라질 수 있다 (ai_stats["budget_exceeded"]로 확인).
+
+일반 Battle의 동작과 전투 속도에는 영향이 없다 (선택 사항).
+"""
+import zlib
+from time import perf_counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from battle_engine import Battle, BattleInstance, add_skill_master_reload_listener
+
+# 후보 행동 뒤로 더 진행해 보는 행동 수 (양쪽 합산)
+DEFAULT_DEPTH = 4
+# 후보마다 돌려 보는 표본 전투 수
+DEFAULT_SAMPLES = 3
+# 결정 1회당 탐색 시간 상한 (초)
+DEFAULT_TIME_BUDGET = 0.005
+# 치환표 최대 항목 수 (넘으면 비움)
+TRANSPOSITION_MAX_ENTRIES = 100000
+# 승패가 나지 않은 상태의 평가값 배율 (승리 1 / 패배 -1보다 작게)
+HP_SCORE_WEIGHT = 0.5
+
+
+class TranspositionTable:
+    """(전투 상태, 후보 스킬, 탐색 설정) → 평균 평가값"""
+
+    def __init__(self, max_entries: int = TRANSPOSITION_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._values: Dict[tuple, float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[float]:
+        value = self._values.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, key: tuple, value: float):
+        if len(self._values) >= self.max_entries:
+            self._values.clear()
+        self._values[key] = value
+
+    def clear(self):
+        self._values.clear()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+# 프로세스 공유 치환표 (스킬 마스터가 바뀌면 비움)
+_SHARED_TABLE = TranspositionTable()
+
+
+def clear_transposition_table():
+    _SHARED_TABLE.clear()
+
+
+add_skill_master_reload_listener(clear_transposition_table)
+
+
+def _skill_ids(instance: Dict) -> Tuple[Optional[str], ...]:
+    return tuple((instance.get(f"accessory_{i}") or {}).get("id") for i in range(1, 4))
+
+
+class LookaheadBattle(Battle):
+    """ai_sides 쪽("player"/"enemy") 스킬 선택을 탐색형 AI로 바꾼 Battle
+
+    탐색 안에서의 행동(상대와 자신의 이후 턴)은 기본 select_skill 규칙으로 진행한다.
+    탐색 통계는 self.ai_stats에 기록된다.
+    """
+
+    def __init__(self, player_instance: Dict, enemy_instance: Dict, headless: bool = False,
+                 seed: Optional[int] = None, ai_sides: Iterable[str] = ("enemy",),
+                 depth: int = DEFAULT_DEPTH, samples: int = DEFAULT_SAMPLES,
+                 time_budget: float = DEFAULT_TIME_BUDGET, table: Optional[TranspositionTable] = None):
+        super().__init__(player_instance, enemy_instance, headless=headless, seed=seed)
+        self.ai_sides = frozenset(ai_sides)
+        self.depth = depth
+        self.samples = max(1, samples)
+        self.time_budget = time_budget
+        self.table = _SHARED_TABLE if table is None else table
+        self._searching = False
+        # 상태 튜플에 없는 전투 조건 (장착 스킬, 탐색 설정)
+        self._search_key = (_skill_ids(player_instance), _skill_ids(enemy_instance), self.depth, self.samples)
+        self.ai_stats = {"decisions": 0, "actions_simulated": 0, "table_hits": 0,
+                         "budget_exceeded": 0, "search_time": 0.0}
+
+    def _candidates(self, attacker: BattleInstance) -> List[Optional[int]]:
+        """사용 가능한 스킬 슬롯 + 스킬 없이 기본 공격만 (None)"""
+        slots = [slot for slot, skill in attacker.skills.items()
+                 if attacker.cooldowns[slot] <= 0
+                 and not (skill["grade"] == "Mystic" and slot in attacker.mystic_used)]
+        return slots + [None]
+
+    def _score(self, attacker: BattleInstance) -> float:
+        """attacker 입장의 상태 평가 (승리 1, 패배 -1, 무승부 0, 진행 중이면 HP+쉴드 비율 차이)"""
+        side = "player" if attacker.is_player else "enemy"
+        if self.winner is not None:
+            if self.winner == "draw":
+                return 0.0
+            return 1.0 if self.winner == side else -1.0
+        opponent = self.enemy if attacker.is_player else self.player
+        mine = (attacker.current_hp + attacker.shield) / max(1, attacker.max_hp)
+        theirs = (opponent.current_hp + opponent.shield) / max(1, opponent.max_hp)
+        return HP_SCORE_WEIGHT * max(-1.0, min(1.0, mine - theirs))
+
+    def _rollout(self, attacker: BattleInstance, slot: Optional[int], seed: int) -> float:
+        """현재 상태에서 slot으로 턴을 마친 뒤 depth 행동 진행 → 평가값 (호출 후 상태는 restore 필요)"""
+        self.rng.seed(seed)
+        self._take_action(attacker, slot)
+        actions = 0
+        while not self.check_victory() and actions < self.depth:
+            if self.step():
+                actions += 1
+        self.ai_stats["actions_simulated"] += actions + 1
+        return self._score(attacker)
+
+    def select_skill(self, attacker: BattleInstance) -> Optional[int]:
+        """AI 스킬 선택 (ai_sides가 아니거나 탐색 중이면 기본 규칙)"""
+        side = "player" if attacker.is_player else "enemy"
+        if self._searching or side not in self.ai_sides:
+            return super().select_skill(attacker)
+
+        candidates = self._candidates(attacker)
+        if len(candidates) == 1:
+            return None
+
+        start = perf_counter()
+        deadline = start + self.time_budget
+        self.ai_stats["decisions"] += 1
+        state = self.snapshot()
+        position = (self.turn, side, state[4], state[5]) + self._search_key
+        seed_base = zlib.crc32(repr(position).encode("utf-8"))
+
+        headless = self.headless
+        self._searching = True
+        self.headless = True
+        best_slot, best_value = None, None
+        exceeded = False
+        try:
+            for slot in candidates:
+                key = position + (slot,)
+                value = self.table.get(key)
+                if value is not None:
+                    self.ai_stats["table_hits"] += 1
+                else:
+                    total = 0.0
+                    for sample in range(self.samples):
+                        if perf_counter() > deadline:
+                            exceeded = True
+                            break
+                        # 후보끼리 같은 표본 시드 사용 (같은 난수로 비교해 분산 감소)
+                        total += self._rollout(attacker, slot, seed_base * 1000003 + sample)
+                        self.restore(state)
+                    if exceeded:
+                        break
+                    value = total / self.samples
+                    self.table.put(key, value)
+                # 동점이면 먼저 나온 후보 (슬롯 번호 순, 스킬 없음은 마지막)
+                if best_value is None or value > best_value:
+                    best_slot, best_value = slot, value
+        finally:
+            self.restore(state)
+            self.headless = headless
+            self._searching = False
+            self.ai_stats["search_time"] += perf_counter() - start
+
+        if exceeded:
+            self.ai_stats["budget_exceeded"] += 1
+            if best_value is None:
+                # 후보를 하나도 끝까지 평가하지 못함 → 기본 규칙
+                return super().select_skill(attacker)
+        return best_slot
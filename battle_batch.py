@@ -0,0 +1,142 @@
+"""
+스탯 전용 배치 전투 (NumPy)
+스킬이 없는 개체 N명과 보스 1명의 전투를 NumPy 배열 연산으로 한 번에 시뮬레이션합니다.
+계정 전체 개체 × 수백 스테이지 같은 밸런스 스윕용이며, 스킬이 있는 개체는
+battle_engine.is_stat_only로 걸러낸 뒤 simulate_battle로 처리해야 합니다.
+"""
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from battle_engine import stat_only_action_schedule, ACT_PLAYER, ACT_TIE_FIRST, ACT_TIE_SECOND
+
+# 결과 winner 배열 코드
+WINNER_PLAYER = 1
+WINNER_ENEMY = 0
+WINNER_DRAW = 2
+
+
+def _schedule_matrix(player_ms: np.ndarray, enemy_ms: int, max_turns: int) -> np.ndarray:
+    """개체별 턴 행동 순서 코드 행렬 (N, max_turns) - MS 값별로 1회만 계산"""
+    unique_ms, inverse = np.unique(player_ms, return_inverse=True)
+    rows = np.array([stat_only_action_schedule(int(ms), enemy_ms, max_turns) for ms in unique_ms], dtype=np.int8)
+    return rows[inverse]
+
+
+def _first_true(mask: np.ndarray) -> np.ndarray:
+    """행별 첫 True 위치 (없으면 열 개수)"""
+    first = mask.argmax(axis=1)
+    return np.where(mask.any(axis=1), first, mask.shape[1])
+
+
+def simulate_stat_only_batch(
+    hp: Sequence[int],
+    atk: Sequence[int],
+    ms: Sequence[int],
+    boss_stats: Dict,
+    seed: Optional[int] = None,
+    max_turns: int = 50
+) -> Dict[str, np.ndarray]:
+    """스킬 없는 개체 N명 vs 스킬 없는 보스 1명 전투를 동시에 시뮬레이션
+
+    Battle.basic_attack 규칙(ATK × 0.8~1.2, 최소 1 데미지)과 ATB 행동 순서
+    (battle_engine.stat_only_action_schedule, 동률 시 50% 랜덤)를 그대로 따른다.
+    모든 전투의 모든 턴 데미지를 한 번에 뽑은 뒤 누적합으로 사망 턴을 찾으므로
+    턴 수만큼 반복하는 Python 루프가 없다.
+    RNG는 NumPy Generator라서 같은 seed라도 simulate_battle과 개별 결과는 다르다 (분포는 같음).
+    HP/데미지는 float64로 계산하므로 2^53을 넘는 초고단계 스탯은 근사값이 된다.
+    시작 HP가 0 이하면 첫 턴 전에 check_victory와 같은 순서로 판정한다 (둘 다면 무승부, 0턴).
+
+    Args:
+        hp, atk, ms: 개체별 스탯 (길이 N)
+        boss_stats: {"hp", "atk", "ms"}
+        seed: 재현용 시드
+
+    Returns:
+        {"winner": WINNER_PLAYER/WINNER_ENEMY/WINNER_DRAW (N,), "player_final_hp", "enemy_final_hp", "turns"}
+    """
+    rng = np.random.default_rng(seed)
+    player_hp = np.asarray(hp, dtype=np.float64)
+    player_atk = np.asarray(atk, dtype=np.float64)
+    player_ms = np.asarray(ms, dtype=np.int64)
+    n = len(player_hp)
+    boss_hp = float(boss_stats["hp"])
+    boss_atk = float(boss_stats["atk"])
+
+    # 턴별 행동자 (동률은 첫 번째만 랜덤, 두 번째는 반대쪽)
+    codes = _schedule_matrix(player_ms, int(boss_stats["ms"]), max_turns)
+    tie_draw = rng.random((n, max_turns)) < 0.5
+    prev_tie_draw = np.roll(tie_draw, 1, axis=1)
+    player_acts = ((codes == ACT_PLAYER)
+                   | ((codes == ACT_TIE_FIRST) & tie_draw)
+                   | ((codes == ACT_TIE_SECOND) & ~prev_tie_draw))
+
+    # 턴별 데미지 (행동하지 않은 쪽은 0)
+    rolls = rng.uniform(0.8, 1.2, (n, max_turns))
+    to_enemy = np.where(player_acts, np.maximum(1.0, np.floor(player_atk[:, None] * rolls)), 0.0)
+    to_player = np.where(player_acts, 0.0, np.maximum(1.0, np.floor(boss_atk * rolls)))
+    enemy_damage = np.cumsum(to_enemy, axis=1)
+    player_damage = np.cumsum(to_player, axis=1)
+
+    # 먼저 쓰러진 쪽 판정 (한 턴에 한쪽만 공격하므로 같은 턴 사망은 없음)
+    enemy_dead_turn = _first_true(enemy_damage >= boss_hp)
+    player_dead_turn = _first_true(player_damage >= player_hp[:, None])
+    player_won = enemy_dead_turn < player_dead_turn
+    end_index = np.minimum(np.minimum(enemy_dead_turn, player_dead_turn), max_turns - 1)
+
+    rows = np.arange(n)
+    winner = np.where(player_won, WINNER_PLAYER, WINNER_ENEMY)
+    player_final_hp = np.maximum(0.0, player_hp - player_damage[rows, end_index])
+    enemy_final_hp = np.maximum(0.0, boss_hp - enemy_damage[rows, end_index])
+    turns = end_index + 1
+
+    # 시작 시점 판정 (첫 턴 전에 이미 쓰러진 쪽이 있으면 0턴에 종료)
+    player_down = player_hp <= 0
+    if boss_hp <= 0:
+        over_at_start = np.ones(n, dtype=bool)
+        winner = np.where(player_down, WINNER_DRAW, WINNER_PLAYER)
+    else:
+        over_at_start = player_down
+        winner = np.where(player_down, WINNER_ENEMY, winner)
+    player_final_hp = np.where(over_at_start, np.maximum(0.0, player_hp), player_final_hp)
+    enemy_final_hp = np.where(over_at_start, max(0.0, boss_hp), enemy_final_hp)
+    turns = np.where(over_at_start, 0, turns)
+
+    return {
+        "winner": winner,
+        "player_final_hp": player_final_hp,
+        "enemy_final_hp": enemy_final_hp,
+        "turns": turns
+    }
+
+
+def stat_only_win_rates(
+    hp: Sequence[int],
+    atk: Sequence[int],
+    ms: Sequence[int],
+    boss_stats: Dict,
+    n_trials: int = 1000,
+    seed: Optional[int] = None,
+    max_batch: int = 200000
+) -> np.ndarray:
+    """개체별 보스 상대 승률 (N,) - 전투 n_trials회씩, 메모리 제한을 위해 max_batch 단위로 분할"""
+    player_hp = np.asarray(hp)
+    player_atk = np.asarray(atk)
+    player_ms = np.asarray(ms)
+    n = len(player_hp)
+    wins = np.zeros(n, dtype=np.int64)
+    if n == 0:
+        return wins.astype(np.float64)
+
+    seed_seq = np.random.SeedSequence(seed)
+    trials_per_batch = max(1, max_batch // n)
+    done = 0
+    while done < n_trials:
+        trials = min(trials_per_batch, n_trials - done)
+        result = simulate_stat_only_batch(
+            np.tile(player_hp, trials), np.tile(player_atk, trials), np.tile(player_ms, trials),
+            boss_stats, seed=seed_seq.spawn(1)[0]
+        )
+        wins += (result["winner"] == WINNER_PLAYER).reshape(trials, n).sum(axis=0)
+        done += trials
+    return wins / n_trials
@@ -0,0 +1,201 @@
+"""
+전투 결과 캐시
+스테이지 보스는 스테이지 번호만으로 결정되므로 (스탯, 장착 스킬, 스테이지, 엔진 버전)이 같으면
+승률/평균 턴 수 분포도 같습니다. 시뮬레이션 요약을 메모리 LRU + 디스크(JSON 파일)에 저장해
+같은 빌드의 클리어 확률/최대 스테이지 계산을 모든 세션이 재사용하게 합니다.
+Streamlit에 의존하지 않습니다.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from battle_engine import ENGINE_VERSION, get_skill_master_digest
+
+DEFAULT_MAX_ENTRIES = 4096
+# 디스크 항목 상한 (넘으면 오래된 파일부터 DISK_TRIM_RATIO까지 삭제)
+DEFAULT_MAX_DISK_ENTRIES = 50000
+DISK_TRIM_RATIO = 0.9
+
+
+def matchup_key(instance: Dict, stage: Optional[int], query: str, **params) -> str:
+    """캐시 키 (스탯 + 슬롯 순 스킬 ID + 스테이지 + 엔진 버전 + 스킬 마스터 + 질의 종류/파라미터)
+
+    이름/외형/ID 등 전투에 영향 없는 필드는 키에 넣지 않으므로 같은 빌드는 유저가 달라도 같은 키가 된다.
+    """
+    stats = instance["stats"]
+    skill_ids = [(instance.get(f"accessory_{i}") or {}).get("id") for i in range(1, 4)]
+    payload = json.dumps({
+        "engine_version": ENGINE_VERSION,
+        "skills": get_skill_master_digest(),  # 관리자 밸런스 패치로 스킬 수치가 바뀌면 키도 바뀜
+        "stats": [stats["hp"], stats["atk"], stats["ms"]],
+        "skill_ids": skill_ids,
+        "stage": stage,
+        "query": query,
+        "params": params
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class BattleResultCache:
+    """크기 제한 LRU (메모리) + 크기 제한 디스크 캐시
+
+    디스크는 키별 JSON 파일 (cache_dir/v엔진버전-스킬해시/키 앞 2자리/키.json)이며
+    임시 파일 → os.replace로 원자적으로 기록한다. 엔진 버전/스킬 마스터가 바뀌면 다른 폴더를 쓰고,
+    prune()이 현재 것이 아닌 폴더를 지운다. 항목이 max_disk_entries를 넘으면 오래된 파일부터 지운다.
+    여러 세션 스레드에서 동시에 불러도 안전하다 (같은 키를 동시에 계산하는 경우는 막지 않음).
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, cache_dir: Optional[str] = None,
+                 max_disk_entries: int = DEFAULT_MAX_DISK_ENTRIES):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_entries: Optional[int] = None  # 현재 폴더 파일 수 (처음 필요할 때 셈)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _namespace() -> str:
+        return f"v{ENGINE_VERSION}-{get_skill_master_digest()}"
+
+    def _namespace_dir(self) -> str:
+        return os.path.join(self.cache_dir, self._namespace())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._namespace_dir(), key[:2], f"{key}.json")
+
+    def _disk_files(self) -> list:
+        """현재 폴더의 캐시 파일 경로 목록"""
+        files = []
+        for root, _, names in os.walk(self._namespace_dir()):
+            files.extend(os.path.join(root, name) for name in names if name.endswith(".json"))
+        return files
+
+    def _trim_disk(self):
+        """오래된(수정 시각 기준) 파일부터 지워 max_disk_entries * DISK_TRIM_RATIO개로 줄임"""
+        files = []
+        for path in self._disk_files():
+            try:
+                files.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+        files.sort()
+        excess = len(files) - int(self.max_disk_entries * DISK_TRIM_RATIO)
+        for _, path in files[:max(0, excess)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._disk_entries = len(files) - max(0, excess)
+
+    def _remember(self, key: str, value: Dict):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """메모리 → 디스크 순으로 조회 (디스크에서 찾으면 메모리에도 올림)"""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        if self.cache_dir:
+            try:
+                with open(self._path(key), "r", encoding="utf-8") as f:
+                    value = json.load(f)
+            except FileNotFoundError:
+                value = None
+            except Exception as e:
+                print(f"⚠️ 전투 캐시 읽기 실패 ({key[:8]}): {e}")
+                value = None
+            if value is not None:
+                self._remember(key, value)
+                with self._lock:
+                    self.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: Dict):
+        """메모리와 디스크에 저장 (value는 JSON 직렬화 가능한 dict)"""
+        self._remember(key, value)
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            is_new = not os.path.exists(path)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"⚠️ 전투 캐시 저장 실패 ({key[:8]}): {e}")
+            return
+
+        with self._lock:
+            if self._disk_entries is None:
+                self._disk_entries = len(self._disk_files())
+            elif is_new:
+                self._disk_entries += 1
+            if self._disk_entries > self.max_disk_entries:
+                self._trim_disk()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict]) -> Dict:
+        """캐시에 있으면 반환, 없으면 compute() 결과를 저장 후 반환"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self, disk: bool = False):
+        """메모리 캐시 비우기 (disk=True면 디스크 파일도 전부 삭제 - 스킬 마스터 교체 시 호출)"""
+        with self._lock:
+            self._entries.clear()
+            if disk and self.cache_dir and os.path.isdir(self.cache_dir):
+                for name in os.listdir(self.cache_dir):
+                    shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+                self._disk_entries = 0
+
+    def prune(self) -> int:
+        """현재 엔진 버전/스킬 마스터가 아닌 디스크 폴더 삭제 (서버 시작 시 호출) → 삭제한 폴더 수"""
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return 0
+        current = self._namespace()
+        removed = 0
+        with self._lock:
+            for name in os.listdir(self.cache_dir):
+                path = os.path.join(self.cache_dir, name)
+                if name != current and os.path.isdir(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+        return removed
+
+    def stats(self) -> Dict:
+        """{"entries", "max_entries", "disk_entries", "max_disk_entries", "hits", "disk_hits", "misses"}"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_entries": self._disk_entries,
+                "max_disk_entries": self.max_disk_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses
+            }
@@ -0,0 +1,2348 @@
+"""
+전투 엔진
+Buff / BattleInstance / Battle 클래스를 제공합니다.
+Streamlit에 의존하지 않으므로 밸런스 시뮬레이션 등 헤드리스 환경에서도 사용할 수 있습니다.
+"""
+import hashlib
+import json
+import operator
+import os
+import random
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 전투 규칙 버전 (전투 결과가 달라지는 변경 시 올림 - 예전 리플레이 재현 불가 표시용)
+ENGINE_VERSION = 1
+
+# ============================================================================
+# 스킬 마스터 데이터
+# ============================================================================
+
+# streamlit_app에서 로드한 스킬 마스터를 set_skill_master()로 공유받음
+# (등록 전에 전투가 생성되면 로컬 data/skills.json에서 로드)
+SKILL_MASTER: Dict[str, dict] = {}
+# 스킬 ID → 컴파일된 효과 (set_skill_master 시 1회 생성, compile_skill 참고)
+COMPILED_SKILLS: Dict[str, dict] = {}
+# 정규화된 스킬 마스터 내용 해시 (set_skill_master 시 1회 계산, 캐시 키/코퍼스 확인용)
+SKILL_MASTER_DIGEST: Optional[str] = None
+# 등록된 스킬 마스터가 다른 내용으로 바뀔 때 호출할 함수들 (스킬 데이터 기반 캐시 무효화용)
+_RELOAD_LISTENERS: List[Callable[[], None]] = []
+
+
+def load_local_skill_master() -> Dict[str, dict]:
+    """로컬 data/skills.json에서 스킬 마스터 로드 (헤드리스 실행용)"""
+    local_path = os.path.join(os.path.dirname(__file__), "data", "skills.json")
+    if not os.path.exists(local_path):
+        return {}
+    with open(local_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def set_skill_master(skills: Dict[str, dict]):
+    """스킬 마스터 데이터 등록 (레거시 스키마 정규화 + 효과 컴파일 포함)
+    
+    내용이 지금 등록된 것과 같으면(해시 비교) 아무것도 하지 않는다 (Streamlit 재실행마다 호출되어도 가벼움).
+    이미 등록된 마스터를 다른 내용으로 바꾸면 add_skill_master_reload_listener로 등록한 함수를 호출한다.
+    """
+    global SKILL_MASTER, COMPILED_SKILLS, SKILL_MASTER_DIGEST
+    skills, problems = normalize_skill_master(skills)
+    payload = json.dumps(skills, sort_keys=True, ensure_ascii=False)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    if digest == SKILL_MASTER_DIGEST:
+        return
+    for problem in problems:
+        print(f"⚠️ 스킬 정규화 경고: {problem}")
+    SKILL_MASTER = skills
+    COMPILED_SKILLS = {skill_id: compile_skill(skill) for skill_id, skill in skills.items()}
+    reloaded = SKILL_MASTER_DIGEST is not None
+    SKILL_MASTER_DIGEST = digest
+    if reloaded:
+        for listener in list(_RELOAD_LISTENERS):
+            listener()
+
+
+def add_skill_master_reload_listener(listener: Callable[[], None]):
+    """스킬 마스터 교체 시 호출할 함수 등록 (최초 등록 때는 호출되지 않음, 같은 함수는 1번만)"""
+    if listener not in _RELOAD_LISTENERS:
+        _RELOAD_LISTENERS.append(listener)
+
+
+def get_skill_master() -> Dict[str, dict]:
+    """스킬 마스터 데이터 반환 (미등록 시 로컬 파일에서 로드)"""
+    if not SKILL_MASTER:
+        set_skill_master(load_local_skill_master())
+    return SKILL_MASTER
+
+
+def get_skill_master_digest() -> str:
+    """등록된 스킬 마스터의 내용 해시 (16자리 16진수, 미등록 시 로컬 파일에서 로드)"""
+    get_skill_master()
+    return SKILL_MASTER_DIGEST
+
+# ============================================================================
+# 전투 시스템
+# ============================================================================
+class Buff:
+    """버프/디버프 클래스"""
+    __slots__ = ("type", "value", "duration", "source", "count")
+    
+    def __init__(self, buff_type: str, value: float, duration: int, source: str = "", count: int = 0):
+        self.type = buff_type
+        self.value = value
+        self.duration = duration
+        self.source = source
+        self.count = count  # 횟수 기반 효과용 (회피 횟수 등)
+
+class BuffList:
+    """버프/디버프 컨테이너 (타입별 인덱스)
+    
+    삽입 순서 리스트와 타입별 리스트를 함께 유지하여 has/first/of_type 조회를
+    전체 순회 없이 처리한다. 구성이 바뀔 때마다(추가/제거/만료) version이 증가하므로
+    BattleInstance의 집계값 캐시 무효화에 사용한다.
+    """
+    __slots__ = ("_items", "_by_type", "version")
+    
+    def __init__(self):
+        self._items: List[Buff] = []
+        self._by_type: Dict[str, List[Buff]] = {}
+        self.version = 0
+    
+    def __iter__(self):
+        return iter(self._items)
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def append(self, buff: Buff):
+        """버프 추가"""
+        self._items.append(buff)
+        self._by_type.setdefault(buff.type, []).append(buff)
+        self.version += 1
+    
+    def remove(self, buff: Buff):
+        """버프 1개 제거"""
+        self._items.remove(buff)
+        same_type = self._by_type[buff.type]
+        same_type.remove(buff)
+        if not same_type:
+            del self._by_type[buff.type]
+        self.version += 1
+    
+    def clear(self):
+        """전체 제거"""
+        if self._items:
+            self._items = []
+            self._by_type = {}
+            self.version += 1
+    
+    def retain(self, keep: Callable[[Buff], bool]):
+        """조건을 만족하는 버프만 남김 (만료 처리)"""
+        kept = [b for b in self._items if keep(b)]
+        if len(kept) == len(self._items):
+            return
+        self._items = kept
+        self._by_type = {}
+        for b in kept:
+            self._by_type.setdefault(b.type, []).append(b)
+        self.version += 1
+    
+    def remove_type(self, buff_type: str):
+        """특정 타입 버프 전부 제거"""
+        if buff_type in self._by_type:
+            self.retain(lambda b: b.type != buff_type)
+    
+    def has(self, buff_type: str) -> bool:
+        """특정 타입 버프 보유 여부"""
+        return buff_type in self._by_type
+    
+    def first(self, buff_type: str) -> Optional[Buff]:
+        """특정 타입 중 가장 먼저 추가된 버프 (없으면 None)"""
+        same_type = self._by_type.get(buff_type)
+        return same_type[0] if same_type else None
+    
+    def of_type(self, buff_type: str) -> List[Buff]:
+        """특정 타입 버프 목록 (추가 순서, 읽기 전용)"""
+        return self._by_type.get(buff_type, [])
+    
+    def snapshot(self) -> tuple:
+        """현재 구성을 불변 튜플로 저장 (Buff 객체는 공유하지 않음)"""
+        return tuple((b.type, b.value, b.duration, b.source, b.count) for b in self._items)
+    
+    def restore(self, state: tuple):
+        """snapshot() 시점의 구성으로 되돌림 (같은 스냅샷을 여러 번 복원 가능)"""
+        self._items = [Buff(*fields) for fields in state]
+        self._by_type = {}
+        for b in self._items:
+            self._by_type.setdefault(b.type, []).append(b)
+        self.version += 1
+
+class BattleInstance:
+    """전투용 개체 임시 데이터
+    
+    시뮬레이션에서 대량으로 생성/복사되므로 __slots__로 필드를 고정한다.
+    snapshot()/restore()로 deepcopy 없이 전투 중 상태를 저장/복원할 수 있다.
+    """
+    # snapshot()이 값 그대로 저장하는 필드 (불변 값만)
+    _STATE_FIELDS = (
+        "max_hp", "base_atk", "base_ms", "current_hp", "current_atk", "current_ms",
+        "speed_gauge", "shield", "last_counter_damage", "delayed_damage",
+        "invincible", "stunned", "revive_once", "auto_revive_used", "auto_revive_hp",
+        "time_loop", "saved_state", "next_turn_first_strike",
+        "next_turn_dodge_active", "next_turn_dodge_chance"
+    )
+    __slots__ = _STATE_FIELDS + (
+        "original", "is_player", "buffs", "debuffs", "_stat_cache_key", "_stat_cache",
+        "cooldowns", "mystic_used", "skills", "compiled_skills"
+    )
+    _get_state_fields = operator.attrgetter(*_STATE_FIELDS)  # 인스턴스를 인자로 호출 (바인딩되지 않음)
+    
+    def __init__(self, instance: Dict, is_player: bool = True):
+        self.original = instance
+        self.is_player = is_player
+        
+        # 기본 스탯
+        self.max_hp = instance["stats"]["hp"]
+        self.base_atk = instance["stats"]["atk"]
+        self.base_ms = instance["stats"]["ms"]
+        
+        # 현재 스탯
+        self.current_hp = self.max_hp
+        self.current_atk = self.base_atk
+        self.current_ms = self.base_ms
+        
+        # 버프/디버프
+        self.buffs = BuffList()
+        self.debuffs = BuffList()
+        # apply_buffs 집계 캐시 (버프 구성/기본 스탯이 같으면 재계산 생략)
+        self._stat_cache_key = None
+        self._stat_cache = (self.base_atk, self.base_ms)
+        
+        # 속도 게이지 (ATB 시스템)
+        self.speed_gauge = 0
+        
+        # 쉴드 (오버힐로 변환되는 임시 보호)
+        self.shield = 0
+        
+        # 반격 데미지 추적 (로그 표시용)
+        self.last_counter_damage = 0
+        
+        # delayed_burst 누적 데미지
+        self.delayed_damage = 0
+        
+        # 쿨다운 {slot: remaining_turns}
+        self.cooldowns = {1: 0, 2: 0, 3: 0}
+        
+        # Mystic 스킬 사용 여부
+        self.mystic_used = set()
+        
+        # 특수 상태
+        self.invincible = 0  # 무적 턴
+        self.stunned = 0  # 스턴 턴
+        self.revive_once = False  # 1회 부활
+        self.auto_revive_used = False  # 자동 부활 사용 여부 (전투당 1회)
+        self.auto_revive_hp = 0  # 자동 부활 시 HP
+        self.time_loop = 0  # 타임루프 턴
+        self.saved_state = None  # 저장된 상태
+        self.next_turn_first_strike = False  # 다음 턴 선공 플래그
+        self.next_turn_dodge_active = False  # 다음 상대 공격 회피 플래그
+        self.next_turn_dodge_chance = 0  # 다음 상대 공격 회피 확률
+        
+        # 스킬
+        skill_master = get_skill_master()
+        self.skills = {}
+        self.compiled_skills = {}  # {slot: compile_skill 결과}
+        for i in range(1, 4):
+            acc_key = f"accessory_{i}"
+            if instance.get(acc_key):
+                skill_id = instance[acc_key]["id"]
+                if skill_id in skill_master:
+                    self.skills[i] = skill_master[skill_id]
+                    self.compiled_skills[i] = COMPILED_SKILLS[skill_id]
+    
+    def get_hp_percent(self) -> float:
+        return self.current_hp / self.max_hp if self.max_hp > 0 else 0
+    
+    def apply_buffs(self):
+        """버프 효과 적용하여 현재 스탯 계산
+        
+        버프/디버프 구성과 기본 스탯이 지난 계산 이후 그대로면 캐시된 값을 사용한다.
+        """
+        cache_key = (self.buffs.version, self.debuffs.version, self.base_atk, self.base_ms)
+        if cache_key != self._stat_cache_key:
+            # ATK 버프/디버프
+            atk_modifier = 1.0
+            for buff in self.buffs.of_type("atk_boost"):
+                atk_modifier += buff.value
+            for debuff in self.debuffs.of_type("atk_reduce"):
+                atk_modifier -= debuff.value
+            
+            # MS 버프/디버프
+            ms_modifier = 0
+            for buff in self.buffs.of_type("ms_boost"):
+                ms_modifier += int(buff.value)
+            for debuff in self.debuffs.of_type("ms_reduce"):
+                ms_modifier -= int(debuff.value)
+            
+            self._stat_cache = (int(self.base_atk * max(0.1, min(1.9, atk_modifier))),
+                                max(1, self.base_ms + ms_modifier))
+            self._stat_cache_key = cache_key
+        
+        self.current_atk, self.current_ms = self._stat_cache
+    
+    def add_buff(self, buff_type: str, value: float, duration: int, source: str = "", count: int = 0):
+        """버프 추가"""
+        self.buffs.append(Buff(buff_type, value, duration, source, count))
+    
+    def add_debuff(self, debuff_type: str, value: float, duration: int, source: str = "", count: int = 0):
+        """디버프 추가"""
+        self.debuffs.append(Buff(debuff_type, value, duration, source, count))
+    
+    def tick_buffs(self):
+        """버프/디버프 지속시간 감소"""
+        # duration 감소 먼저
+        for b in self.buffs:
+            b.duration -= 1
+        for d in self.debuffs:
+            d.duration -= 1
+        
+        # 버프 제거 조건:
+        # - count 기반 버프(dodge_count): count가 0 이하일 때 제거
+        # - 일반 버프: duration이 0 이하일 때 제거
+        self.buffs.retain(lambda b: b.count > 0 if b.type == "dodge_count" else b.duration > 0)
+        self.debuffs.retain(lambda d: d.duration > 0)
+        
+        # 쿨다운 감소
+        for slot in self.cooldowns:
+            if self.cooldowns[slot] > 0:
+                self.cooldowns[slot] -= 1
+        
+        # 특수 상태 감소
+        if self.invincible > 0:
+            self.invincible -= 1
+        if self.stunned > 0:
+            self.stunned -= 1
+        if self.time_loop > 0:
+            self.time_loop -= 1
+        
+        self.apply_buffs()
+    
+    def snapshot(self) -> tuple:
+        """전투 중 상태 저장 (필드 수에 비례하는 얕은 복사)
+        
+        Returns:
+            restore()에 넘길 불변 튜플 (original/skills 등 전투 중 바뀌지 않는 값은 제외)
+        """
+        return (
+            self._get_state_fields(self),
+            self.buffs.snapshot(),
+            self.debuffs.snapshot(),
+            tuple(self.cooldowns.items()),
+            frozenset(self.mystic_used)
+        )
+    
+    def restore(self, state: tuple):
+        """snapshot() 시점의 상태로 되돌림"""
+        values, buffs, debuffs, cooldowns, mystic_used = state
+        for name, value in zip(self._STATE_FIELDS, values):
+            setattr(self, name, value)
+        self.buffs.restore(buffs)
+        self.debuffs.restore(debuffs)
+        self.cooldowns = dict(cooldowns)
+        self.mystic_used = set(mystic_used)
+
+class Battle:
+    """전투 매니저
+
+    전투 기록은 문자열 대신 이벤트 튜플(events)로 쌓고, 텍스트는 log를 읽을 때 만든다
+    (render_event 참고). headless=True이면 이벤트도 기록하지 않고 효과 메시지 문자열도 만들지 않는다
+    (대량 시뮬레이션용).
+    
+    모든 랜덤 판정은 전투별 RNG(self.rng)를 사용하므로 같은 seed면 같은 전투가 재현된다.
+    """
+    def __init__(self, player_instance: Dict, enemy_instance: Dict, headless: bool = False,
+                 seed: Optional[int] = None):
+        if seed is None:
+            seed = random.getrandbits(63)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.player = BattleInstance(player_instance, is_player=True)
+        self.enemy = BattleInstance(enemy_instance, is_player=False)
+        self.turn = 0
+        self.events: List[tuple] = []  # (turn, actor, kind, amount, skill_id, detail)
+        self.max_turns = 50
+        self.winner = None
+        self.headless = headless
+        # 행동 임계값을 전투 시작 시 고정 (base MS 기준)
+        self.action_threshold = self.player.base_ms + self.enemy.base_ms
+    
+    def add_event(self, kind: str, actor: Optional[BattleInstance] = None, amount: int = 0,
+                  skill_id: Optional[str] = None, detail: tuple = ()):
+        """전투 이벤트 기록 (텍스트 변환은 render_event에서 표시할 때만)
+        
+        Args:
+            kind: 이벤트 종류 (EVENT_TEMPLATES 키 또는 "skill"/"time_loop_skill"/"attack")
+            actor: 이벤트 주체 (턴 행동자, 부활한 개체 등)
+            amount: 데미지/회복량 등 대표 수치
+            detail: 표시용 추가 값
+        """
+        if self.headless:
+            return
+        side = None if actor is None else ("player" if actor.is_player else "enemy")
+        self.events.append((self.turn, side, kind, amount, skill_id, detail))
+    
+    def add_log(self, message: str):
+        """자유 형식 로그 추가 (이벤트 종류 "text")"""
+        self.add_event("text", detail=(message,))
+    
+    @property
+    def log(self) -> List[str]:
+        """전투 로그 텍스트 (이벤트를 읽을 때마다 렌더링)"""
+        return render_events(self.events)
+    
+    def check_dodge_simple(self, defender: BattleInstance) -> bool:
+        """간단한 회피 체크 (소모 없음)"""
+        for buff in defender.buffs.of_type("dodge_count"):
+            if buff.count > 0:
+                return True
+        
+        dodge_chance = 0
+        for buff in defender.buffs.of_type("dodge_chance"):
+            dodge_chance = max(dodge_chance, buff.value)
+        
+        if dodge_chance > 0 and self.rng.random() < dodge_chance:
+            return True
+        
+        return False
+    
+    def check_and_consume_dodge(self, defender: BattleInstance) -> Optional[tuple]:
+        """회피 체크 및 회피 횟수 소모
+        
+        Returns:
+            회피 성공 시 (회피 종류, 값) - render_dodge로 표시, 실패 시 None
+        """
+        # 1. 다음 턴 회피 체크 (우선순위 높음)
+        if defender.next_turn_dodge_active:
+            dodge_chance = defender.next_turn_dodge_chance
+            roll = self.rng.random()
+            if roll < dodge_chance:
+                defender.next_turn_dodge_active = False
+                defender.next_turn_dodge_chance = 0
+                return ("chance", dodge_chance)
+            else:
+                # 회피 실패 시 플래그 초기화
+                defender.next_turn_dodge_active = False
+                defender.next_turn_dodge_chance = 0
+        
+        # 2. 횟수 기반 회피 체크
+        for buff in defender.buffs.of_type("dodge_count"):
+            if buff.count > 0:
+                buff.count -= 1
+                remaining = buff.count
+                if buff.count <= 0:
+                    # 횟수 소진 시 버프 제거
+                    defender.buffs.remove(buff)
+                    return ("last", 0)
+                return ("count", remaining)
+        
+        # 3. 확률 기반 회피 체크
+        dodge_chance = 0
+        for buff in defender.buffs.of_type("dodge_chance"):
+            dodge_chance = max(dodge_chance, buff.value)  # 최대 확률 적용
+        
+        if dodge_chance > 0 and self.rng.random() < dodge_chance:
+            return ("chance", dodge_chance)
+        
+        return None
+    
+    def apply_damage(self, attacker: BattleInstance, defender: BattleInstance, damage: int) -> int:
+        """피해 적용 (immortal 버프 체크, shield 처리, lifesteal 처리, counter 처리)"""
+        # 쉴드 먼저 처리
+        if defender.shield > 0:
+            if defender.shield >= damage:
+                defender.shield -= damage
+                return damage
+            else:
+                remaining_damage = damage - defender.shield
+                defender.shield = 0
+                damage = remaining_damage
+        
+        has_immortal = defender.buffs.has("immortal")
+        if has_immortal:
+            new_hp = defender.current_hp - damage
+            defender.current_hp = max(1, new_hp)
+        else:
+            defender.current_hp = max(0, defender.current_hp - damage)
+        
+        # lifesteal 버프 처리
+        lifesteal_buff = attacker.buffs.first("lifesteal")
+        if lifesteal_buff:
+            heal = int(damage * lifesteal_buff.value)
+            attacker.current_hp = min(attacker.max_hp, attacker.current_hp + heal)
+        
+        # counter(반격) 버프 처리 - 데미지를 받은 defender가 반격
+        counter_buff = defender.buffs.first("counter")
+        if counter_buff and defender.current_hp > 0:
+            counter_damage = int(damage * counter_buff.value)
+            # immortal 체크
+            attacker_immortal = attacker.buffs.has("immortal")
+            if attacker_immortal:
+                attacker.current_hp = max(1, attacker.current_hp - counter_damage)
+            else:
+                attacker.current_hp = max(0, attacker.current_hp - counter_damage)
+            # 로그에 반격 데미지 기록 (나중에 표시용)
+            defender.last_counter_damage = counter_damage
+        else:
+            defender.last_counter_damage = 0
+        
+        return damage
+    
+    def apply_heal(self, target: BattleInstance, heal_amount: int) -> tuple:
+        """회복 적용 (오버힐은 쉴드로 전환)
+        
+        Returns:
+            (실제 회복량, 변환된 쉴드량)
+        """
+        # 힐 차단 디버프 확인
+        if target.debuffs.has("heal_block"):
+            return 0, 0  # 회복 불가, 0 반환
+        
+        before_hp = target.current_hp
+        target.current_hp = min(target.max_hp, target.current_hp + heal_amount)
+        actual_heal = target.current_hp - before_hp
+        
+        # 오버힐 계산 (초과량의 50%만 쉴드로 변환)
+        overheal = heal_amount - actual_heal
+        if overheal > 0:
+            target.shield += int(overheal * 0.5)
+        
+        return actual_heal, overheal
+    
+    def tick_and_get_next_actor(self) -> Optional[BattleInstance]:
+        """게이지를 1틱만 진행하고 다음 행동자 반환 (ATB 시스템)
+        
+        행동 임계값 = 두 개체의 base MS 합계 (고정)
+        
+        Returns:
+            행동할 캐릭터, 아무도 행동 못하면 None
+        """
+        # 행동 임계값: 전투 시작 시 고정된 값 사용
+        action_threshold = self.action_threshold
+        
+        # 먼저 현재 게이지 확인 (증가 전)
+        player_ready = self.player.speed_gauge >= action_threshold
+        enemy_ready = self.enemy.speed_gauge >= action_threshold
+        
+        if player_ready and enemy_ready:
+            # 둘 다 준비되면 게이지가 더 높은 쪽 (동시면 랜덤)
+            if self.player.speed_gauge > self.enemy.speed_gauge:
+                self.player.speed_gauge -= action_threshold
+                return self.player
+            elif self.enemy.speed_gauge > self.player.speed_gauge:
+                self.enemy.speed_gauge -= action_threshold
+                return self.enemy
+            else:
+                actor = self.rng.choice([self.player, self.enemy])
+                actor.speed_gauge -= action_threshold
+                return actor
+        elif player_ready:
+            self.player.speed_gauge -= action_threshold
+            return self.player
+        elif enemy_ready:
+            self.enemy.speed_gauge -= action_threshold
+            return self.enemy
+        
+        # 아무도 준비 안 됐으면 게이지 증가 (1틱만 진행)
+        self.player.speed_gauge += self.player.current_ms / 10
+        self.enemy.speed_gauge += self.enemy.current_ms / 10
+        
+        return None
+    
+    def skip_idle_ticks(self) -> int:
+        """아무도 행동하지 않는 빈 틱을 한 번에 건너뜀 (이벤트 스킵 스케줄러)
+        
+        다음 행동자가 행동 임계값에 도달하는 틱까지 게이지를 바로 진행한다.
+        빈 틱에서는 상태가 바뀌지 않으므로 execute_turn/check_victory를 틱마다
+        돌릴 필요가 없다. 게이지는 틱 단위와 같은 순서로 부동소수 덧셈을 반복하므로
+        행동 순서와 동시 도달 시 판정(게이지 비교, 동률 랜덤)이 그대로 유지된다.
+        
+        Returns:
+            건너뛴 틱 수
+        """
+        action_threshold = self.action_threshold
+        player_gauge = self.player.speed_gauge
+        enemy_gauge = self.enemy.speed_gauge
+        if player_gauge >= action_threshold or enemy_gauge >= action_threshold:
+            return 0
+        
+        player_step = self.player.current_ms / 10
+        enemy_step = self.enemy.current_ms / 10
+        ticks = 0
+        while player_gauge < action_threshold and enemy_gauge < action_threshold:
+            player_gauge += player_step
+            enemy_gauge += enemy_step
+            ticks += 1
+        
+        self.player.speed_gauge = player_gauge
+        self.enemy.speed_gauge = enemy_gauge
+        return ticks
+    
+    def select_skill(self, attacker: BattleInstance) -> Optional[int]:
+        """AI 스킬 선택"""
+        available_skills = []
+        priorities = []
+        
+        for slot, skill in attacker.skills.items():
+            # 쿨다운 체크
+            if attacker.cooldowns[slot] > 0:
+                continue
+            
+            # Mystic 스킬 체크
+            if skill["grade"] == "Mystic" and slot in attacker.mystic_used:
+                continue
+            
+            priority = 0
+            hp_percent = attacker.get_hp_percent()
+            enemy = self.enemy if attacker.is_player else self.player
+            enemy_hp_percent = enemy.get_hp_percent()
+            
+            # 슬롯별 우선순위
+            if slot == 1:  # 회복 스킬
+                if hp_percent < 0.3:
+                    priority += 100
+                elif hp_percent < 0.6:
+                    priority += 50
+                else:
+                    priority += 10
+            
+            elif slot == 2:  # 공격 스킬
+                if enemy_hp_percent < 0.4:
+                    priority += 80
+                elif enemy_hp_percent > 0.8:
+                    priority += 60
+                else:
+                    priority += 40
+            
+            elif slot == 3:  # MS/유틸 스킬
+                ms_ratio = enemy.current_ms / max(1, attacker.current_ms)
+                if ms_ratio > 1.5:
+                    priority += 90
+                elif ms_ratio > 1.2:
+                    priority += 70
+                elif ms_ratio > 1.0:
+                    priority += 50
+                else:
+                    priority += 30
+            
+            # 등급 보너스
+            grade_bonus = {
+                "Normal": 5, "Rare": 10, "Epic": 15,
+                "Unique": 20, "Legendary": 25, "Mystic": 30
+            }
+            priority += grade_bonus.get(skill["grade"], 0)
+            
+            # 랜덤 요소
+            priority += self.rng.randint(-10, 10)
+            
+            available_skills.append(slot)
+            priorities.append(priority)
+        
+        if not available_skills:
+            return None
+        
+        # 가장 높은 우선순위 스킬 선택
+        max_priority_idx = priorities.index(max(priorities))
+        return available_skills[max_priority_idx]
+    
+    # ==================== 개별 효과 처리 함수들 (멀티 이펙트 시스템) ====================
+    # 반환값은 스킬 이벤트에 붙는 효과 메시지 - 헤드리스 모드에서는 포맷하지 않고 ""를 반환
+    
+    def _effect_heal(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """HP 회복 효과"""
+        if attacker.debuffs.has("heal_block"):
+            return "(힐 차단 중!)"
+        heal_amount = int(attacker.max_hp * params.get("value", 0.1))
+        actual_heal, overheal = self.apply_heal(attacker, heal_amount)
+        if self.headless:
+            return ""
+        msg = f"HP {actual_heal} 회복"
+        if overheal > 0:
+            msg += f" (쉴드 +{overheal})"
+        return msg
+    
+    def _effect_regen(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """지속 회복 버프"""
+        duration = params.get("duration", 3)
+        attacker.add_buff("regen", params.get("value", 0.05), duration)
+        if self.headless:
+            return ""
+        return f"{duration}턴간 매턴 HP {int(params.get('value', 0.05)*100)}% 회복"
+
+    def _effect_drain(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """HP 흡수"""
+        if ctx.get("dodged"):
+            return ""
+        drain_amount = int(defender.current_hp * params.get("value", 0.2))
+        # immortal 체크
+        has_immortal = defender.buffs.has("immortal")
+        if has_immortal:
+            defender.current_hp = max(1, defender.current_hp - drain_amount)
+        else:
+            defender.current_hp = max(0, defender.current_hp - drain_amount)
+        attacker.current_hp = min(attacker.max_hp, attacker.current_hp + drain_amount)
+        if self.headless:
+            return ""
+        return f"적 HP {drain_amount} 흡수"
+    
+    def _effect_heal_full(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """HP 완전 회복 (오버힐 → 쉴드 50%)"""
+        if attacker.debuffs.has("heal_block"):
+            return "(힐 차단 중!)"
+        heal_amount = attacker.max_hp  # 최대 HP 만큼 힐
+        before_hp = attacker.current_hp
+        attacker.current_hp = min(attacker.max_hp, attacker.current_hp + heal_amount)
+        actual_heal = attacker.current_hp - before_hp
+        overheal = heal_amount - actual_heal
+        shield_gain = 0
+        if overheal > 0:
+            shield_gain = int(overheal * 0.5)
+            attacker.shield += shield_gain
+        if shield_gain > 0:
+            if self.headless:
+                return ""
+            return f"HP 완전 회복 + 쉴드 {shield_gain}"
+        return "HP 완전 회복"
+    
+    def _effect_cleanse(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """디버프 제거"""
+        attacker.debuffs.clear()
+        return "모든 디버프 제거"
+    
+    def _effect_damage(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """기본 데미지"""
+        if ctx.get("dodged"):
+            return ""
+        multiplier = params.get("value", 1.0)
+        dmg = int(attacker.current_atk * multiplier)
+        self.apply_damage(attacker, defender, dmg)
+        if self.headless:
+            return ""
+        return f"{dmg} 데미지"
+    
+    def _effect_fixed_dmg_percent(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """현재 HP 비례 고정 데미지"""
+        if ctx.get("dodged"):
+            return ""
+        dmg = int(defender.current_hp * params.get("value", 0.5))
+        # immortal 체크
+        has_immortal = defender.buffs.has("immortal")
+        if has_immortal:
+            defender.current_hp = max(1, defender.current_hp - dmg)
+        else:
+            defender.current_hp = max(0, defender.current_hp - dmg)
+        if self.headless:
+            return ""
+        return f"고정 {dmg} 데미지"
+    
+    def _effect_fixed_dmg_maxhp(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """최대 HP 비례 고정 데미지"""
+        dmg = int(defender.max_hp * params.get("value", 0.3))
+        self.apply_damage(attacker, defender, dmg)
+        if self.headless:
+            return ""
+        return f"최대HP {int(params.get('value',0.3)*100)}% 고정 피해 ({dmg})"
+    
+    def _effect_multi_hit(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """다단 히트"""
+        if ctx.get("dodged"):
+            return ""
+        hits = params.get("hits", 2)
+        dmg_per = params.get("dmg_per", 0.4)
+        total_dmg = 0
+        # immortal 체크
+        has_immortal = defender.buffs.has("immortal")
+        for _ in range(hits):
+            dmg = int(attacker.current_atk * dmg_per * self.rng.uniform(0.8, 1.2))
+            if has_immortal:
+                defender.current_hp = max(1, defender.current_hp - dmg)
+            else:
+                defender.current_hp = max(0, defender.current_hp - dmg)
+            total_dmg += dmg
+        if self.headless:
+            return ""
+        return f"{hits}회 연타! 총 {total_dmg} 데미지"
+    
+    def _effect_execute(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """처형 (HP 낮을 때 강화)"""
+        if ctx.get("dodged"):
+            return ""
+        hp_threshold = params.get("hp_threshold", 0.30)
+        dmg_boost = params.get("dmg_boost", 1.2)
+        
+        if defender.current_hp <= int(defender.max_hp * hp_threshold):
+            dmg = int(attacker.current_atk * (1.0 + dmg_boost))
+            self.apply_damage(attacker, defender, dmg)
+            if self.headless:
+                return ""
+            return f"처형 발동! {dmg} 데미지 (+{int(dmg_boost*100)}%)"
+        else:
+            dmg = attacker.current_atk
+            self.apply_damage(attacker, defender, dmg)
+            if self.headless:
+                return ""
+            return f"{dmg} 데미지 (적 HP {int(hp_threshold*100)}% 이하 시 강화)"
+    
+    def _effect_crit_chance(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """확률 크리티컬"""
+        if ctx.get("dodged"):
+            return ""
+        crit_chance = params.get("value", 0.35)
+        crit_dmg = params.get("crit_dmg", 1.35)
+        crit = self.rng.random() < crit_chance
+        dmg = int(attacker.current_atk * crit_dmg) if crit else attacker.current_atk
+        self.apply_damage(attacker, defender, dmg)
+        if self.headless:
+            return ""
+        return f"크리티컬! {dmg} 데미지" if crit else f"{dmg} 데미지"
+    
+    def _effect_triple_crit(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """3회 크리티컬 판정"""
+        if ctx.get("dodged"):
+            return ""
+        crit_chance = params.get("crit_chance", 0.5)
+        crit_dmg = params.get("crit_dmg", 2.0)
+        total_dmg = 0
+        for _ in range(3):
+            if self.rng.random() < crit_chance:
+                dmg = int(attacker.current_atk * crit_dmg)
+            else:
+                dmg = attacker.current_atk
+            self.apply_damage(attacker, defender, dmg)
+            total_dmg += dmg
+        if self.headless:
+            return ""
+        return f"3회 크리티컬 판정! 총 {total_dmg} 데미지"
+    
+    def _effect_dot_dmg(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """즉시 데미지 + 지속 피해"""
+        if ctx.get("dodged"):
+            return ""
+        initial = int(attacker.current_atk * params.get("initial", 1.0))
+        self.apply_damage(attacker, defender, initial)
+        duration = params.get("duration", 3)
+        dot_value = params.get("dot_dmg", 0.2)
+        defender.add_debuff("dot_dmg", dot_value, duration)
+        if self.headless:
+            return ""
+        return f"{initial} 데미지 + {duration}턴간 지속 피해"
+    
+    def _effect_dmg_hp_based(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """적 잃은 HP 비례 추가 데미지"""
+        if ctx.get("dodged"):
+            return ""
+        missing_hp = 1.0 - defender.get_hp_percent()
+        max_bonus = params.get("max_bonus", 0.5)
+        bonus = missing_hp * max_bonus
+        dmg = int(attacker.current_atk * (1.0 + bonus))
+        self.apply_damage(attacker, defender, dmg)
+        if self.headless:
+            return ""
+        return f"{dmg} 데미지 (적 잃은 HP 비례)"
+    
+    def _effect_true_damage(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """관통 데미지 (회피 무시)"""
+        dmg = int(attacker.current_atk * params.get("value", 2.0))
+        self.apply_damage(attacker, defender, dmg)
+        if self.headless:
+            return ""
+        return f"관통 {dmg} 데미지 (회피 무시)"
+    
+    def _effect_pierce_all(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """모든 방어 무시 데미지"""
+        dmg = attacker.current_atk
+        self.apply_damage(attacker, defender, dmg)
+        if self.headless:
+            return ""
+        return f"관통 {dmg} 데미지 (모든 방어 무시)"
+    
+    def _effect_ultra_fixed(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """궁극 고정 피해"""
+        dmg = int(max(defender.current_hp, defender.max_hp) * 0.8)
+        self.apply_damage(attacker, defender, dmg)
+        if self.headless:
+            return ""
+        return f"궁극 고정 피해 {dmg}"
+    
+    def _effect_atk_grow(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """공격 시 ATK 영구 증가"""
+        if ctx.get("dodged"):
+            return ""
+        dmg = attacker.current_atk
+        self.apply_damage(attacker, defender, dmg)
+        attacker.base_atk += dmg
+        attacker.current_atk += dmg
+        if self.headless:
+            return ""
+        return f"{dmg} 데미지 + ATK 영구 +{dmg}"
+    
+    def _effect_ms_multi_hit(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """MS 기반 다단 히트"""
+        if ctx.get("dodged"):
+            return ""
+        hits = min(15, max(1, int(attacker.current_ms / 100)))
+        dmg_per = params.get("dmg_per", 0.18)
+        total_dmg = 0
+        for _ in range(hits):
+            dmg = int(attacker.current_atk * dmg_per)
+            self.apply_damage(attacker, defender, dmg)
+            total_dmg += dmg
+        if self.headless:
+            return ""
+        return f"MS 기반 {hits}회 연타! 총 {total_dmg} 데미지"
+    
+    def _effect_ms_multi_hit_double(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """MS×2 기반 다단 히트"""
+        if ctx.get("dodged"):
+            return ""
+        hits = min(15, max(1, int(attacker.current_ms / 50)))
+        dmg_per = params.get("dmg_per", 0.15)
+        total_dmg = 0
+        for _ in range(hits):
+            dmg = int(attacker.current_atk * dmg_per)
+            self.apply_damage(attacker, defender, dmg)
+            total_dmg += dmg
+        if self.headless:
+            return ""
+        return f"MS×2 기반 {hits}회 연타! 총 {total_dmg} 데미지"
+    
+    def _effect_buff(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """버프 부여"""
+        buff_type = params.get("buff_type", "atk_boost")
+        value = params.get("value", 0.3)
+        duration = params.get("duration", 3)
+        
+        # MS 버프는 base_ms 기준으로 계산
+        if buff_type == "ms_boost":
+            value = int(attacker.base_ms * params.get("value", 0.2))
+        
+        # regen 버프는 발동 턴에 즉시 회복 + 남은 턴 버프
+        if buff_type == "regen":
+            # 힐 차단 확인
+            heal_blocked = attacker.debuffs.has("heal_block")
+            if not heal_blocked:
+                immediate_heal = int(attacker.max_hp * params.get("value", 0.05))
+                actual_heal, shield_gained = self.apply_heal(attacker, immediate_heal)
+            
+            # 남은 턴에 대해 버프 추가 (tick_buffs가 먼저 실행되므로 duration 그대로 사용)
+            if duration > 1:
+                attacker.add_buff(buff_type, params.get("value", 0.05), duration)
+            
+            if self.headless:
+                return ""
+            if heal_blocked:
+                heal_msg = "(힐 차단 중!)"
+            elif shield_gained > 0:
+                heal_msg = f"HP {actual_heal} 회복 (쉴드 +{shield_gained})"
+            else:
+                heal_msg = f"HP {actual_heal} 회복"
+            if duration > 1:
+                return f"{heal_msg} + {duration - 1}턴간 추가 HP {int(params.get('value',0.05)*100)}% 회복"
+            return heal_msg
+        
+        attacker.add_buff(buff_type, value, duration)
+        if self.headless:
+            return ""
+        
+        # 버프 타입별 메시지
+        buff_names = {
+            "atk_boost": f"ATK +{int(params.get('value',0.3)*100)}%",
+            "ms_boost": f"MS +{int(params.get('value',0.2)*100)}%",
+            "def_boost": f"방어 +{int(params.get('value',0.1)*100)}%",
+            "lifesteal": f"흡혈 {int(params.get('value',0.25)*100)}%",
+            "counter": f"반격 {int(params.get('value',0.5)*100)}%",
+            "reflect": f"반사 {int(params.get('value',0.5)*100)}%",
+            "regen": f"HP {int(params.get('value',0.05)*100)}% 회복",
+            "dodge_chance": f"회피 {int(params.get('value',0.5)*100)}%",
+            "guaranteed_crit": f"확정 크리티컬 +{int(params.get('value',0.5)*100)}%",
+            "dmg_boost_once": f"데미지 +{int(params.get('value',1.5)*100)}%",
+            "double_speed": "2배속 행동",
+            "double_hit": "2회 공격",
+            "invincible": "무적",
+            "immortal": "불사",
+            "auto_revive": f"부활 HP {int(params.get('value',1.0)*100)}%",
+            "revive_once": f"1회 부활 HP {int(params.get('value',0.6)*100)}%",
+            "max_hp_grow": f"매턴 최대HP {int(params.get('value',0.05)*100)}% 증가",
+            "random_effect": "랜덤 효과",
+            "death_loop": "사망 시 턴 되돌리기",
+            "delayed_burst": "데미지 누적 후 폭발",
+            "atk_stack": f"매턴 ATK +{int(params.get('value',0.05)*100)}% 누적"
+        }
+        buff_desc = buff_names.get(buff_type, buff_type)
+        return f"{duration}턴간 {buff_desc}"
+    
+    def _effect_debuff(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """적에게 디버프"""
+        debuff_type = params.get("debuff_type", "atk_reduce")
+        value = params.get("value", 0.2)
+        duration = params.get("duration", 2)
+        defender.add_debuff(debuff_type, value, duration)
+        if self.headless:
+            return ""
+        
+        debuff_names = {
+            "atk_reduce": f"적 ATK -{int(value*100)}%",
+            "ms_reduce": f"적 MS -{int(value*100)}%",
+            "def_reduce": f"적 방어 -{int(value*100)}%",
+            "heal_block": "적 힐 차단",
+            "dot_dmg": f"적 매턴 {int(value*100)}% 피해",
+            "no_regen": "자연 회복 불가"
+        }
+        debuff_desc = debuff_names.get(debuff_type, debuff_type)
+        return f"{duration}턴간 {debuff_desc}"
+    
+    def _effect_self_debuff(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """자신에게 디버프"""
+        debuff_type = params.get("debuff_type", "vulnerability")
+        value = params.get("value", 0.3)
+        duration = params.get("duration", 5)
+        attacker.add_debuff(debuff_type, value, duration)
+        if self.headless:
+            return ""
+        
+        debuff_names = {
+            "vulnerability": f"받는 피해 +{int(value*100)}%",
+            "heal_reduce": f"회복 -{int(value*100)}%",
+            "recoil_hp": f"종료 시 HP {int(value*100)}% 손실",
+            "no_regen": "자연 회복 불가"
+        }
+        debuff_desc = debuff_names.get(debuff_type, debuff_type)
+        return f"({debuff_desc})"
+    
+    def _effect_dodge_count(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """횟수 기반 확정 회피 (chance가 있으면 확률적으로 부여)"""
+        chance = params.get("chance")
+        if chance is not None and self.rng.random() >= chance:
+            return ""
+        count = int(params.get("count", params.get("value", 1)))
+        attacker.add_buff("dodge_count", 1.0, 999, count=count)
+        if self.headless:
+            return ""
+        return f"{count}회 확정 회피"
+    
+    def _effect_next_turn_dodge(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """다음 공격 확률 회피"""
+        attacker.next_turn_dodge_active = True
+        attacker.next_turn_dodge_chance = params.get("value", 0.9)
+        if self.headless:
+            return ""
+        return f"다음 공격 {int(params.get('value', 0.9)*100)}% 회피"
+    
+    def _effect_stun(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """스턴"""
+        defender.stunned = params.get("duration", 1)
+        if self.headless:
+            return ""
+        return f"적 {params.get('duration', 1)}턴 행동 불가"
+    
+    def _effect_extra_action(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """추가 행동"""
+        attacker.speed_gauge += attacker.current_ms + defender.current_ms
+        return "추가 행동 획득"
+    
+    def _effect_hp_cost(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """HP 소모"""
+        hp_cost = int(attacker.max_hp * params.get("value", 0.1))
+        attacker.current_hp = max(1, attacker.current_hp - hp_cost)
+        if self.headless:
+            return ""
+        return f"HP {hp_cost} 소모"
+    
+    def _effect_atk_cost(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """ATK 희생"""
+        atk_cost = int(attacker.base_atk * params.get("value", 0.1))
+        attacker.current_atk = max(1, attacker.current_atk - atk_cost)
+        if self.headless:
+            return ""
+        return f"ATK {atk_cost} 희생"
+    
+    def _effect_max_hp_increase(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """최대 HP 증가"""
+        hp_increase = int(attacker.max_hp * params.get("value", 0.1))
+        attacker.max_hp += hp_increase
+        if self.headless:
+            return ""
+        return f"최대HP +{hp_increase}"
+    
+    def _effect_atk_perma_increase(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """ATK 영구 증가"""
+        atk_increase = int(attacker.base_atk * params.get("value", 0.15))
+        attacker.base_atk += atk_increase
+        attacker.current_atk += atk_increase
+        if self.headless:
+            return ""
+        return f"ATK 영구 +{int(params.get('value',0.15)*100)}%"
+    
+    def _effect_hp_swap(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """HP 교환"""
+        temp_hp = attacker.current_hp
+        attacker.current_hp = defender.current_hp
+        defender.current_hp = temp_hp
+        if self.headless:
+            return ""
+        return f"HP 교환 (아군 {attacker.current_hp}, 적군 {defender.current_hp})"
+    
+    def _effect_stat_swap(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """모든 스탯 교환 (base 포함 - apply_buffs에서 리셋되므로)"""
+        # max_hp 교환
+        temp_max_hp = attacker.max_hp
+        attacker.max_hp = defender.max_hp
+        defender.max_hp = temp_max_hp
+        
+        # base 스탯 교환 (apply_buffs에서 리셋되므로 base도 교환해야 함)
+        temp_base_atk, temp_base_ms = attacker.base_atk, attacker.base_ms
+        attacker.base_atk, attacker.base_ms = defender.base_atk, defender.base_ms
+        defender.base_atk, defender.base_ms = temp_base_atk, temp_base_ms
+        
+        # current 스탯 교환
+        temp_hp, temp_atk, temp_ms = attacker.current_hp, attacker.current_atk, attacker.current_ms
+        attacker.current_hp, attacker.current_atk, attacker.current_ms = defender.current_hp, defender.current_atk, defender.current_ms
+        defender.current_hp, defender.current_atk, defender.current_ms = temp_hp, temp_atk, temp_ms
+        return "모든 스탯 교환"
+    
+    def _effect_rewind(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """시간 역행"""
+        heal = int(attacker.max_hp * 0.5)
+        attacker.current_hp = min(attacker.max_hp, attacker.current_hp + heal)
+        for slot in attacker.cooldowns:
+            attacker.cooldowns[slot] = max(0, attacker.cooldowns[slot] - 1)
+        if self.headless:
+            return ""
+        return f"HP {heal} 회복 + 쿨다운 1턴 감소"
+    
+    def _effect_drain_maxhp(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """적 최대HP 흡수"""
+        drain = int(defender.max_hp * params.get("value", 0.15))
+        defender.max_hp = max(1, defender.max_hp - drain)
+        defender.current_hp = min(defender.current_hp, defender.max_hp)
+        attacker.max_hp += drain
+        attacker.current_hp += drain 
+        if self.headless:
+            return ""
+        return f"최대HP {drain} 흡수"
+    
+    def _effect_instant_atk(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
+        """즉발 공격"""
+        if ctx.get("dodged"):
+            return ""
+        dmg = int(attacker.current_atk * params.get("dmg_percent", 0.8))
+        self.apply_damage(attacker, defender, dmg)
+        if self.headless:
+            return ""
+        return f"즉발 {dmg} 데미지"
+    
+    def use_skill(self, attacker: BattleInstance, skill_slot: int, event_kind: str = "skill"):
+        """스킬 사용 (멀티 이펙트 시스템) - 결과는 event_kind 이벤트로 기록
+        
+        이벤트 amount는 상대 HP 감소량, detail은 (자신 HP 회복량, 상태, 회피 정보, 효과 메시지들)
+        """
+        if skill_slot not in attacker.skills:
+            self.add_event(event_kind, attacker, detail=(0, "missing", None, ()))
+            return
+        
+        skill = attacker.skills[skill_slot]
+        defender = self.enemy if attacker.is_player else self.player
+        headless = self.headless
+        attacker_hp, defender_hp = attacker.current_hp, defender.current_hp
+        
+        # 쿨다운 설정
+        attacker.cooldowns[skill_slot] = skill.get("cooldown", 3)
+        
+        # Mystic 스킬 마킹
+        if skill.get("grade") == "Mystic":
+            attacker.mystic_used.add(skill_slot)
+        
+        # 컴파일된 효과 목록 (스킬 마스터 로드 시 정규화/컴파일 완료)
+        compiled = attacker.compiled_skills[skill_slot]
+        records = compiled["records"]
+        
+        if not records:
+            if not headless:
+                self.add_event(event_kind, attacker, skill_id=attacker.original[f"accessory_{skill_slot}"]["id"],
+                               detail=(0, "no_effects", None, ()))
+            return
+        
+        # 회피 체크 (공격 효과가 있는 경우만)
+        ctx = {"dodged": False}
+        dodged = None
+        if compiled["has_attack"]:
+            if self.check_dodge_simple(defender):
+                # 간단 체크는 통과했지만 소모 체크 확률에서 실패할 수 있음 ("miss")
+                dodged = self.check_and_consume_dodge(defender) or ("miss", 0)
+                ctx["dodged"] = True
+        
+        # 각 효과 순차 처리
+        effect_results = []
+        for handler, params, hp_threshold, _ in records:
+            # 조건 체크 (hp_below_XX)
+            if hp_threshold is not None and attacker.get_hp_percent() > hp_threshold:
+                if not headless:
+                    effect_results.append(f"(HP {int(hp_threshold*100)}% 이하 시 발동)")
+                continue
+            
+            # 핸들러 실행
+            if handler is not None:
+                msg = handler(self, attacker, defender, params, ctx)
+                if msg and not headless:
+                    effect_results.append(msg)
+            elif not headless:
+                # 알 수 없는 효과
+                effect_results.append(f"효과 발동")
+        
+        # 버프/디버프로 인한 스탯 변경사항 즉시 반영
+        attacker.apply_buffs()
+        defender.apply_buffs()
+        
+        if not headless:
+            skill_id = attacker.original[f"accessory_{skill_slot}"]["id"]
+            self.add_event(event_kind, attacker, max(0, defender_hp - defender.current_hp), skill_id,
+                           (max(0, attacker.current_hp - attacker_hp), "ok", dodged, tuple(effect_results)))
+    
+    def basic_attack(self, attacker: BattleInstance):
+        """기본 공격 - 결과는 "attack" 계열 이벤트로 기록"""
+        defender = self.enemy if attacker.is_player else self.player
+        
+        # 회피 체크
+        dodged = self.check_and_consume_dodge(defender)
+        if dodged:
+            self.add_event("attack_dodged", attacker, detail=dodged)
+            return
+        
+        # 데미지 계산
+        base_dmg = attacker.current_atk * self.rng.uniform(0.8, 1.2)
+        
+        # dmg_boost_once 버프 적용 (1턴 데미지 증가)
+        dmg_boost_buff = attacker.buffs.first("dmg_boost_once")
+        if dmg_boost_buff:
+            base_dmg *= (1.0 + dmg_boost_buff.value)
+            attacker.buffs.remove(dmg_boost_buff)  # 1회 사용 후 제거
+        
+        # guaranteed_crit 버프 적용 (확정 크리티컬)
+        crit_buff = attacker.buffs.first("guaranteed_crit")
+        if crit_buff:
+            base_dmg *= (1.0 + crit_buff.value)
+        
+        # 방어 감소 적용
+        def_modifier = 1.0
+        for debuff in defender.debuffs.of_type("def_reduce"):
+            def_modifier += debuff.value
+        
+        final_dmg = int(base_dmg * def_modifier)
+        final_dmg = max(1, final_dmg)
+        
+        # 무적 체크
+        if defender.invincible > 0:
+            self.add_event("attack_blocked", attacker)
+            return
+        
+        # double_hit 버프 체크 (2회 공격)
+        double_hit_buff = attacker.buffs.first("double_hit")
+        hit_count = 2 if double_hit_buff else 1
+        
+        total_dmg = 0
+        for i in range(hit_count):
+            # 피해 적용 (쉴드 처리 포함)
+            actual_dmg = self.apply_damage(attacker, defender, final_dmg)
+            total_dmg += actual_dmg
+            
+            # delayed_burst 버프 체크 (데미지 누적)
+            burst_buff = attacker.buffs.first("delayed_burst")
+            if burst_buff:
+                attacker.delayed_damage += actual_dmg
+        
+        # 반사 데미지
+        reflect_dmg = 0
+        for buff in defender.buffs.of_type("reflect"):
+            reflect_dmg += int(total_dmg * buff.value)
+        
+        if not self.headless:
+            # 쉴드로 막았는지 체크
+            shield_blocked = defender.shield > 0 or (final_dmg > total_dmg)
+            self.add_event("attack", attacker, total_dmg,
+                           detail=(hit_count, shield_blocked, defender.last_counter_damage, reflect_dmg))
+        
+        if reflect_dmg > 0:
+            self._apply_reflect_damage(attacker, reflect_dmg)
+    
+    def _apply_reflect_damage(self, attacker: BattleInstance, reflect_dmg: int):
+        """반사 데미지 적용 (immortal 체크)"""
+        attacker_immortal = attacker.buffs.has("immortal")
+        if attacker_immortal:
+            attacker.current_hp = max(1, attacker.current_hp - reflect_dmg)
+        else:
+            attacker.current_hp = max(0, attacker.current_hp - reflect_dmg)
+    
+    def execute_turn(self, skip_idle: bool = False):
+        """턴 실행 (1명의 행동) - 행동자가 있을 때만 호출
+        
+        Args:
+            skip_idle: True면 빈 틱을 건너뛰고 바로 다음 행동자의 행동까지 진행
+                       (False면 1틱만 진행 - 전투 화면 게이지 애니메이션용)
+        """
+        # first_strike 플래그 처리 (게이지 우선 설정) - 상대보다 높게
+        if self.player.next_turn_first_strike:
+            # 상대 게이지보다 높게 설정 (최소 100)
+            self.player.speed_gauge = max(100, self.enemy.speed_gauge + 1)
+            self.player.next_turn_first_strike = False
+        if self.enemy.next_turn_first_strike:
+            # 상대 게이지보다 높게 설정 (최소 100)
+            self.enemy.speed_gauge = max(100, self.player.speed_gauge + 1)
+            self.enemy.next_turn_first_strike = False
+        
+        # 버프/디버프 적용
+        self.player.apply_buffs()
+        self.enemy.apply_buffs()
+        
+        # 빈 틱 건너뛰기 (행동자가 나올 때까지 게이지 일괄 진행)
+        if skip_idle:
+            self.skip_idle_ticks()
+        
+        # 다음 행동자 결정 (게이지 시스템)
+        actor = self.tick_and_get_next_actor()
+        
+        if not actor:
+            # 아무도 행동하지 않음 (게이지만 증가)
+            return False
+        
+        # 실제 행동 발생 - 턴 증가
+        self.turn += 1
+        
+        headless = self.headless
+        if not headless:
+            self.add_event("turn_start", actor)
+        
+        # 턴 시작 시 버프/디버프 지속시간 감소 (이전 턴에 받은 효과 소진)
+        # 스턴 체크 (tick_buffs 전에 체크하여 정확한 지속시간 반영)
+        if actor.stunned > 0:
+            if not headless:
+                self.add_event("stunned", actor)
+            actor.stunned -= 1
+            return True
+        
+        # 턴 시작 효과 (버프 지속시간 감소, 지속 회복, 누적 폭발 등)
+        self._apply_turn_start_effects(actor)
+        
+        # 스킬 선택 후 행동 (스킬, 기본 공격, 추가 행동, DoT)
+        self._take_action(actor, self.select_skill(actor))
+        
+        return True  # 행동 발생함
+    
+    def _take_action(self, actor: BattleInstance, skill_slot: Optional[int]):
+        """턴 시작 처리 이후의 행동 (스킬 사용, 기본 공격, 2배속 추가 공격, 턴 종료 DoT)
+        
+        탐색형 AI(battle_ai)가 후보 스킬별로 같은 턴을 미리 진행해 볼 때도 사용한다.
+        """
+        # 스킬 사용
+        if skill_slot:
+            self.use_skill(actor, skill_slot)
+        
+        # 기본 공격
+        self.basic_attack(actor)
+        
+        # double_speed 버프 체크 (2배속 - 추가 행동)
+        double_speed_buff = actor.buffs.first("double_speed")
+        if double_speed_buff:
+            if not self.headless:
+                self.add_event("extra_action", actor)
+            # 추가 기본 공격
+            self.basic_attack(actor)
+        
+        # 턴 종료 후 DoT 데미지 처리 (상대방)
+        self._apply_dot_damage(actor)
+    
+    def _apply_turn_start_effects(self, actor: BattleInstance):
+        """행동자의 턴 시작 처리 (버프 지속시간 감소, 지속 회복/최대HP 증가/랜덤 효과, 누적 폭발)"""
+        headless = self.headless
+        
+        actor.tick_buffs()
+        
+        # 턴 시작 효과 (지속 회복 등) - 행동자만
+        for buff in actor.buffs:
+            if buff and buff.type == "regen":
+                # 힐 차단 디버프 확인
+                if actor.debuffs.has("heal_block"):
+                    if not headless:
+                        self.add_event("regen_blocked", actor)
+                    continue
+                heal = int(actor.max_hp * buff.value)
+                actor.current_hp = min(actor.max_hp, actor.current_hp + heal)
+                if not headless:
+                    self.add_event("regen", actor, heal)
+            
+            # max_hp_grow 버프 처리 (매턴 최대HP 증가)
+            elif buff and buff.type == "max_hp_grow":
+                hp_increase = int(actor.max_hp * buff.value)
+                actor.max_hp += hp_increase
+                actor.current_hp += hp_increase  # 현재 HP도 함께 증가
+                if not headless:
+                    self.add_event("max_hp_grow", actor, hp_increase)
+            
+            # random_effect 버프 처리
+            elif buff and buff.type == "random_effect":
+                self._apply_random_effect(actor)
+        
+        # delayed_burst 폭발 체크 (버프 duration이 0이 되면 폭발)
+        burst_buff = next((b for b in actor.buffs.of_type("delayed_burst") if b.duration <= 0), None)
+        if burst_buff and actor.delayed_damage > 0:
+            opponent = self.enemy if actor.is_player else self.player
+            burst_dmg = actor.delayed_damage
+            # immortal 체크
+            has_immortal = opponent.buffs.has("immortal")
+            if has_immortal:
+                opponent.current_hp = max(1, opponent.current_hp - burst_dmg)
+            else:
+                opponent.current_hp = max(0, opponent.current_hp - burst_dmg)
+            self.add_event("burst", actor, burst_dmg)
+            actor.delayed_damage = 0
+    
+    def _apply_dot_damage(self, actor: BattleInstance):
+        """행동 후 상대방에게 걸린 DoT 디버프 데미지 적용"""
+        headless = self.headless
+        opponent = self.enemy if actor.is_player else self.player
+        
+        # 상대방의 DoT 디버프 처리
+        for debuff in opponent.debuffs.of_type("dot_dmg"):
+            # immortal 버프 확인
+            has_immortal = opponent.buffs.has("immortal")
+            dot_damage = int(opponent.max_hp * debuff.value)
+            
+            if has_immortal:
+                # immortal 중이면 HP 최소 1 보장
+                opponent.current_hp = max(1, opponent.current_hp - dot_damage)
+                if not headless:
+                    self.add_event("dot_immortal", actor, dot_damage, detail=(opponent.current_hp,))
+            else:
+                opponent.current_hp = max(0, opponent.current_hp - dot_damage)
+                if not headless:
+                    self.add_event("dot", actor, dot_damage, detail=(opponent.current_hp,))
+    
+    def _apply_random_effect(self, actor: BattleInstance):
+        """랜덤 효과 적용"""
+        effects = [
+            ("heal", 0.1),      # HP 10% 회복
+            ("atk_boost", 0.2), # ATK 20% 증가
+            ("ms_boost", 0.3),  # MS 30% 증가
+            ("shield", 0.1),    # 쉴드 10%
+            ("damage", 0.15),   # 적에게 15% 데미지
+        ]
+        effect_type, value = self.rng.choice(effects)
+        
+        if effect_type == "heal":
+            heal = int(actor.max_hp * value)
+            actor.current_hp = min(actor.max_hp, actor.current_hp + heal)
+            self.add_event("random_heal", actor, heal)
+        elif effect_type == "atk_boost":
+            actor.add_buff("atk_boost", value, 1)
+            self.add_event("random_atk", actor, int(value*100))
+        elif effect_type == "ms_boost":
+            ms_boost = int(actor.base_ms * value)
+            actor.add_buff("ms_boost", ms_boost, 1)
+            self.add_event("random_ms", actor, int(value*100))
+        elif effect_type == "shield":
+            shield = int(actor.max_hp * value)
+            actor.shield += shield
+            self.add_event("random_shield", actor, shield)
+        elif effect_type == "damage":
+            opponent = self.enemy if actor.is_player else self.player
+            dmg = int(opponent.current_hp * value)
+            # immortal 체크
+            has_immortal = opponent.buffs.has("immortal")
+            if has_immortal:
+                opponent.current_hp = max(1, opponent.current_hp - dmg)
+            else:
+                opponent.current_hp = max(0, opponent.current_hp - dmg)
+            self.add_event("random_attack", actor, dmg)
+    
+    def check_victory(self) -> bool:
+        """승패 판정"""
+        # 플레이어 부활 체크
+        if self.player.current_hp <= 0:
+            # 1. death_loop 체크 (Time Loop: 부활 + 슬롗1,2 발동)
+            death_loop_buff = self.player.buffs.first("death_loop")
+            if death_loop_buff:
+                # HP 50% 부활
+                revive_hp = int(self.player.max_hp * 0.5)
+                self.player.current_hp = max(1, revive_hp)
+                # death_loop 버프 제거
+                self.player.buffs.remove_type("death_loop")
+                self.add_event("time_loop", self.player, self.player.current_hp)
+                
+                # 슬롗1, 슬롗2 쿨다운 초기화 후 발동
+                for slot in [1, 2]:
+                    skill_id = getattr(self.player, f"skill_{slot}_id", None)
+                    if skill_id:
+                        self.player.cooldowns[slot] = 0  # 쿨다운 초기화
+                        self.use_skill(self.player, slot, event_kind="time_loop_skill")
+                
+                return False
+            
+            # 2. revive_once 체크 (1회 부활)
+            revive_buff = self.player.buffs.first("revive_once")
+            if revive_buff:
+                revive_hp = int(self.player.max_hp * revive_buff.value)
+                self.player.current_hp = max(1, revive_hp)
+                self.player.buffs.remove_type("revive_once")
+                self.add_event("revive", self.player, self.player.current_hp)
+                return False
+            
+            # 2. auto_revive 체크 (전투당 1회)
+            auto_revive_buff = self.player.buffs.first("auto_revive")
+            if auto_revive_buff and hasattr(self.player, 'auto_revive_used') and not self.player.auto_revive_used:
+                revive_hp = int(self.player.max_hp * auto_revive_buff.value)
+                self.player.current_hp = max(1, revive_hp)
+                self.player.auto_revive_used = True  # 한 번만 사용
+                # 참고: 예전엔 읽는 곳이 없는 skill_N_cooldown 속성만 0으로 써서
+                # 실제 쿨다운(cooldowns)은 초기화되지 않았음 - 결과 유지를 위해 그대로 둠
+                self.add_event("auto_revive", self.player, self.player.current_hp)
+                return False
+        
+        # 적 부활 체크
+        if self.enemy.current_hp <= 0:
+            # 1. death_loop 체크 (Time Loop: 부활 + 슬롗1,2 발동)
+            death_loop_buff = self.enemy.buffs.first("death_loop")
+            if death_loop_buff:
+                # HP 50% 부활
+                revive_hp = int(self.enemy.max_hp * 0.5)
+                self.enemy.current_hp = max(1, revive_hp)
+                # death_loop 버프 제거
+                self.enemy.buffs.remove_type("death_loop")
+                self.add_event("time_loop", self.enemy, self.enemy.current_hp)
+                
+                # 슬롗1, 슬롗2 쿨다운 초기화 후 발동
+                for slot in [1, 2]:
+                    skill_id = getattr(self.enemy, f"skill_{slot}_id", None)
+                    if skill_id:
+                        self.enemy.cooldowns[slot] = 0  # 쿨다운 초기화
+                        self.use_skill(self.enemy, slot, event_kind="time_loop_skill")
+                
+                return False
+            
+            # 2. revive_once 체크
+            revive_buff = self.enemy.buffs.first("revive_once")
+            if revive_buff:
+                revive_hp = int(self.enemy.max_hp * revive_buff.value)
+                self.enemy.current_hp = max(1, revive_hp)
+                self.enemy.buffs.remove_type("revive_once")
+                self.add_event("revive", self.enemy, self.enemy.current_hp)
+                return False
+            
+            # 2. auto_revive 체크
+            auto_revive_buff = self.enemy.buffs.first("auto_revive")
+            if auto_revive_buff and hasattr(self.enemy, 'auto_revive_used') and not self.enemy.auto_revive_used:
+                revive_hp = int(self.enemy.max_hp * auto_revive_buff.value)
+                self.enemy.current_hp = max(1, revive_hp)
+                self.enemy.auto_revive_used = True
+                # 참고: 예전엔 읽는 곳이 없는 skill_N_cooldown 속성만 0으로 써서
+                # 실제 쿨다운(cooldowns)은 초기화되지 않았음 - 결과 유지를 위해 그대로 둠
+                self.add_event("auto_revive", self.enemy, self.enemy.current_hp)
+                return False
+        
+        # 부활이 없으면 일반 승패 판정
+        if self.player.current_hp <= 0 and self.enemy.current_hp <= 0:
+            self.winner = "draw"
+            self.add_event("draw")
+            return True
+        elif self.player.current_hp <= 0:
+            self.winner = "enemy"
+            self.add_event("victory", self.enemy)
+            return True
+        elif self.enemy.current_hp <= 0:
+            self.winner = "player"
+            self.add_event("victory", self.player)
+            return True
+        elif self.turn >= self.max_turns:
+            # 타임아웃 시 무조건 패배
+            self.winner = "enemy"
+            self.add_event("timeout")
+            return True
+        return False
+    
+    def add_start_events(self):
+        """전투 시작 로그 (참가자 정보)"""
+        self.add_event("battle_start")
+        for side in (self.player, self.enemy):
+            self.add_event("combatant", side, detail=(side.original['name'], side.max_hp, side.base_atk, side.base_ms))
+    
+    def step(self, skip_idle: bool = True) -> bool:
+        """승패 판정 사이의 전투 진행 1단계 (run_battle, run_timeline, 탐색형 AI 공용)
+        
+        skip_idle=True여도 빈 틱은 시간 초과 전이고 양쪽 모두 HP가 남아 있을 때만 건너뛴다.
+        마지막 턴이거나, 부활 직후 한쪽이 쓰러진 채 남아 있으면 틱 단위 진행은 1틱 뒤에
+        승패를 판정하므로 여기서도 1틱만 진행한다. 그래서 skip_idle과 관계없이 같은 seed면
+        전투 결과가 같다 (analysis.battle_golden verify가 두 방식을 비교).
+        
+        Returns:
+            행동 발생 여부
+        """
+        skip_idle = (skip_idle and self.turn < self.max_turns
+                     and self.player.current_hp > 0 and self.enemy.current_hp > 0)
+        return self.execute_turn(skip_idle=skip_idle)
+    
+    def run_battle(self, skip_idle: bool = True):
+        """전투 실행
+        
+        Args:
+            skip_idle: False면 전투 화면(run_timeline)처럼 1틱씩 진행 (결과는 같고 느림)
+        """
+        if not self.headless:
+            self.add_start_events()
+        
+        while not self.check_victory():
+            self.step(skip_idle)
+        
+        return self.winner, self.log
+    
+    def run_timeline(self) -> List[list]:
+        """틱 단위로 전투를 끝까지 실행하고 화면 재생용 타임라인 반환
+        
+        run_battle과 같은 step()을 1틱씩(skip_idle=False) 호출하므로 같은 seed면 결과가 같다.
+        프레임은 TIMELINE_FIELDS 순서의 리스트이며, event_count는 해당 틱까지 쌓인 이벤트 수
+        (render_events(self.events)[:event_count]가 그 시점의 로그).
+        """
+        self.add_start_events()
+        threshold = self.action_threshold or 1
+        player, enemy = self.player, self.enemy
+        frames = []
+        
+        while not self.check_victory():
+            action = self.step(skip_idle=False)
+            frames.append([
+                self.turn,
+                round(min(100, player.speed_gauge / threshold * 100), 1),
+                round(min(100, enemy.speed_gauge / threshold * 100), 1),
+                player.current_hp, player.max_hp, player.shield,
+                enemy.current_hp, enemy.max_hp, enemy.shield,
+                1 if action else 0,
+                len(self.events)
+            ])
+        
+        # 승패 이벤트까지 포함한 마지막 프레임
+        if frames:
+            frames[-1][-1] = len(self.events)
+        return frames
+    
+    def snapshot(self) -> tuple:
+        """전투 전체 상태 저장 (되감기/미리보기 시뮬레이션용, deepcopy 없음)
+        
+        이벤트는 개수만 저장한다 (restore 시 이후 이벤트를 잘라냄).
+        전투 RNG 상태도 포함하므로 복원 후 같은 행동을 하면 같은 결과가 나온다.
+        """
+        return (self.turn, self.winner, len(self.events), self.rng.getstate(),
+                self.player.snapshot(), self.enemy.snapshot())
+    
+    def restore(self, state: tuple):
+        """snapshot() 시점의 전투 상태로 되돌림"""
+        self.turn, self.winner, event_count, rng_state, player_state, enemy_state = state
+        del self.events[event_count:]
+        self.rng.setstate(rng_state)
+        self.player.restore(player_state)
+        self.enemy.restore(enemy_state)
+    
+    def get_summary(self) -> Dict:
+        """전투 결과 요약 (승자, 최종 HP, 턴 수)"""
+        return {
+            "winner": self.winner,
+            "player_final_hp": self.player.current_hp,
+            "enemy_final_hp": self.enemy.current_hp,
+            "turns": self.turn
+        }
+
+
+# ============================================================================
+# 전투 이벤트 렌더링 / 집계
+# ============================================================================
+# 이벤트: (turn, actor, kind, amount, skill_id, detail)
+#   actor: "player" / "enemy" / None, amount: 데미지/회복량 등 대표 수치
+
+# Battle.run_timeline 프레임 필드 순서 (JSON 크기를 줄이려고 dict 대신 리스트 사용)
+TIMELINE_FIELDS = ("turn", "player_gauge", "enemy_gauge",
+                   "player_hp", "player_max_hp", "player_shield",
+                   "enemy_hp", "enemy_max_hp", "enemy_shield",
+                   "action", "event_count")
+
+# 화면 재생 프레임 예산 (10fps 기준 약 30초, 행동 프레임 대기 시간 제외)
+TIMELINE_FPS = 10
+TIMELINE_MAX_FRAMES = 300
+
+SIDE_NAMES = {"player": "아군", "enemy": "적군", None: ""}
+OPPONENT_SIDE = {"player": "enemy", "enemy": "player", None: None}
+
+# 단순 이벤트 텍스트 ({name}: 주체, {opponent}: 상대, {amount}, {0}...: detail)
+EVENT_TEMPLATES = {
+    "text": "{0}",
+    "battle_start": "=== 전투 시작! ===",
+    "combatant": "{name}: {0} (HP: {1}, ATK: {2}, MS: {3})",
+    "turn_start": "=== {name}의 턴 ===",
+    "stunned": "{name}은(는) 행동 불가!",
+    "regen_blocked": "{name} 지속 회복 차단 (힐 차단 중)",
+    "regen": "{name} HP {amount} 회복 (지속 회복)",
+    "max_hp_grow": "{name} 최대HP +{amount} (성장)",
+    "burst": "💥 {name} 누적 데미지 폭발! {opponent}에게 {amount} 데미지!",
+    "extra_action": "⚡ {name} 2배속 추가 행동!",
+    "attack_blocked": "{name}의 공격! 하지만 {opponent}은(는) 무적 상태!",
+    "dot": "{opponent} DoT {amount} 데미지! (HP: {0})",
+    "dot_immortal": "{opponent} DoT {amount} 데미지! (불멸 상태, HP: {0})",
+    "random_heal": "🎲 {name} 랜덤 회복! HP +{amount}",
+    "random_atk": "🎲 {name} 랜덤 ATK +{amount}%!",
+    "random_ms": "🎲 {name} 랜덤 MS +{amount}%!",
+    "random_shield": "🎲 {name} 랜덤 쉴드 +{amount}!",
+    "random_attack": "🎲 {name} 랜덤 공격! {opponent}에게 {amount} 데미지!",
+    "time_loop": "⏰ {name} Time Loop 발동! HP {amount}로 부활!",
+    "revive": "{name}이 부활했습니다! (HP: {amount})",
+    "auto_revive": "{name}이 자동으로 부활했습니다! (HP: {amount}) + 모든 스킬 쿨다운 초기화",
+    "draw": "무승부!",
+    "victory": "{name} 승리!",
+    "timeout": "시간 초과! 전투 실패!",
+}
+
+
+def render_dodge(defender_name: str, dodged: tuple) -> str:
+    """check_and_consume_dodge 결과 → 회피 메시지"""
+    dodge_type, value = dodged
+    if dodge_type == "miss":
+        # 간단 체크만 통과한 경우 (효과는 회피 처리됨)
+        return f"{defender_name}이(가) 공격을 회피했다!"
+    if dodge_type == "last":
+        return f"{defender_name}이(가) 공격을 회피했다! (마지막 회피!)"
+    if dodge_type == "count":
+        return f"{defender_name}이(가) 공격을 회피했다! (남은 회피: {value}회)"
+    return f"{defender_name}이(가) 공격을 회피했다! ({int(value*100)}% 확률)"
+
+
+def render_event(event: tuple) -> str:
+    """이벤트 1개 → 로그 한 줄"""
+    turn, actor, kind, amount, skill_id, detail = event
+    name = SIDE_NAMES[actor]
+    opponent = SIDE_NAMES[OPPONENT_SIDE[actor]]
+    
+    if kind == "skill" or kind == "time_loop_skill":
+        _, status, dodged, effect_results = detail
+        if status == "missing":
+            text = "스킬 없음"
+        else:
+            skill_name = get_skill_master().get(skill_id, {}).get("name", skill_id)
+            text = f"{name}이(가) '{skill_name}' 사용!"
+            if status == "no_effects":
+                text += " 효과 발동!"
+            if dodged:
+                text += f" -> {render_dodge(opponent, dodged)}"
+            if effect_results:
+                text += " " + " + ".join(effect_results) + "!"
+        if kind == "time_loop_skill":
+            text = f"⏰ {text}"
+    elif kind == "attack":
+        hit_count, shield_blocked, counter_dmg, reflect_dmg = detail
+        if hit_count > 1:
+            text = f"{name}의 2회 공격! {opponent}에게 총 {amount} 데미지!"
+        elif shield_blocked:
+            text = f"{name}의 공격! {opponent}에게 {amount} 데미지! 🛡️"
+        else:
+            text = f"{name}의 공격! {opponent}에게 {amount} 데미지!"
+        if counter_dmg > 0:
+            text += f" ⚔️ 반격 {counter_dmg}!"
+        if reflect_dmg > 0:
+            text += f" 반사 {reflect_dmg} 데미지!"
+    elif kind == "attack_dodged":
+        text = render_dodge(opponent, detail)
+    else:
+        text = EVENT_TEMPLATES[kind].format(*detail, name=name, opponent=opponent, amount=amount)
+    
+    return f"턴 {turn}: {text}"
+
+
+def render_events(events: List[tuple]) -> List[str]:
+    """이벤트 목록 → 로그 텍스트 목록 (표시할 때만 호출)"""
+    return [render_event(event) for event in events]
+
+
+def summarize_events(events: List[tuple]) -> Dict[str, Dict]:
+    """전투 후 통계 집계 (진영별 스킬/공격 데미지와 회복 총량)
+    
+    Returns:
+        {"player"/"enemy": {"damage": 총 데미지, "heal": 총 회복,
+                           "damage_by_source": {스킬 ID 또는 "basic_attack"/"dot"/...: 데미지}}}
+    """
+    summary = {side: {"damage": 0, "heal": 0, "damage_by_source": {}} for side in ("player", "enemy")}
+    for _, actor, kind, amount, skill_id, detail in events:
+        if actor is None:
+            continue
+        stats = summary[actor]
+        if kind == "skill" or kind == "time_loop_skill":
+            source, heal = skill_id, detail[0]
+        elif kind == "attack":
+            source, heal = "basic_attack", 0
+        elif kind in ("dot", "dot_immortal"):
+            source, heal = "dot", 0
+        elif kind == "burst":
+            source, heal = "delayed_burst", 0
+        elif kind == "random_attack":
+            source, heal = "random_effect", 0
+        elif kind in ("regen", "random_heal"):
+            source, heal = None, amount
+        else:
+            continue
+        if source is not None and amount > 0:
+            stats["damage"] += amount
+            stats["damage_by_source"][source] = stats["damage_by_source"].get(source, 0) + amount
+        stats["heal"] += heal
+    return summary
+
+
+def coalesce_timeline(frames: List[list], max_frames: int = TIMELINE_MAX_FRAMES) -> List[list]:
+    """타임라인을 프레임 예산 안으로 압축 (재생 시간/전송 크기 제한)
+    
+    연속한 틱을 stride개씩 묶어 마지막 틱 상태만 남긴다. 프레임 값(HP/게이지/이벤트 수)은
+    그 시점의 누적 상태라서 중간 틱을 버려도 화면이 어긋나지 않고, 묶음 안에 행동이 하나라도
+    있으면 action=1로 합친다. 이미 예산 안이면 그대로 반환한다.
+    """
+    if len(frames) <= max_frames:
+        return frames
+    stride = -(-len(frames) // max_frames)
+    action_index = TIMELINE_FIELDS.index("action")
+    merged = []
+    for start in range(0, len(frames), stride):
+        group = frames[start:start + stride]
+        frame = list(group[-1])
+        frame[action_index] = 1 if any(f[action_index] for f in group) else 0
+        merged.append(frame)
+    return merged
+
+
+# ============================================================================
+# 스킬 스키마 정규화 / 효과 컴파일
+# ============================================================================
+
+# 효과 타입별 처리 함수 맵핑 (Battle 메서드, handler(battle, attacker, defender, params, ctx))
+EFFECT_HANDLERS: Dict[str, Callable] = {
+    # 회복 계열
+    "heal": Battle._effect_heal,
+    "regen": Battle._effect_regen,
+    "drain": Battle._effect_drain,
+    "heal_full": Battle._effect_heal_full,
+    "cleanse": Battle._effect_cleanse,
+    
+    # 데미지 계열
+    "damage": Battle._effect_damage,
+    "fixed_dmg_percent": Battle._effect_fixed_dmg_percent,
+    "fixed_dmg_maxhp": Battle._effect_fixed_dmg_maxhp,
+    "multi_hit": Battle._effect_multi_hit,
+    "execute": Battle._effect_execute,
+    "crit_chance": Battle._effect_crit_chance,
+    "triple_crit": Battle._effect_triple_crit,
+    "dot_dmg": Battle._effect_dot_dmg,
+    "dmg_hp_based": Battle._effect_dmg_hp_based,
+    "true_damage": Battle._effect_true_damage,
+    "pierce_all": Battle._effect_pierce_all,
+    "ultra_fixed": Battle._effect_ultra_fixed,
+    "atk_grow": Battle._effect_atk_grow,
+    "ms_multi_hit": Battle._effect_ms_multi_hit,
+    "ms_multi_hit_double": Battle._effect_ms_multi_hit_double,
+    "instant_atk": Battle._effect_instant_atk,
+    
+    # 버프/디버프 계열
+    "buff": Battle._effect_buff,
+    "debuff": Battle._effect_debuff,
+    "self_debuff": Battle._effect_self_debuff,
+    "dodge_count": Battle._effect_dodge_count,
+    "next_turn_dodge": Battle._effect_next_turn_dodge,
+    "stun": Battle._effect_stun,
+    
+    # 유틸리티 계열
+    "extra_action": Battle._effect_extra_action,
+    "hp_cost": Battle._effect_hp_cost,
+    "atk_cost": Battle._effect_atk_cost,
+    "max_hp_increase": Battle._effect_max_hp_increase,
+    "atk_perma_increase": Battle._effect_atk_perma_increase,
+    "hp_swap": Battle._effect_hp_swap,
+    "stat_swap": Battle._effect_stat_swap,
+    "rewind": Battle._effect_rewind,
+    "drain_maxhp": Battle._effect_drain_maxhp,
+}
+
+# 회피 판정이 필요한 공격 효과
+ATTACK_EFFECTS = frozenset({
+    "damage", "fixed_dmg_percent", "multi_hit", "execute", "crit_chance",
+    "triple_crit", "dot_dmg", "dmg_hp_based", "atk_grow", "ms_multi_hit",
+    "ms_multi_hit_double", "drain", "instant_atk"
+})
+
+
+def _parse_condition(condition: str) -> Optional[float]:
+    """효과 발동 조건 파싱 ("hp_below_40" → 0.4, 그 외 조건 없음 → None)"""
+    if condition.startswith("hp_below_"):
+        return int(condition.split("_")[-1]) / 100.0
+    return None
+
+
+def compile_effects(effects: List[dict]) -> dict:
+    """효과 배열을 실행용 레코드로 변환
+    
+    Returns:
+        {"records": [(handler, params, hp_threshold, is_attack), ...], "has_attack": bool}
+        (알 수 없는 효과 타입은 handler가 None)
+    """
+    records = []
+    for effect_data in effects:
+        effect_type = effect_data.get("type", "")
+        records.append((
+            EFFECT_HANDLERS.get(effect_type),
+            effect_data,
+            _parse_condition(effect_data.get("condition", "")),
+            effect_type in ATTACK_EFFECTS
+        ))
+    return {"records": records, "has_attack": any(r[3] for r in records)}
+
+
+def compile_skill(skill: dict) -> dict:
+    """스킬 1개 컴파일 (normalize_skill_master를 거친 스킬 기준)"""
+    return compile_effects(skill.get("effects") or [])
+
+
+def convert_legacy_skill(skill: dict) -> list:
+    """기존 단일 effect 스킬을 멀티 이펙트 형식으로 변환 (랜덤 요소는 실행 시 판정)"""
+    # 이미 effects 배열이 있으면 그대로 반환 (멀티 이펙트 스킬)
+    if "effects" in skill:
+        return skill["effects"]
+    
+    # 레거시 effect 필드가 없으면 빈 배열
+    effect = skill.get("effect", "")
+    if not effect:
+        return []
+    
+    # 기존 effect를 멀티 이펙트로 변환
+    effects = []
+    
+    # 복합 효과들을 분해
+    if effect == "heal_dodge":
+        # 회복 + 확률적 회피 (회피 부여 여부는 실행 시 chance로 판정)
+        effects.append({"type": "heal", "value": skill.get("value", 0.1)})
+        effects.append({"type": "dodge_count", "count": 1, "chance": skill.get("block_chance", 0.5)})
+    
+    elif effect == "heal_conditional":
+        # 조건부 회복
+        hp_threshold = skill.get("hp_threshold", 0.5)
+        effects.append({"type": "heal", "value": skill.get("value", 0.15), "condition": f"hp_below_{int(hp_threshold*100)}"})
+    
+    elif effect == "heal_ms":
+        # 회복 + MS 버프
+        effects.append({"type": "heal", "value": skill.get("value", 0.15)})
+        effects.append({"type": "buff", "buff_type": "ms_boost", "value": skill.get("ms_boost", 0.1), "duration": skill.get("duration", 2)})
+    
+    elif effect == "heal_sacrifice":
+        # ATK 희생 + 회복
+        effects.append({"type": "atk_cost", "value": skill.get("atk_cost", 0.1)})
+        effects.append({"type": "heal", "value": skill.get("value", 0.22)})
+    
+    elif effect == "heal_maxhp":
+        # 최대HP 증가 + 회복
+        effects.append({"type": "max_hp_increase", "value": skill.get("max_hp_boost", 0.1)})
+        effects.append({"type": "heal", "value": skill.get("value", 0.07)})
+    
+    elif effect == "heal_cleanse":
+        # 회복 + 디버프 제거
+        effects.append({"type": "heal", "value": skill.get("value", 0.55)})
+        effects.append({"type": "cleanse"})
+    
+    elif effect == "heal_allbuff":
+        # 회복 + 전체 스탯 버프
+        effects.append({"type": "heal", "value": skill.get("value", 0.25)})
+        stat_boost = skill.get("stat_boost", 0.25)
+        duration = skill.get("duration", 2)
+        effects.append({"type": "buff", "buff_type": "atk_boost", "value": stat_boost, "duration": duration})
+        effects.append({"type": "buff", "buff_type": "ms_boost", "value": stat_boost, "duration": duration})
+    
+    elif effect == "heal_regen":
+        # 즉시 회복 + 지속 회복
+        effects.append({"type": "heal", "value": skill.get("value", 0.30)})
+        effects.append({"type": "buff", "buff_type": "regen", "value": skill.get("regen", 0.10), "duration": skill.get("duration", 4)})
+    
+    elif effect == "heal_revive":
+        # 회복 + 부활 버프
+        effects.append({"type": "heal", "value": skill.get("value", 0.45)})
+        effects.append({"type": "buff", "buff_type": "revive_once", "value": skill.get("revive_hp", 0.6), "duration": 999})
+    
+    elif effect == "heal_full_noheal":
+        # 완전 회복 + 자연 회복 불가
+        effects.append({"type": "heal_full"})
+        effects.append({"type": "self_debuff", "debuff_type": "no_regen", "value": 1.0, "duration": skill.get("duration", 3)})
+    
+    elif effect == "heal_full_grow":
+        # 완전 회복 + 최대HP 성장
+        effects.append({"type": "heal_full"})
+        effects.append({"type": "buff", "buff_type": "max_hp_grow", "value": skill.get("max_hp_grow", 0.05), "duration": skill.get("duration", 5)})
+    
+    elif effect == "heal_def":
+        # 회복 + 방어 버프
+        effects.append({"type": "heal", "value": skill.get("value", 0.08)})
+        effects.append({"type": "buff", "buff_type": "def_boost", "value": skill.get("def_boost", 0.10), "duration": skill.get("duration", 1)})
+    
+    elif effect == "damage_buff":
+        # 데미지 + 버프
+        effects.append({"type": "damage", "value": skill.get("dmg_value", 0.5)})
+        effects.append({"type": "buff", "buff_type": skill.get("buff_type", "atk_boost"), "value": skill.get("buff_value", 0.3), "duration": skill.get("duration", 3)})
+    
+    elif effect == "damage_debuff":
+        # 데미지 + 적 디버프
+        effects.append({"type": "damage", "value": skill.get("dmg_value", 1.3)})
+        effects.append({"type": "debuff", "debuff_type": skill.get("debuff_type", "atk_reduce"), "value": skill.get("debuff_value", 0.2), "duration": skill.get("duration", 2)})
+    
+    elif effect == "damage_ms_reduce":
+        # 데미지 + MS 감소
+        effects.append({"type": "damage", "value": skill.get("dmg_value", 0.8)})
+        effects.append({"type": "debuff", "debuff_type": "ms_reduce", "value": skill.get("ms_reduce", 0.3), "duration": skill.get("duration", 3)})
+    
+    elif effect == "dmg_heal_block":
+        # 데미지 + 힐 차단
+        effects.append({"type": "damage", "value": 1.0 + skill.get("dmg_boost", 0.8)})
+        effects.append({"type": "debuff", "debuff_type": "heal_block", "value": 1.0, "duration": skill.get("heal_block", 2)})
+    
+    elif effect == "dmg_heal_reduce":
+        # 데미지 + 자신 회복 감소
+        effects.append({"type": "damage", "value": 1.0 + skill.get("dmg_boost", 1.0)})
+        effects.append({"type": "self_debuff", "debuff_type": "heal_reduce", "value": skill.get("heal_reduce", 0.5), "duration": 999})
+    
+    elif effect == "dmg_ignore_def":
+        # 방어 무시 데미지
+        effects.append({"type": "damage", "value": 1.0 + skill.get("dmg_boost", 0.5), "ignore_def": True})
+    
+    elif effect == "fixed_heal_block":
+        # 고정 피해 + 힐 차단
+        effects.append({"type": "fixed_dmg_percent", "value": skill.get("dmg_percent", 0.7)})
+        effects.append({"type": "debuff", "debuff_type": "heal_block", "value": 1.0, "duration": skill.get("heal_block", 5)})
+    
+    elif effect == "maxhp_perma_atk":
+        # 최대HP 비례 피해 + ATK 영구 증가
+        effects.append({"type": "fixed_dmg_maxhp", "value": skill.get("dmg_percent", 0.4)})
+        effects.append({"type": "atk_perma_increase", "value": skill.get("atk_grow", 0.2)})
+    
+    elif effect == "atk_hp_trade":
+        # HP 소모 + ATK 버프
+        effects.append({"type": "hp_cost", "value": skill.get("hp_cost", 0.05)})
+        effects.append({"type": "buff", "buff_type": "atk_boost", "value": skill.get("atk_boost", 0.7), "duration": skill.get("duration", 6)})
+    
+    elif effect == "atk_vuln":
+        # ATK 버프 + 받는 피해 증가
+        effects.append({"type": "buff", "buff_type": "atk_boost", "value": skill.get("atk_boost", 0.8), "duration": skill.get("duration", 5)})
+        effects.append({"type": "self_debuff", "debuff_type": "vulnerability", "value": skill.get("vuln", 0.3), "duration": skill.get("duration", 5)})
+    
+    elif effect == "atk_recoil":
+        # ATK 버프 + HP 손실 예약
+        effects.append({"type": "buff", "buff_type": "atk_boost", "value": skill.get("atk_boost", 0.6), "duration": skill.get("duration", 5)})
+        effects.append({"type": "self_debuff", "debuff_type": "recoil_hp", "value": skill.get("recoil_hp", 0.2), "duration": skill.get("duration", 5)})
+    
+    elif effect == "atk_stack":
+        # ATK 버프 + 매턴 누적
+        effects.append({"type": "buff", "buff_type": "atk_boost", "value": skill.get("initial", 0.4), "duration": skill.get("duration", 4)})
+        effects.append({"type": "buff", "buff_type": "atk_stack", "value": skill.get("stack_per_turn", 0.05), "duration": skill.get("duration", 4)})
+    
+    elif effect == "atk_buff":
+        effects.append({"type": "buff", "buff_type": "atk_boost", "value": skill.get("value", 0.15), "duration": skill.get("duration", 3)})
+    
+    elif effect == "def_break":
+        effects.append({"type": "debuff", "debuff_type": "def_reduce", "value": skill.get("value", 0.2), "duration": skill.get("duration", 2)})
+    
+    elif effect == "ms_buff":
+        effects.append({"type": "buff", "buff_type": "ms_boost", "value": skill.get("value", 0.2), "duration": skill.get("duration", 3)})
+    
+    elif effect == "ms_atk_buff":
+        effects.append({"type": "buff", "buff_type": "ms_boost", "value": skill.get("ms_boost", 1.2), "duration": skill.get("duration", 4)})
+        effects.append({"type": "buff", "buff_type": "atk_boost", "value": skill.get("atk_boost", 0.2), "duration": skill.get("duration", 4)})
+    
+    elif effect == "lifesteal":
+        effects.append({"type": "buff", "buff_type": "lifesteal", "value": skill.get("value", 0.25), "duration": skill.get("duration", 3)})
+    
+    elif effect == "counter":
+        effects.append({"type": "buff", "buff_type": "counter", "value": skill.get("value", 0.5), "duration": skill.get("duration", 1)})
+    
+    elif effect == "reflect":
+        effects.append({"type": "buff", "buff_type": "reflect", "value": skill.get("value", 0.5), "duration": skill.get("duration", 2)})
+    
+    elif effect == "dodge":
+        effects.append({"type": "buff", "buff_type": "dodge_chance", "value": skill.get("value", 0.5), "duration": skill.get("duration", 1)})
+    
+    elif effect == "dodge_multi":
+        effects.append({"type": "dodge_count", "count": skill.get("value", 1)})
+    
+    elif effect == "dodge_ms_buff":
+        effects.append({"type": "dodge_count", "count": int(skill.get("dodge", 1))})
+        effects.append({"type": "buff", "buff_type": "ms_boost", "value": skill.get("ms_boost", 0.6), "duration": skill.get("duration", 3)})
+    
+    elif effect == "dodge_heal":
+        effects.append({"type": "dodge_count", "count": skill.get("dodge_count", 3)})
+        effects.append({"type": "heal", "value": skill.get("heal_value", 0.15)})
+    
+    elif effect == "dmg_boost_once":
+        effects.append({"type": "buff", "buff_type": "dmg_boost_once", "value": skill.get("value", 1.5), "duration": 1})
+    
+    elif effect == "guaranteed_crit":
+        effects.append({"type": "buff", "buff_type": "guaranteed_crit", "value": skill.get("dmg_boost", 0.5), "duration": skill.get("duration", 2)})
+    
+    elif effect == "double_speed":
+        effects.append({"type": "buff", "buff_type": "double_speed", "value": 1.0, "duration": skill.get("duration", 3)})
+    
+    elif effect == "ms_double_hit":
+        effects.append({"type": "buff", "buff_type": "ms_boost", "value": skill.get("ms_boost", 5.0), "duration": skill.get("duration", 5)})
+        effects.append({"type": "buff", "buff_type": "double_hit", "value": 1.0, "duration": skill.get("duration", 5)})
+    
+    elif effect == "invincible" or effect == "invincible_atk":
+        effects.append({"type": "buff", "buff_type": "invincible", "value": 1.0, "duration": skill.get("duration", 3)})
+    
+    elif effect == "immortal":
+        effects.append({"type": "buff", "buff_type": "immortal", "value": 1.0, "duration": skill.get("duration", 7)})
+    
+    elif effect == "auto_revive":
+        effects.append({"type": "buff", "buff_type": "auto_revive", "value": skill.get("revive_hp", 1.0), "duration": 999})
+    
+    elif effect == "random_effect":
+        effects.append({"type": "buff", "buff_type": "random_effect", "value": 1.0, "duration": skill.get("duration", 5)})
+    
+    elif effect == "death_loop":
+        effects.append({"type": "buff", "buff_type": "death_loop", "value": 1.0, "duration": skill.get("duration", 5)})
+    
+    elif effect == "delayed_burst":
+        effects.append({"type": "buff", "buff_type": "delayed_burst", "value": 1.0, "duration": skill.get("duration", 5)})
+    
+    elif effect == "atk_debuff_enemy":
+        effects.append({"type": "debuff", "debuff_type": "atk_reduce", "value": skill.get("value", 0.8), "duration": skill.get("duration", 2)})
+    
+    elif effect == "ms_debuff_enemy":
+        effects.append({"type": "debuff", "debuff_type": "ms_reduce", "value": skill.get("value", 0.3), "duration": skill.get("duration", 3)})
+    
+    # 단일 효과들
+    elif effect in ["heal", "regen", "drain", "damage", "fixed_dmg_percent", "fixed_dmg_maxhp",
+                   "multi_hit", "execute", "crit_chance", "triple_crit", "dot_dmg", "dmg_hp_based",
+                   "true_damage", "pierce_all", "ultra_fixed", "atk_grow", "ms_multi_hit",
+                   "ms_multi_hit_double", "next_turn_dodge", "stun", "extra_action", "hp_swap",
+                   "stat_swap", "rewind", "drain_maxhp", "instant_atk"]:
+        # 단일 효과는 그대로 변환
+        effect_params = {"type": effect}
+        for key in ["value", "duration", "hits", "dmg_per", "hp_threshold", "dmg_boost",
+                   "crit_chance", "crit_dmg", "initial", "dot_dmg", "max_bonus", "dmg_percent"]:
+            if key in skill:
+                effect_params[key] = skill[key]
+        effects.append(effect_params)
+    
+    else:
+        # 알 수 없는 효과는 단일 효과로 처리
+        effects.append({"type": effect, **{k: v for k, v in skill.items() if k not in ["grade", "slot", "name", "resource", "effect", "cooldown", "desc"]}})
+    
+    return effects
+
+
+def normalize_skill_master(skills: Dict[str, dict]) -> Tuple[Dict[str, dict], List[str]]:
+    """스킬 마스터를 멀티 이펙트(effects 배열) 스키마로 일괄 변환
+    
+    effects 배열이 없는 레거시 스킬은 convert_legacy_skill로 변환한 사본으로 교체하고,
+    이미 정규화된 스킬은 그대로 둔다. 변환할 수 없거나 처리 함수가 없는 효과는
+    (기존처럼 무효과로 동작하도록 남겨두고) 문제 목록으로 보고한다.
+    
+    Returns:
+        (정규화된 스킬 마스터, 문제 메시지 목록)
+    """
+    normalized = {}
+    problems = []
+    for skill_id, skill in skills.items():
+        if "effects" not in skill:
+            if not skill.get("effect"):
+                problems.append(f"{skill_id}: effects/effect 필드 없음")
+            skill = dict(skill, effects=convert_legacy_skill(skill))
+        for effect_data in skill["effects"] or []:
+            if effect_data.get("type", "") not in EFFECT_HANDLERS:
+                problems.append(f"{skill_id}: 알 수 없는 효과 타입 '{effect_data.get('type', '')}'")
+        normalized[skill_id] = skill
+    return normalized, problems
+
+
+# ============================================================================
+# 스킬 없는 전투 고속 처리
+# ============================================================================
+
+def is_stat_only(instance: Dict) -> bool:
+    """전투에서 쓸 스킬이 하나도 없는 개체인지 (BattleInstance와 같은 기준)"""
+    skill_master = get_skill_master()
+    for i in range(1, 4):
+        acc = instance.get(f"accessory_{i}")
+        if acc and acc["id"] in skill_master:
+            return False
+    return True
+
+
+# 행동 순서 코드 (stat_only_action_schedule)
+ACT_PLAYER, ACT_ENEMY, ACT_TIE_FIRST, ACT_TIE_SECOND = 0, 1, 2, 3
+
+
+@lru_cache(maxsize=4096)
+def stat_only_action_schedule(player_ms: int, enemy_ms: int, max_turns: int) -> Tuple[int, ...]:
+    """스킬 없는 전투의 턴별 행동자 순서 (MS 쌍마다 1회 계산)
+    
+    MS가 변하지 않으면 게이지 진행은 랜덤과 무관하다. 동시 도달(동률)만 랜덤인데,
+    어느 쪽이 먼저 행동해도 두 번의 행동 뒤 게이지 상태는 같으므로
+    "동률 선택"(ACT_TIE_FIRST)과 "나머지 쪽"(ACT_TIE_SECOND) 코드로 표현할 수 있다.
+    게이지 계산은 skip_idle_ticks / tick_and_get_next_actor와 같은 부동소수 연산 순서를 따른다.
+    """
+    threshold = player_ms + enemy_ms
+    if threshold <= 0:
+        # 임계값 0이면 매 턴 두 게이지가 같은 상태로 준비됨 → 매번 동률 선택
+        return (ACT_TIE_FIRST,) * max_turns
+    # 게이지 증가량은 apply_buffs의 current_ms(최소 1) 기준
+    player_step = max(1, player_ms) / 10
+    enemy_step = max(1, enemy_ms) / 10
+    player_gauge = 0
+    enemy_gauge = 0
+    schedule = []
+    while len(schedule) < max_turns:
+        while player_gauge < threshold and enemy_gauge < threshold:
+            player_gauge += player_step
+            enemy_gauge += enemy_step
+        if player_gauge >= threshold and enemy_gauge >= threshold and player_gauge == enemy_gauge:
+            schedule.append(ACT_TIE_FIRST)
+            schedule.append(ACT_TIE_SECOND)
+            player_gauge -= threshold
+            enemy_gauge -= threshold
+        elif player_gauge >= threshold and player_gauge > enemy_gauge or enemy_gauge < threshold:
+            schedule.append(ACT_PLAYER)
+            player_gauge -= threshold
+        else:
+            schedule.append(ACT_ENEMY)
+            enemy_gauge -= threshold
+    return tuple(schedule[:max_turns])
+
+
+def resolve_stat_only_battle(player_stats: Dict, enemy_stats: Dict, seed: int, max_turns: int = 50) -> Dict:
+    """양쪽 모두 스킬이 없는 전투를 Battle 객체 없이 계산
+    
+    스킬이 없으면 버프/회피/쉴드가 생기지 않으므로 전투는 ATB 행동 순서와
+    기본 공격 데미지 판정(ATK × 0.8~1.2)만 남는다. 행동 순서는 MS 쌍별로 캐시하고,
+    Battle.run_battle과 같은 순서로 같은 RNG 값을 소비하므로 같은 seed면 결과가 완전히 같다.
+    
+    Returns:
+        simulate_battle과 같은 형식의 결과 dict
+    """
+    rng = random.Random(seed)
+    uniform = rng.uniform
+    player_hp, player_atk = player_stats["hp"], player_stats["atk"]
+    enemy_hp, enemy_atk = enemy_stats["hp"], enemy_stats["atk"]
+    
+    winner = None
+    turn = 0
+    player_acts = True
+    if player_hp <= 0:
+        winner = "draw" if enemy_hp <= 0 else "enemy"
+    elif enemy_hp <= 0:
+        winner = "player"
+    else:
+        for code in stat_only_action_schedule(player_stats["ms"], enemy_stats["ms"], max_turns):
+            turn += 1
+            if code == ACT_TIE_FIRST:
+                player_acts = rng.choice((True, False))
+            elif code == ACT_TIE_SECOND:
+                player_acts = not player_acts
+            else:
+                player_acts = code == ACT_PLAYER
+            
+            # 기본 공격 (승패 판정은 check_victory와 같은 순서)
+            if player_acts:
+                enemy_hp = max(0, enemy_hp - max(1, int(player_atk * uniform(0.8, 1.2))))
+                if enemy_hp <= 0:
+                    winner = "player"
+                    break
+            else:
+                player_hp = max(0, player_hp - max(1, int(enemy_atk * uniform(0.8, 1.2))))
+                if player_hp <= 0:
+                    winner = "enemy"
+                    break
+        else:
+            winner = "enemy"  # 시간 초과
+    
+    return {
+        "winner": winner,
+        "player_final_hp": player_hp,
+        "enemy_final_hp": enemy_hp,
+        "turns": turn
+    }
+
+
+def simulate_battle(player_instance: Dict, enemy_instance: Dict, seed: Optional[int] = None) -> Dict:
+    """헤드리스 전투 시뮬레이션 (밸런스 작업용 대량 실행)
+    
+    로그/디버그 출력 없이 전투를 끝까지 진행한다.
+    양쪽 모두 스킬이 없으면 resolve_stat_only_battle로 바로 계산한다.
+    
+    Returns:
+        {"winner", "player_final_hp", "enemy_final_hp", "turns"}
+    """
+    if seed is None:
+        seed = random.getrandbits(63)
+    if is_stat_only(player_instance) and is_stat_only(enemy_instance):
+        return resolve_stat_only_battle(player_instance["stats"], enemy_instance["stats"], seed)
+    battle = Battle(player_instance, enemy_instance, headless=True, seed=seed)
+    battle.run_battle()
+    return battle.get_summary()
+
+# ============================================================================
+# 리플레이
+# ============================================================================
+
+def battle_genotype(instance: Dict) -> Dict:
+    """전투에 필요한 필드만 남긴 개체 dict (이름, 스탯, 장착 스킬 ID)"""
+    genotype = {
+        "name": instance["name"],
+        "stats": {"hp": instance["stats"]["hp"], "atk": instance["stats"]["atk"], "ms": instance["stats"]["ms"]}
+    }
+    for i in range(1, 4):
+        acc = instance.get(f"accessory_{i}")
+        genotype[f"accessory_{i}"] = {"id": acc["id"]} if acc else None
+    return genotype
+
+
+def make_replay(player_instance: Dict, stage: int, seed: int, result: Optional[Dict] = None) -> Dict:
+    """스테이지 전투 리플레이 기록 (적은 stage로 다시 생성하므로 저장하지 않음)
+    
+    Args:
+        result: 실제 전투의 Battle.get_summary() (넣으면 replay_battle이 재현 결과와 비교)
+    """
+    replay = {
+        "player": battle_genotype(player_instance),
+        "stage": stage,
+        "seed": seed,
+        "engine_version": ENGINE_VERSION
+    }
+    if result is not None:
+        replay["result"] = {key: result[key] for key in ("winner", "turns", "player_final_hp", "enemy_final_hp")}
+    return replay
+
+
+def replay_battle(replay: Dict, enemy_instance: Dict, headless: bool = False) -> Battle:
+    """리플레이 기록으로 전투 재현 (끝까지 진행한 Battle 반환)
+    
+    실제 전투 화면(run_timeline)과 같이 1틱씩 진행한다.
+    
+    Args:
+        enemy_instance: replay["stage"]로 생성한 스테이지 보스
+    
+    Raises:
+        ValueError: 다른 전투 엔진 버전에서 만든 리플레이, 또는 재현 결과(승자/턴 수/최종 HP)가
+                    기록된 실제 전투 결과와 다름
+    """
+    if replay.get("engine_version") != ENGINE_VERSION:
+        raise ValueError(f"전투 엔진 버전이 달라 재현할 수 없습니다 "
+                         f"(리플레이 v{replay.get('engine_version')}, 현재 v{ENGINE_VERSION})")
+    battle = Battle(replay["player"], enemy_instance, headless=headless, seed=replay["seed"])
+    battle.run_battle(skip_idle=False)
+    
+    expected = replay.get("result")
+    if expected:
+        actual = battle.get_summary()
+        diff = [key for key in expected if actual[key] != expected[key]]
+        if diff:
+            detail = ", ".join(f"{key} {expected[key]} → {actual[key]}" for key in diff)
+            raise ValueError(f"리플레이 재현 결과가 실제 전투와 다릅니다 ({detail})")
+    return battle
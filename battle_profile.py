@@ -0,0 +1,158 @@
+"""
+전투 프로파일링
+Battle을 상속한 ProfiledBattle로 단계별(틱, 버프, 스킬, 기본 공격, DoT, 승패 판정)과
+효과 핸들러(_effect_*)별 호출 횟수/누적 시간을 기록합니다.
+계측 코드는 ProfiledBattle에만 있으므로 일반 Battle 전투 속도에는 영향이 없습니다.
+"""
+import random
+from time import perf_counter
+from typing import Callable, Dict, Optional
+
+from battle_engine import Battle
+
+# 계측하는 Battle 메서드 → 단계 이름 (같은 단계 이름은 합산)
+PROFILED_PHASES = {
+    "skip_idle_ticks": "tick",
+    "tick_and_get_next_actor": "tick",
+    "_apply_turn_start_effects": "buffs",
+    "select_skill": "select_skill",
+    "use_skill": "skill",
+    "basic_attack": "basic_attack",
+    "_apply_dot_damage": "dot",
+    "check_victory": "check_victory"
+}
+
+
+class BattleProfile:
+    """이름별 [호출 횟수, 누적 시간(초)] 집계"""
+
+    def __init__(self):
+        self.phases: Dict[str, list] = {}
+        self.effects: Dict[str, list] = {}
+
+    @staticmethod
+    def _add(table: Dict[str, list], name: str, elapsed: float):
+        entry = table.get(name)
+        if entry is None:
+            table[name] = [1, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+
+    def add_phase(self, name: str, elapsed: float):
+        self._add(self.phases, name, elapsed)
+
+    def add_effect(self, name: str, elapsed: float):
+        self._add(self.effects, name, elapsed)
+
+    def merge(self, other: "BattleProfile"):
+        """다른 전투의 집계를 합산"""
+        for table, other_table in ((self.phases, other.phases), (self.effects, other.effects)):
+            for name, (calls, elapsed) in other_table.items():
+                entry = table.setdefault(name, [0, 0.0])
+                entry[0] += calls
+                entry[1] += elapsed
+
+    def as_dict(self) -> Dict[str, Dict[str, Dict]]:
+        """{"phases"/"effects": {이름: {"calls", "time"}}} (누적 시간 내림차순)"""
+        return {
+            key: {name: {"calls": calls, "time": elapsed}
+                  for name, (calls, elapsed) in sorted(table.items(), key=lambda x: -x[1][1])}
+            for key, table in (("phases", self.phases), ("effects", self.effects))
+        }
+
+
+def _timed_method(method_name: str, phase: str) -> Callable:
+    """Battle 메서드를 호출 시간 측정 버전으로 감싸기"""
+    method = getattr(Battle, method_name)
+
+    def timed(self, *args, **kwargs):
+        start = perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.profile.add_phase(phase, perf_counter() - start)
+
+    timed.__name__ = method_name
+    timed.__doc__ = method.__doc__
+    return timed
+
+
+class ProfiledBattle(Battle):
+    """단계/효과별 호출 횟수와 누적 시간을 self.profile에 기록하는 Battle
+
+    단계 시간은 중첩 호출을 포함한다 (예: skill에는 그 스킬의 효과 핸들러 시간이 포함됨).
+    전투 결과는 같은 seed의 Battle과 같다.
+    """
+
+    def __init__(self, player_instance: Dict, enemy_instance: Dict, headless: bool = False,
+                 seed: Optional[int] = None):
+        super().__init__(player_instance, enemy_instance, headless=headless, seed=seed)
+        self.profile = BattleProfile()
+        # 공유 컴파일 캐시는 그대로 두고 이 전투의 개체에만 계측 레코드를 끼움
+        for side in (self.player, self.enemy):
+            side.compiled_skills = {slot: self._profiled_skill(compiled)
+                                    for slot, compiled in side.compiled_skills.items()}
+
+    def _profiled_skill(self, compiled: dict) -> dict:
+        records = [(self._timed_effect(handler) if handler is not None else None, params, hp_threshold, is_attack)
+                   for handler, params, hp_threshold, is_attack in compiled["records"]]
+        return {**compiled, "records": records}
+
+    def _timed_effect(self, handler: Callable) -> Callable:
+        name = handler.__name__
+        profile = self.profile
+
+        def timed(battle, attacker, defender, params, ctx):
+            start = perf_counter()
+            try:
+                return handler(battle, attacker, defender, params, ctx)
+            finally:
+                profile.add_effect(name, perf_counter() - start)
+
+        return timed
+
+
+for _method_name, _phase in PROFILED_PHASES.items():
+    setattr(ProfiledBattle, _method_name, _timed_method(_method_name, _phase))
+
+
+def profile_battle(player_instance: Dict, enemy_instance: Dict, seed: Optional[int] = None,
+                   headless: bool = True) -> Dict:
+    """전투 1회 프로파일링
+
+    Returns:
+        {"winner", "turns", "total_time", "phases": {...}, "effects": {...}}
+    """
+    battle = ProfiledBattle(player_instance, enemy_instance, headless=headless, seed=seed)
+    start = perf_counter()
+    battle.run_battle()
+    result = {"winner": battle.winner, "turns": battle.turn, "total_time": perf_counter() - start}
+    result.update(battle.profile.as_dict())
+    return result
+
+
+def profile_battles(player_instance: Dict, enemy_instance: Dict, n_battles: int = 100,
+                    seed: Optional[int] = None, headless: bool = True) -> Dict:
+    """같은 매치업을 n_battles회 돌려 프로파일 합산
+
+    Returns:
+        {"battles", "wins", "turns", "total_time", "phases": {...}, "effects": {...}}
+        (turns/total_time은 전체 합계)
+    """
+    seed_rng = random.Random(seed)
+    total = BattleProfile()
+    wins = turns = 0
+    total_time = 0.0
+    for _ in range(n_battles):
+        battle = ProfiledBattle(player_instance, enemy_instance, headless=headless,
+                                seed=seed_rng.getrandbits(63))
+        start = perf_counter()
+        battle.run_battle()
+        total_time += perf_counter() - start
+        total.merge(battle.profile)
+        wins += battle.winner == "player"
+        turns += battle.turn
+    result = {"battles": n_battles, "wins": wins, "turns": turns, "total_time": total_time}
+    result.update(total.as_dict())
+    return result
@@ -0,0 +1,434 @@
+"""
+전투 시뮬레이션 (몬테카를로)
+battle_engine의 헤드리스 전투를 대량으로 돌려 승률을 추정하는 함수들을 제공합니다.
+Streamlit에 의존하지 않으므로 밸런스 작업용 스크립트에서도 사용할 수 있습니다.
+"""
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import Callable, Dict, List, Optional, Tuple
+
+from battle_engine import Battle, simulate_battle, set_skill_master, get_skill_master
+
+# 시드 1개로 돌리는 전투 묶음 크기 (워커 수와 무관하게 같은 시드 → 같은 결과)
+TRIAL_CHUNK_SIZE = 250
+# 조기 종료 추정에서 한 번에 추가하는 전투 수 (작을수록 빨리 멈춤)
+SEQUENTIAL_CHUNK_SIZE = 50
+
+# ============================================================================
+# 통계 유틸리티
+# ============================================================================
+
+def wilson_interval(wins: int, trials: int, confidence: float = 0.95) -> Tuple[float, float]:
+    """승률의 Wilson 신뢰구간 계산 (0%/100% 근처에서도 안정적)
+
+    Returns:
+        (하한, 상한)
+    """
+    if trials <= 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = wins / trials
+    denom = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denom
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denom
+    low = 0.0 if wins == 0 else max(0.0, center - margin)
+    high = 1.0 if wins == trials else min(1.0, center + margin)
+    return low, high
+
+# ============================================================================
+# 몬테카를로 승률 추정
+# ============================================================================
+
+def _run_trial_chunk(player_instance: Dict, enemy_instance: Dict, n_trials: int, seed: int) -> Tuple[int, int]:
+    """시드 고정 전투 묶음 실행 (워커 프로세스에서 호출)
+
+    Returns:
+        (플레이어 승리 횟수, 총 턴 수)
+    """
+    # 묶음 시드에서 전투별 시드를 뽑음 (전역 RNG는 건드리지 않음)
+    seed_rng = random.Random(seed)
+    wins = 0
+    turns = 0
+    for _ in range(n_trials):
+        summary = simulate_battle(player_instance, enemy_instance, seed=seed_rng.getrandbits(63))
+        if summary["winner"] == "player":
+            wins += 1
+        turns += summary["turns"]
+    return wins, turns
+
+
+def _split_trials(n_trials: int, seed: Optional[int],
+                  chunk_size: int = TRIAL_CHUNK_SIZE) -> List[Tuple[int, int]]:
+    """전투 횟수를 (묶음 크기, 독립 시드) 목록으로 분할"""
+    seed_rng = random.Random(seed)
+    chunks = []
+    remaining = n_trials
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        chunks.append((size, seed_rng.getrandbits(64)))
+        remaining -= size
+    return chunks
+
+
+def estimate_win_rate(
+    player_instance: Dict,
+    enemy_instance: Dict,
+    n_trials: int = 1000,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    confidence: float = 0.95
+) -> Dict:
+    """플레이어 개체의 승률 추정 (프로세스 풀 병렬 시뮬레이션)
+
+    Args:
+        n_trials: 시뮬레이션 전투 횟수
+        workers: 워커 프로세스 수 (None이면 CPU 수, 1 이하면 현재 프로세스에서 실행)
+        seed: 재현용 시드 (None이면 매번 다른 결과)
+        confidence: 신뢰구간 수준
+
+    Returns:
+        {"win_rate", "wins", "trials", "avg_turns", "ci_low", "ci_high", "confidence"}
+    """
+    chunks = _split_trials(n_trials, seed)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(chunks))
+
+    if workers <= 1:
+        results = [_run_trial_chunk(player_instance, enemy_instance, size, chunk_seed)
+                   for size, chunk_seed in chunks]
+    else:
+        # 스킬 마스터를 워커에 전달 (spawn 방식 플랫폼 대응)
+        with ProcessPoolExecutor(max_workers=workers, initializer=set_skill_master,
+                                 initargs=(get_skill_master(),)) as pool:
+            futures = [pool.submit(_run_trial_chunk, player_instance, enemy_instance, size, chunk_seed)
+                       for size, chunk_seed in chunks]
+            results = [f.result() for f in futures]
+    wins = sum(chunk_wins for chunk_wins, _ in results)
+    turns = sum(chunk_turns for _, chunk_turns in results)
+
+    ci_low, ci_high = wilson_interval(wins, n_trials, confidence)
+    return {
+        "win_rate": wins / n_trials if n_trials > 0 else 0.0,
+        "wins": wins,
+        "trials": n_trials,
+        "avg_turns": turns / n_trials if n_trials > 0 else 0.0,
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+        "confidence": confidence
+    }
+
+
+def estimate_win_rate_sequential(
+    player_instance: Dict,
+    enemy_instance: Dict,
+    max_trials: int = 10000,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    confidence: float = 0.95,
+    target: float = 0.5,
+    precision: float = 0.05,
+    pool: Optional[ProcessPoolExecutor] = None
+) -> Dict:
+    """조기 종료형 승률 추정 (Wilson 구간 기반 순차 검정)
+
+    SEQUENTIAL_CHUNK_SIZE 단위로 전투를 추가하면서 매 묶음마다 신뢰구간을 확인하고,
+    아래 조건 중 하나를 만족하면 즉시 멈춘다.
+    - 신뢰구간 전체가 target보다 위/아래 (승리/패배가 통계적으로 확정)
+    - 신뢰구간 폭이 2 * precision 이하 (충분히 정밀함)
+    0%/100% 매치업은 보통 첫 묶음에서 끝난다.
+
+    Args:
+        max_trials: 최대 전투 횟수 (결론이 안 나도 여기서 멈춤)
+        target: 판정 기준 승률 (예: 0.5 → "이길 확률이 반 이상인가")
+        precision: 허용 오차 (신뢰구간 반폭)
+        pool: 호출자가 만든 워커 풀 (주면 새로 만들지 않고 이 풀에서 workers개씩 돌리며, 종료는 호출자 몫)
+
+    Returns:
+        estimate_win_rate 결과 + {"decided": 기준 대비 판정 확정 여부, "stopped_early": 조기 종료 여부}
+        ci_low/ci_high는 보정된 검정별 신뢰수준의 구간이며 "confidence"도 그 수준이다
+        (요청한 confidence보다 높음 - 중간에 멈춰도 confidence 이상의 신뢰도를 보장)
+    """
+    chunks = _split_trials(max_trials, seed, SEQUENTIAL_CHUNK_SIZE)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(chunks)))
+
+    # 여러 번 검정하므로 각 검정의 신뢰수준을 보수적으로 올림 (Bonferroni 보정)
+    step_confidence = 1 - (1 - confidence) / max(1, len(chunks))
+
+    wins = 0
+    trials = 0
+    turns = 0
+    decided = False
+    owns_pool = pool is None and workers > 1
+    if owns_pool:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=set_skill_master,
+                                   initargs=(get_skill_master(),))
+    try:
+        # 워커 수만큼 묶음을 한 번에 돌리고 결과를 묶음 순서대로 반영 (시드 → 결과 재현 가능)
+        for start in range(0, len(chunks), workers):
+            batch = chunks[start:start + workers]
+            if pool is None:
+                results = [_run_trial_chunk(player_instance, enemy_instance, size, chunk_seed)
+                           for size, chunk_seed in batch]
+            else:
+                results = list(pool.map(_run_trial_chunk,
+                                        [player_instance] * len(batch), [enemy_instance] * len(batch),
+                                        [size for size, _ in batch], [chunk_seed for _, chunk_seed in batch]))
+            for (size, _), (chunk_wins, chunk_turns) in zip(batch, results):
+                wins += chunk_wins
+                turns += chunk_turns
+                trials += size
+            ci_low, ci_high = wilson_interval(wins, trials, step_confidence)
+            decided = ci_low > target or ci_high < target
+            if decided or (ci_high - ci_low) <= 2 * precision:
+                break
+    finally:
+        if owns_pool:
+            pool.shutdown()
+
+    ci_low, ci_high = wilson_interval(wins, trials, step_confidence)
+    return {
+        "win_rate": wins / trials if trials > 0 else 0.0,
+        "wins": wins,
+        "trials": trials,
+        "avg_turns": turns / trials if trials > 0 else 0.0,
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+        "confidence": step_confidence,
+        "decided": decided,
+        "stopped_early": trials < max_trials
+    }
+
+# ============================================================================
+# 두 개체 비교 (공통 난수)
+# ============================================================================
+
+class CommonRandomBattle(Battle):
+    """공통 난수 비교용 Battle (행동자별 n번째 턴마다 난수열을 다시 시드)
+
+    일반 Battle은 전투 하나가 난수열 하나를 순서대로 소비하므로, 스킬 구성이 다른 두 개체는
+    같은 시드여도 몇 턴 만에 난수가 어긋난다. 여기서는 "적의 3번째 턴" 같은 같은 시점이
+    항상 같은 난수를 쓰도록 맞춘다. 결과 분포는 Battle과 같지만 개별 전투 결과는 다르다.
+    """
+
+    def __init__(self, player_instance: Dict, enemy_instance: Dict, headless: bool = False,
+                 seed: Optional[int] = None):
+        super().__init__(player_instance, enemy_instance, headless=headless, seed=seed)
+        self.actor_turns = {True: 0, False: 0}
+
+    def _apply_turn_start_effects(self, actor):
+        self.actor_turns[actor.is_player] += 1
+        self.rng.seed(self.seed * 4099 + self.actor_turns[actor.is_player] * 2 + actor.is_player)
+        super()._apply_turn_start_effects(actor)
+
+
+def _run_paired_chunk(instance_a: Dict, instance_b: Dict, enemy_instance: Dict,
+                      n_trials: int, seed: int) -> Tuple[int, int, int]:
+    """전투별 시드를 a/b가 함께 쓰는 시드 고정 전투 묶음 (워커 프로세스에서 호출)
+
+    Returns:
+        (a 승리 횟수, b 승리 횟수, 한쪽만 이긴 횟수)
+    """
+    seed_rng = random.Random(seed)
+    a_wins = b_wins = discordant = 0
+    for _ in range(n_trials):
+        trial_seed = seed_rng.getrandbits(63)
+        battle_a = CommonRandomBattle(instance_a, enemy_instance, headless=True, seed=trial_seed)
+        battle_a.run_battle()
+        battle_b = CommonRandomBattle(instance_b, enemy_instance, headless=True, seed=trial_seed)
+        battle_b.run_battle()
+        a_won = battle_a.winner == "player"
+        b_won = battle_b.winner == "player"
+        a_wins += a_won
+        b_wins += b_won
+        discordant += a_won != b_won
+    return a_wins, b_wins, discordant
+
+
+def _paired_stats(a_wins: int, b_wins: int, discordant: int, trials: int,
+                  confidence: float) -> Tuple[float, float, float, float]:
+    """전투별 차이 d = (a 승) - (b 승) ∈ {-1, 0, 1}의 평균/분산과 정규 근사 신뢰구간
+
+    Returns:
+        (평균 차이, 표본 분산, 하한, 상한)
+    """
+    if trials <= 0:
+        return 0.0, 0.0, -1.0, 1.0
+    diff = (a_wins - b_wins) / trials
+    # d² = 1 인 전투는 한쪽만 이긴 전투
+    variance = max(0.0, (discordant - trials * diff * diff) / (trials - 1)) if trials > 1 else 0.0
+    # 한쪽만 이긴 전투가 아직 없으면 분산 0 → 구간 폭 0으로 바로 멈추므로 최소 1회 있었다고 가정
+    margin_variance = max(variance, 1 / trials)
+    margin = NormalDist().inv_cdf(0.5 + confidence / 2) * math.sqrt(margin_variance / trials)
+    return diff, variance, max(-1.0, diff - margin), min(1.0, diff + margin)
+
+
+def compare_builds(
+    instance_a: Dict,
+    instance_b: Dict,
+    enemy_instance: Dict,
+    max_trials: int = 5000,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    confidence: float = 0.95,
+    precision: float = 0.02
+) -> Dict:
+    """같은 적을 상대로 두 개체 승률 비교 (공통 난수 + 조기 종료)
+
+    전투마다 같은 시드로 a와 b를 각각 싸우게 해서(공통 난수) 운의 영향을 상쇄하고,
+    전투별 승패 차이의 평균/분산으로 "a가 b보다 강한가"를 판정한다.
+    두 개체가 비슷한 상황에서 비슷하게 이기고 지므로 따로 추정할 때보다 차이의 분산이 작아
+    같은 확신에 필요한 전투 수가 줄어든다 (efficiency = 독립 추정 분산 / 공통 난수 분산).
+
+    SEQUENTIAL_CHUNK_SIZE 단위로 전투를 추가하면서 신뢰구간이 0을 벗어나거나(우열 확정)
+    반폭이 precision 이하가 되면 멈춘다.
+
+    Returns:
+        {"a_win_rate", "b_win_rate", "diff", "variance", "ci_low", "ci_high", "confidence",
+         "trials", "battles", "decided", "better": "a"/"b"/None, "independent_variance", "efficiency",
+         "stopped_early"}
+        trials는 비교 횟수, battles는 실제 전투 횟수 (trials × 2)
+    """
+    chunks = _split_trials(max_trials, seed, SEQUENTIAL_CHUNK_SIZE)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(chunks)))
+
+    # 여러 번 검정하므로 각 검정의 신뢰수준을 보수적으로 올림 (Bonferroni 보정)
+    step_confidence = 1 - (1 - confidence) / max(1, len(chunks))
+
+    a_wins = b_wins = discordant = trials = 0
+    decided = False
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=set_skill_master,
+                                   initargs=(get_skill_master(),))
+    try:
+        for start in range(0, len(chunks), workers):
+            batch = chunks[start:start + workers]
+            if pool is None:
+                results = [_run_paired_chunk(instance_a, instance_b, enemy_instance, size, chunk_seed)
+                           for size, chunk_seed in batch]
+            else:
+                results = list(pool.map(_run_paired_chunk,
+                                        [instance_a] * len(batch), [instance_b] * len(batch),
+                                        [enemy_instance] * len(batch),
+                                        [size for size, _ in batch], [chunk_seed for _, chunk_seed in batch]))
+            for (size, _), (chunk_a, chunk_b, chunk_discordant) in zip(batch, results):
+                a_wins += chunk_a
+                b_wins += chunk_b
+                discordant += chunk_discordant
+                trials += size
+            _, _, ci_low, ci_high = _paired_stats(a_wins, b_wins, discordant, trials, step_confidence)
+            decided = ci_low > 0 or ci_high < 0
+            if decided or (ci_high - ci_low) <= 2 * precision:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    diff, variance, ci_low, ci_high = _paired_stats(a_wins, b_wins, discordant, trials, step_confidence)
+    a_rate = a_wins / trials if trials > 0 else 0.0
+    b_rate = b_wins / trials if trials > 0 else 0.0
+    # 같은 전투 수를 a/b 따로(독립 난수) 돌렸을 때 차이의 분산
+    independent_variance = a_rate * (1 - a_rate) + b_rate * (1 - b_rate)
+    return {
+        "a_win_rate": a_rate,
+        "b_win_rate": b_rate,
+        "diff": diff,
+        "variance": variance,
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+        "confidence": confidence,
+        "trials": trials,
+        "battles": trials * 2,
+        "decided": decided,
+        "better": ("a" if ci_low > 0 else "b") if decided else None,
+        "independent_variance": independent_variance,
+        "efficiency": independent_variance / variance if variance > 0 else None,
+        "stopped_early": trials < max_trials
+    }
+
+# ============================================================================
+# 최대 클리어 스테이지 탐색
+# ============================================================================
+
+def find_max_clearable_stage(
+    player_instance: Dict,
+    enemy_for_stage: Callable[[int], Dict],
+    min_win_rate: float = 0.5,
+    max_stage: int = 1000,
+    max_trials: int = 1000,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None
+) -> Dict:
+    """승률 min_win_rate 이상으로 클리어 가능한 최고 스테이지 탐색
+
+    스테이지 보스 스탯이 스테이지에 따라 단조 증가한다는 점을 이용해
+    1, 2, 4, 8, ... 로 상한을 찾은 뒤 이진 탐색한다.
+    시뮬레이션은 탐색 지점에서만 실행된다 (지점당 조기 종료 추정).
+    워커 풀은 탐색 전체에서 1개만 만들어 모든 지점이 함께 쓴다.
+
+    Args:
+        enemy_for_stage: 스테이지 번호 → 보스 개체 dict
+        min_win_rate: 클리어로 인정할 최소 승률
+
+    Returns:
+        {"max_stage": 최고 스테이지 (0이면 1스테이지도 불가), "win_rate": 해당 스테이지 승률,
+         "probes": [(스테이지, 승률, 전투 횟수), ...], "total_trials": 총 전투 횟수}
+    """
+    probes = {}
+    # 모든 지점에 같은 시드를 써서 스테이지 간 비교의 노이즈를 줄임 (시드가 없으면 탐색마다 1개 생성)
+    if seed is None:
+        seed = random.getrandbits(63)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=set_skill_master,
+                                   initargs=(get_skill_master(),))
+
+    def can_clear(stage: int) -> bool:
+        if stage not in probes:
+            probes[stage] = estimate_win_rate_sequential(
+                player_instance, enemy_for_stage(stage), max_trials=max_trials,
+                workers=workers, seed=seed, target=min_win_rate, pool=pool
+            )
+        return probes[stage]["win_rate"] >= min_win_rate
+
+    try:
+        # 1단계: 2배씩 올리며 실패 지점 찾기
+        cleared = 0
+        failed = max_stage + 1
+        stage = 1
+        while stage <= max_stage:
+            if not can_clear(stage):
+                failed = stage
+                break
+            cleared = stage
+            stage *= 2
+        if failed > max_stage and cleared < max_stage and can_clear(max_stage):
+            cleared = max_stage
+
+        # 2단계: (cleared, failed) 사이 이진 탐색
+        while failed - cleared > 1:
+            mid = (cleared + failed) // 2
+            if can_clear(mid):
+                cleared = mid
+            else:
+                failed = mid
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return {
+        "max_stage": cleared,
+        "win_rate": probes[cleared]["win_rate"] if cleared else None,
+        "probes": [(st, probes[st]["win_rate"], probes[st]["trials"]) for st in sorted(probes)],
+        "total_trials": sum(p["trials"] for p in probes.values())
+    }
@@ -0,0 +1,18 @@
+-- PvP 래더 테이블 (python -m analysis.pvp_ladder 가 주기적으로 username 기준 upsert 후 빠진 유저 삭제)
+-- updated_at은 저장 시 supabase_db.save_pvp_ladder가 직접 채움 (DEFAULT는 INSERT 때만 적용)
+CREATE TABLE IF NOT EXISTS pvp_ladder (
+  username TEXT PRIMARY KEY,
+  instance_id TEXT,
+  instance_name TEXT,
+  rating REAL NOT NULL,
+  rank INTEGER NOT NULL,
+  matches INTEGER NOT NULL DEFAULT 0,
+  wins INTEGER NOT NULL DEFAULT 0,
+  losses INTEGER NOT NULL DEFAULT 0,
+  draws INTEGER NOT NULL DEFAULT 0,
+  power_score NUMERIC,
+  updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- 인덱스 생성
+CREATE INDEX IF NOT EXISTS idx_pvp_ladder_rating ON pvp_ladder(rating DESC);
@@ -0,0 +1,230 @@
+"""
+스테이지 보스 테이블
+스테이지 곡선(보스 스탯, 등급 가중치, 보상 전투력, 필요 믹스 수)을 스테이지별 1회만 계산해 캐시하고,
+스테이지 번호 → 보스 개체를 전용 RNG로 생성해 프로세스 단위로 메모이즈합니다.
+전역 random 상태나 세션(도감 등)을 건드리지 않으므로 여러 세션이 공유해도 안전합니다.
+analysis/stage_power_mix.csv는 이 곡선에서 생성됩니다 (python -m analysis.stage_curve).
+"""
+import math
+import random
+import threading
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 보스 외형 (전 스테이지 공통)
+BOSS_APPEARANCE = {
+    "main_color": {"grade": "Normal", "id": "normal04"},
+    "sub_color": {"grade": "Normal", "id": "normal05"},
+    "pattern_color": {"grade": "Normal", "id": "normal06"},
+    "pattern": {"grade": "Normal", "id": "normal01"}
+}
+
+# 보상 개체 전투력 = 보스 전투력 × 1.1
+REWARD_POWER_RATIO = 1.1
+
+# 믹스 1회당 기대 전투력 증가량 (소수 첫째 자리 반올림)
+# 돌연변이 기대 횟수(최대 3연쇄) × 능력치 변이 80% × 능력치별 기대 증가 전투력 평균
+#   능력치별: HP 12.5, ATK 1.62×10, MS 1.25×5 → 평균 11.65 → 변이 1회당 9.32
+#   기본:        0.50 × (1 + 0.40 × (1 + 0.20)) = 0.74   → 6.90
+#   1위 보너스:  0.55 × (1 + 0.44 × (1 + 0.22)) ≈ 0.845  → 7.88
+MIX_POWER_GAIN_DEFAULT = 6.9
+MIX_POWER_GAIN_BONUS = 7.9
+
+
+def power_score(stats: Dict) -> int:
+    """전투력 계산: HP + ATK×10 + MS×5"""
+    return stats["hp"] + stats["atk"] * 10 + stats["ms"] * 5
+
+
+def stage_boss_stats(stage: int) -> Dict[str, int]:
+    """스테이지 보스 스탯 (모두 1.2배씩 증가)"""
+    # 기본 스탯 (스테이지에 비례)
+    base_hp = 100 + (stage - 1) * 50
+    base_atk = 10 + (stage - 1) * 5
+    base_ms = 10 + (stage - 1) * 3  # MS 기본값 증가 (5→10), 증가량 증가 (2→3)
+
+    growth = 1.2 ** (stage - 1)
+    return {
+        "hp": int(base_hp * growth),
+        "atk": int(base_atk * growth),
+        "ms": int(base_ms * growth)  # MS도 1.2배로 통일
+    }
+
+
+def stage_skill_count(stage: int) -> int:
+    """스테이지 보스 스킬 개수 (단계별 구간)"""
+    if stage <= 20:
+        return 0
+    elif stage <= 40:
+        return 1
+    elif stage <= 80:
+        return 2
+    return 3
+
+
+def stage_grade_weights(stage: int) -> Dict[str, float]:
+    """스테이지 보스 스킬 등급 가중치 (로그 스케일로 점진 상승, 0인 등급 제외)
+
+    log_stage 0 → Normal 100%
+    log_stage 1 → Normal 70%, Rare 25%, Epic 5%
+    log_stage 2 → Rare 40%, Epic 35%, Unique 20%, Legendary 5%
+    log_stage 3+ → Epic 20%, Unique 30%, Legendary 35%, Mystic 15%
+    """
+    log_stage = math.log10(max(stage, 1))
+    weights = {
+        "Normal": max(100 - log_stage * 50, 0),
+        "Rare": max(30 * log_stage - 10, 0),
+        "Epic": max(25 * log_stage, 5),
+        "Unique": max(30 * log_stage - 30, 0),
+        "Legendary": max(25 * log_stage - 40, 0),
+        "Mystic": max(15 * log_stage - 40, 0)
+    }
+    return {k: v for k, v in weights.items() if v > 0}
+
+
+def reward_grade_weights(stage: int, normal_scale: float = 1.0) -> Dict[str, float]:
+    """보상 개체 등급 가중치 (선형으로 점진 상승, 0인 등급 제외)
+
+    Args:
+        normal_scale: Normal 가중치 배수 (외형은 3배)
+    """
+    weights = {
+        "Normal": max(100 - stage * 0.4, 10) * normal_scale,  # 100 → 10 (느리게 감소)
+        "Rare": 30 + stage * 0.3,  # 30 → 90 (스테이지 200에서)
+        "Epic": 10 + stage * 0.25,  # 10 → 60
+        "Unique": max(stage * 0.2 - 10, 0),  # 50 스테이지부터 서서히
+        "Legendary": max(stage * 0.1 - 20, 0),  # 200 스테이지부터 서서히
+        "Mystic": max(stage * 0.05 - 30, 0)  # 600+ 스테이지부터 (극후반)
+    }
+    return {k: v for k, v in weights.items() if v > 0}
+
+
+def reward_stats_for_power(target_power: int) -> Dict[str, int]:
+    """목표 전투력에 맞춘 보상 스탯 분배
+
+    HP는 전투력의 35% (10단위), 나머지는 ATK:MS ≈ 2:1
+    (HP + ATK×10 + (ATK/2)×5 = HP + ATK×12.5) 로 나눈 뒤 부족분을 ATK/MS로 미세 조정한다.
+    """
+    hp = int((target_power * 0.35) / 10) * 10
+    remaining = target_power - hp
+    atk = int(remaining / 12.5)
+    ms = int(atk / 2)
+
+    # 미세 조정 (정확한 전투력 맞추기)
+    diff = target_power - (hp + atk * 10 + ms * 5)
+    if diff >= 10:
+        atk += 1
+    elif diff >= 5:
+        ms += 1
+    return {"hp": hp, "atk": atk, "ms": ms}
+
+
+def _weight_vector(weights: Dict[str, float]) -> Tuple[Tuple[str, ...], Tuple[float, ...]]:
+    """가중치 dict → random.choices에 바로 넘길 (등급, 가중치) 튜플"""
+    return tuple(weights.keys()), tuple(weights.values())
+
+
+@lru_cache(maxsize=None)
+def stage_curve(stage: int) -> Dict:
+    """스테이지 곡선 한 행 (스테이지별 1회 계산 후 캐시 - 반환값을 수정하지 말 것)
+
+    Returns:
+        {"stage", "boss_stats", "boss_power", "boss_skill_count", "boss_grade_weights",
+         "reward_power", "reward_stats", "reward_grade_weights", "reward_appearance_grade_weights",
+         "next_boss_power", "mix_needed_default", "mix_needed_bonus"}
+        *_grade_weights는 (등급 튜플, 가중치 튜플)
+    """
+    boss_stats = stage_boss_stats(stage)
+    boss_power = power_score(boss_stats)
+    reward_power = int(boss_power * REWARD_POWER_RATIO)
+    next_boss_power = power_score(stage_boss_stats(stage + 1))
+
+    # 보상 개체에서 다음 보스 전투력까지 믹스로 올려야 하는 횟수
+    gap = max(next_boss_power - reward_power, 0)
+    return {
+        "stage": stage,
+        "boss_stats": boss_stats,
+        "boss_power": boss_power,
+        "boss_skill_count": stage_skill_count(stage),
+        "boss_grade_weights": _weight_vector(stage_grade_weights(stage)),
+        "reward_power": reward_power,
+        "reward_stats": reward_stats_for_power(reward_power),
+        "reward_grade_weights": _weight_vector(reward_grade_weights(stage)),
+        "reward_appearance_grade_weights": _weight_vector(reward_grade_weights(stage, normal_scale=3)),
+        "next_boss_power": next_boss_power,
+        "mix_needed_default": math.ceil(gap / MIX_POWER_GAIN_DEFAULT),
+        "mix_needed_bonus": math.ceil(gap / MIX_POWER_GAIN_BONUS)
+    }
+
+
+def battle_only_instance(hp: int, atk: int, ms: int, accessory_1: Optional[Dict] = None,
+                         accessory_2: Optional[Dict] = None, accessory_3: Optional[Dict] = None,
+                         name: str = "", **_) -> Dict:
+    """전투에 필요한 필드만 있는 개체 (StageEnemyTable instance_factory용, 분석 스크립트에서 사용)
+
+    create_instance와 같은 인자를 받고 외형/ID 등 나머지 인자는 무시한다.
+    """
+    return {"name": name, "stats": {"hp": hp, "atk": atk, "ms": ms},
+            "accessory_1": accessory_1, "accessory_2": accessory_2, "accessory_3": accessory_3}
+
+
+class StageEnemyTable:
+    """스테이지 → 보스 개체 메모이즈 테이블 (세션 간 공유용)
+
+    스킬 선택은 스테이지별 전용 RNG(random.Random(stage * 12345))를 사용하므로
+    예전 전역 시드 방식과 같은 보스가 나온다. 반환된 dict는 캐시와 공유되므로 수정하면 안 된다.
+    """
+
+    def __init__(self, skill_master: Dict[str, dict], instance_factory: Callable[..., Dict]):
+        """
+        Args:
+            skill_master: 스킬 마스터 (등급/슬롯별 후보 목록을 1회 구성)
+            instance_factory: create_instance와 같은 인자를 받아 개체 dict를 만드는 함수
+                              (도감 등록 등 부수 효과가 없어야 함)
+        """
+        self._instance_factory = instance_factory
+        self._candidates: Dict[Tuple[str, int], List[str]] = {}
+        for skill_id, skill in skill_master.items():
+            self._candidates.setdefault((skill["grade"], skill["slot"]), []).append(skill_id)
+        self._enemies: Dict[int, Dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, stage: int) -> Dict:
+        """스테이지 보스 (처음 요청 시 생성, 이후 캐시 반환)"""
+        enemy = self._enemies.get(stage)
+        if enemy is None:
+            with self._lock:
+                enemy = self._enemies.get(stage)
+                if enemy is None:
+                    enemy = self._build(stage)
+                    self._enemies[stage] = enemy
+        return enemy
+
+    def __len__(self) -> int:
+        return len(self._enemies)
+
+    def _build(self, stage: int) -> Dict:
+        """스테이지 보스 생성 (스테이지 전용 RNG)"""
+        rng = random.Random(stage * 12345)
+        curve = stage_curve(stage)
+        grades_list, weight_list = curve["boss_grade_weights"]
+
+        accessories: List[Optional[Dict]] = [None, None, None]
+        for slot in range(1, curve["boss_skill_count"] + 1):
+            grade = rng.choices(grades_list, weights=weight_list, k=1)[0] if grades_list else "Normal"
+            candidates = self._candidates.get((grade, slot))
+            if candidates:
+                accessories[slot - 1] = {"grade": grade, "id": rng.choice(candidates)}
+
+        stats = curve["boss_stats"]
+        return self._instance_factory(
+            hp=stats["hp"],
+            atk=stats["atk"],
+            ms=stats["ms"],
+            accessory_1=accessories[0],
+            accessory_2=accessories[1],
+            accessory_3=accessories[2],
+            name=f"Stage {stage} Boss",
+            created_by="Battle",
+            **BOSS_APPEARANCE
+        )
@@ -1,4 +1,5 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import random
 import time
 from datetime import datetime, timezone, timedelta
@@ -32,6 +33,16 @@ from supabase_db import (
     reset_all_user_game_data, clear_all_mailbox
 )
 
+# 전투 엔진 (Streamlit 비의존 모듈)
+from battle_engine import (Buff, BattleInstance, Battle, set_skill_master, get_skill_master,
+                           add_skill_master_reload_listener, get_skill_master_digest,
+                           render_events, summarize_events, make_replay, replay_battle,
+                           coalesce_timeline, TIMELINE_FPS)
+from battle_sim import estimate_win_rate_sequential, find_max_clearable_stage, compare_builds
+from battle_cache import BattleResultCache, matchup_key
+from battle_profile import profile_battles
+from stage_table import StageEnemyTable, stage_curve, power_score
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -48,7 +59,7 @@ if "supabase_initialized" not in st.session_state:
 
 @st.cache_data(ttl=3600)  # 1시간 캐시
 def load_master_data_cached():
-    """Supabase에서 마스터 데이터 로드"""
+    """Supabase에서 마스터 데이터 로드 (스킬 정규화는 set_skill_master에서)"""
     return {
         "colors": load_master_colors(),
         "patterns": load_master_patterns(),
@@ -58,7 +69,8 @@ def load_master_data_cached():
 master_data = load_master_data_cached()
 COLOR_MASTER = master_data["colors"]
 PATTERN_MASTER = master_data["patterns"]
-SKILL_MASTER = master_data["skills"]
+set_skill_master(master_data["skills"])  # 전투 엔진에 등록 (멀티 이펙트 스키마 정규화 + 컴파일)
+SKILL_MASTER = get_skill_master()  # 정규화된 스킬 마스터 (전투 엔진과 공유)
 ACCESSORY_MASTER = SKILL_MASTER  # 하위 호환성
 
 # ============================================================================
@@ -245,9 +257,10 @@ def create_instance(
     name: str = "Unnamed",
     created_by: str = "Init",
     mutation_count: int = 0,
-    mutation_fields: List[str] = None
+    mutation_fields: List[str] = None,
+    register_collection: bool = True
 ) -> Dict:
-    """개체 생성"""
+    """개체 생성 (register_collection=False면 도감에 등록하지 않음)"""
     instance = {
         "id": generate_id(),
         "name": name,
@@ -277,7 +290,8 @@ def create_instance(
     }
     
     # 도감 업데이트
-    update_collection(instance)
+    if register_collection:
+        update_collection(instance)
     
     return instance
 
@@ -894,1537 +908,6 @@ def open_random_box(template_id: str, created_by: str = "RandomBox") -> Optional
         mutation_fields=[]
     )
 
-# ============================================================================
-# 전투 시스템
-# ============================================================================
-
-class Buff:
-    """버프/디버프 클래스"""
-    def __init__(self, buff_type: str, value: float, duration: int, source: str = "", count: int = 0):
-        self.type = buff_type
-        self.value = value
-        self.duration = duration
-        self.source = source
-        self.count = count  # 횟수 기반 효과용 (회피 횟수 등)
-
-class BattleInstance:
-    """전투용 개체 임시 데이터"""
-    def __init__(self, instance: Dict, is_player: bool = True):
-        self.original = instance
-        self.is_player = is_player
-        
-        # 기본 스탯
-        self.max_hp = instance["stats"]["hp"]
-        self.base_atk = instance["stats"]["atk"]
-        self.base_ms = instance["stats"]["ms"]
-        
-        # 현재 스탯
-        self.current_hp = self.max_hp
-        self.current_atk = self.base_atk
-        self.current_ms = self.base_ms
-        
-        # 버프/디버프
-        self.buffs = []
-        self.debuffs = []
-        
-        # 속도 게이지 (ATB 시스템)
-        self.speed_gauge = 0
-        
-        # 쉴드 (오버힐로 변환되는 임시 보호)
-        self.shield = 0
-        
-        # 반격 데미지 추적 (로그 표시용)
-        self.last_counter_damage = 0
-        
-        # 쿨다운 {slot: remaining_turns}
-        self.cooldowns = {1: 0, 2: 0, 3: 0}
-        
-        # Mystic 스킬 사용 여부
-        self.mystic_used = set()
-        
-        # 특수 상태
-        self.invincible = 0  # 무적 턴
-        self.stunned = 0  # 스턴 턴
-        self.revive_once = False  # 1회 부활
-        self.auto_revive_used = False  # 자동 부활 사용 여부 (전투당 1회)
-        self.auto_revive_hp = 0  # 자동 부활 시 HP
-        self.time_loop = 0  # 타임루프 턴
-        self.saved_state = None  # 저장된 상태
-        self.next_turn_first_strike = False  # 다음 턴 선공 플래그
-        self.next_turn_dodge_active = False  # 다음 상대 공격 회피 플래그
-        self.next_turn_dodge_chance = 0  # 다음 상대 공격 회피 확률
-        
-        # 스킬
-        self.skills = {}
-        for i in range(1, 4):
-            acc_key = f"accessory_{i}"
-            if instance.get(acc_key):
-                skill_id = instance[acc_key]["id"]
-                if skill_id in SKILL_MASTER:
-                    self.skills[i] = SKILL_MASTER[skill_id]
-    
-    def get_hp_percent(self) -> float:
-        return self.current_hp / self.max_hp if self.max_hp > 0 else 0
-    
-    def apply_buffs(self):
-        """버프 효과 적용하여 현재 스탯 계산"""
-        self.current_atk = self.base_atk
-        self.current_ms = self.base_ms
-        
-        # ATK 버프/디버프
-        atk_modifier = 1.0
-        for buff in self.buffs:
-            if buff.type == "atk_boost":
-                atk_modifier += buff.value
-        for debuff in self.debuffs:
-            if debuff.type == "atk_reduce":
-                atk_modifier -= debuff.value
-        
-        self.current_atk = int(self.base_atk * max(0.1, min(1.9, atk_modifier)))
-        
-        # MS 버프/디버프
-        ms_modifier = 0
-        for buff in self.buffs:
-            if buff.type == "ms_boost":
-                ms_modifier += int(buff.value)
-        for debuff in self.debuffs:
-            if debuff.type == "ms_reduce":
-                ms_modifier -= int(debuff.value)
-        
-        self.current_ms = max(1, self.base_ms + ms_modifier)
-    
-    def add_buff(self, buff_type: str, value: float, duration: int, source: str = "", count: int = 0):
-        """버프 추가"""
-        self.buffs.append(Buff(buff_type, value, duration, source, count))
-    
-    def add_debuff(self, debuff_type: str, value: float, duration: int, source: str = "", count: int = 0):
-        """디버프 추가"""
-        self.debuffs.append(Buff(debuff_type, value, duration, source, count))
-    
-    def tick_buffs(self):
-        """버프/디버프 지속시간 감소"""
-        # duration 감소 먼저
-        for b in self.buffs:
-            b.duration -= 1
-        for d in self.debuffs:
-            d.duration -= 1
-        
-        # 버프 제거 조건:
-        # - count 기반 버프(dodge_count): count가 0 이하일 때 제거
-        # - 일반 버프: duration이 0 이하일 때 제거
-        new_buffs = []
-        for b in self.buffs:
-            if b.type == "dodge_count":
-                # count 기반 버프는 count로만 관리
-                if b.count > 0:
-                    new_buffs.append(b)
-            else:
-                # 일반 버프는 duration으로 관리
-                if b.duration > 0:
-                    new_buffs.append(b)
-        
-        self.buffs = new_buffs
-        self.debuffs = [d for d in self.debuffs if d.duration > 0]
-        
-        # 쿨다운 감소
-        for slot in self.cooldowns:
-            if self.cooldowns[slot] > 0:
-                self.cooldowns[slot] -= 1
-        
-        # 특수 상태 감소
-        if self.invincible > 0:
-            self.invincible -= 1
-        if self.stunned > 0:
-            self.stunned -= 1
-        if self.time_loop > 0:
-            self.time_loop -= 1
-        
-        self.apply_buffs()
-
-class Battle:
-    """전투 매니저"""
-    def __init__(self, player_instance: Dict, enemy_instance: Dict):
-        self.player = BattleInstance(player_instance, is_player=True)
-        self.enemy = BattleInstance(enemy_instance, is_player=False)
-        self.turn = 0
-        self.log = []
-        self.max_turns = 50
-        self.winner = None
-        # 행동 임계값을 전투 시작 시 고정 (base MS 기준)
-        self.action_threshold = self.player.base_ms + self.enemy.base_ms
-    
-    def add_log(self, message: str):
-        """전투 로그 추가"""
-        self.log.append(f"턴 {self.turn}: {message}")
-    
-    def check_dodge_simple(self, defender: BattleInstance) -> bool:
-        """간단한 회피 체크 (소모 없음)"""
-        for buff in defender.buffs:
-            if buff.type == "dodge_count" and buff.count > 0:
-                return True
-        
-        dodge_chance = 0
-        for buff in defender.buffs:
-            if buff.type == "dodge_chance":
-                dodge_chance = max(dodge_chance, buff.value)
-        
-        if dodge_chance > 0 and random.random() < dodge_chance:
-            return True
-        
-        return False
-    
-    def check_and_consume_dodge(self, defender: BattleInstance, defender_name: str) -> Optional[str]:
-        """회피 체크 및 회피 횟수 소모
-        
-        Returns:
-            회피 성공 시 메시지, 실패 시 None
-        """
-        # 1. 다음 턴 회피 체크 (우선순위 높음)
-        if defender.next_turn_dodge_active:
-            dodge_chance = defender.next_turn_dodge_chance
-            roll = random.random()
-            if roll < dodge_chance:
-                defender.next_turn_dodge_active = False
-                defender.next_turn_dodge_chance = 0
-                return f"{defender_name}이(가) 공격을 회피했다! ({int(dodge_chance*100)}% 확률)"
-            else:
-                # 회피 실패 시 플래그 초기화
-                defender.next_turn_dodge_active = False
-                defender.next_turn_dodge_chance = 0
-        
-        # 2. 횟수 기반 회피 체크
-        for buff in defender.buffs:
-            if buff.type == "dodge_count" and buff.count > 0:
-                buff.count -= 1
-                remaining = buff.count
-                if buff.count <= 0:
-                    # 횟수 소진 시 버프 제거
-                    defender.buffs.remove(buff)
-                    return f"{defender_name}이(가) 공격을 회피했다! (마지막 회피!)"
-                return f"{defender_name}이(가) 공격을 회피했다! (남은 회피: {remaining}회)"
-        
-        # 3. 확률 기반 회피 체크
-        dodge_chance = 0
-        for buff in defender.buffs:
-            if buff.type == "dodge_chance":
-                dodge_chance = max(dodge_chance, buff.value)  # 최대 확률 적용
-        
-        if dodge_chance > 0 and random.random() < dodge_chance:
-            return f"{defender_name}이(가) 공격을 회피했다! ({int(dodge_chance*100)}% 확률)"
-        
-        return None
-    
-    def apply_damage(self, attacker: BattleInstance, defender: BattleInstance, damage: int) -> int:
-        """피해 적용 (immortal 버프 체크, shield 처리, lifesteal 처리, counter 처리)"""
-        # 쉴드 먼저 처리
-        if defender.shield > 0:
-            if defender.shield >= damage:
-                defender.shield -= damage
-                return damage
-            else:
-                remaining_damage = damage - defender.shield
-                defender.shield = 0
-                damage = remaining_damage
-        
-        has_immortal = any(buff.type == "immortal" for buff in defender.buffs)
-        if has_immortal:
-            new_hp = defender.current_hp - damage
-            defender.current_hp = max(1, new_hp)
-        else:
-            defender.current_hp = max(0, defender.current_hp - damage)
-        
-        # lifesteal 버프 처리
-        lifesteal_buff = next((buff for buff in attacker.buffs if buff.type == "lifesteal"), None)
-        if lifesteal_buff:
-            heal = int(damage * lifesteal_buff.value)
-            attacker.current_hp = min(attacker.max_hp, attacker.current_hp + heal)
-        
-        # counter(반격) 버프 처리 - 데미지를 받은 defender가 반격
-        counter_buff = next((buff for buff in defender.buffs if buff.type == "counter"), None)
-        if counter_buff and defender.current_hp > 0:
-            counter_damage = int(damage * counter_buff.value)
-            # immortal 체크
-            attacker_immortal = any(buff.type == "immortal" for buff in attacker.buffs)
-            if attacker_immortal:
-                attacker.current_hp = max(1, attacker.current_hp - counter_damage)
-            else:
-                attacker.current_hp = max(0, attacker.current_hp - counter_damage)
-            # 로그에 반격 데미지 기록 (나중에 표시용)
-            defender.last_counter_damage = counter_damage
-        else:
-            defender.last_counter_damage = 0
-        
-        return damage
-    
-    def apply_heal(self, target: BattleInstance, heal_amount: int) -> tuple:
-        """회복 적용 (오버힐은 쉴드로 전환)
-        
-        Returns:
-            (실제 회복량, 변환된 쉴드량)
-        """
-        # 힐 차단 디버프 확인
-        if any(d and d.type == "heal_block" for d in target.debuffs):
-            return 0, 0  # 회복 불가, 0 반환
-        
-        before_hp = target.current_hp
-        target.current_hp = min(target.max_hp, target.current_hp + heal_amount)
-        actual_heal = target.current_hp - before_hp
-        
-        # 오버힐 계산 (초과량의 50%만 쉴드로 변환)
-        overheal = heal_amount - actual_heal
-        if overheal > 0:
-            target.shield += int(overheal * 0.5)
-        
-        return actual_heal, overheal
-    
-    def tick_and_get_next_actor(self) -> Optional[BattleInstance]:
-        """게이지를 1틱만 진행하고 다음 행동자 반환 (ATB 시스템)
-        
-        행동 임계값 = 두 개체의 base MS 합계 (고정)
-        
-        Returns:
-            행동할 캐릭터, 아무도 행동 못하면 None
-        """
-        # 행동 임계값: 전투 시작 시 고정된 값 사용
-        action_threshold = self.action_threshold
-        
-        # 먼저 현재 게이지 확인 (증가 전)
-        player_ready = self.player.speed_gauge >= action_threshold
-        enemy_ready = self.enemy.speed_gauge >= action_threshold
-        
-        if player_ready and enemy_ready:
-            # 둘 다 준비되면 게이지가 더 높은 쪽 (동시면 랜덤)
-            if self.player.speed_gauge > self.enemy.speed_gauge:
-                self.player.speed_gauge -= action_threshold
-                return self.player
-            elif self.enemy.speed_gauge > self.player.speed_gauge:
-                self.enemy.speed_gauge -= action_threshold
-                return self.enemy
-            else:
-                actor = random.choice([self.player, self.enemy])
-                actor.speed_gauge -= action_threshold
-                return actor
-        elif player_ready:
-            self.player.speed_gauge -= action_threshold
-            return self.player
-        elif enemy_ready:
-            self.enemy.speed_gauge -= action_threshold
-            return self.enemy
-        
-        # 아무도 준비 안 됐으면 게이지 증가 (1틱만 진행)
-        self.player.speed_gauge += self.player.current_ms / 10
-        self.enemy.speed_gauge += self.enemy.current_ms / 10
-        
-        return None
-    
-    def select_skill(self, attacker: BattleInstance) -> Optional[int]:
-        """AI 스킬 선택"""
-        available_skills = []
-        priorities = []
-        
-        for slot, skill in attacker.skills.items():
-            # 쿨다운 체크
-            if attacker.cooldowns[slot] > 0:
-                continue
-            
-            # Mystic 스킬 체크
-            if skill["grade"] == "Mystic" and slot in attacker.mystic_used:
-                continue
-            
-            priority = 0
-            hp_percent = attacker.get_hp_percent()
-            enemy = self.enemy if attacker.is_player else self.player
-            enemy_hp_percent = enemy.get_hp_percent()
-            
-            # 슬롯별 우선순위
-            if slot == 1:  # 회복 스킬
-                if hp_percent < 0.3:
-                    priority += 100
-                elif hp_percent < 0.6:
-                    priority += 50
-                else:
-                    priority += 10
-            
-            elif slot == 2:  # 공격 스킬
-                if enemy_hp_percent < 0.4:
-                    priority += 80
-                elif enemy_hp_percent > 0.8:
-                    priority += 60
-                else:
-                    priority += 40
-            
-            elif slot == 3:  # MS/유틸 스킬
-                ms_ratio = enemy.current_ms / max(1, attacker.current_ms)
-                if ms_ratio > 1.5:
-                    priority += 90
-                elif ms_ratio > 1.2:
-                    priority += 70
-                elif ms_ratio > 1.0:
-                    priority += 50
-                else:
-                    priority += 30
-            
-            # 등급 보너스
-            grade_bonus = {
-                "Normal": 5, "Rare": 10, "Epic": 15,
-                "Unique": 20, "Legendary": 25, "Mystic": 30
-            }
-            priority += grade_bonus.get(skill["grade"], 0)
-            
-            # 랜덤 요소
-            priority += random.randint(-10, 10)
-            
-            available_skills.append(slot)
-            priorities.append(priority)
-        
-        if not available_skills:
-            return None
-        
-        # 가장 높은 우선순위 스킬 선택
-        max_priority_idx = priorities.index(max(priorities))
-        return available_skills[max_priority_idx]
-    
-    # ==================== 개별 효과 처리 함수들 (멀티 이펙트 시스템) ====================
-    
-    def _effect_heal(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """HP 회복 효과"""
-        if any(d and d.type == "heal_block" for d in attacker.debuffs):
-            return "(힐 차단 중!)"
-        heal_amount = int(attacker.max_hp * params.get("value", 0.1))
-        actual_heal, overheal = self.apply_heal(attacker, heal_amount)
-        msg = f"HP {actual_heal} 회복"
-        if overheal > 0:
-            msg += f" (쉴드 +{overheal})"
-        return msg
-    
-    def _effect_regen(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """지속 회복 버프"""
-        duration = params.get("duration", 3)
-        attacker.add_buff("regen", params.get("value", 0.05), duration)
-        return f"{duration}턴간 매턴 HP {int(params.get('value', 0.05)*100)}% 회복"
-
-    def _effect_drain(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """HP 흡수"""
-        if ctx.get("dodged"):
-            return ""
-        drain_amount = int(defender.current_hp * params.get("value", 0.2))
-        # immortal 체크
-        has_immortal = any(buff.type == "immortal" for buff in defender.buffs)
-        if has_immortal:
-            defender.current_hp = max(1, defender.current_hp - drain_amount)
-        else:
-            defender.current_hp = max(0, defender.current_hp - drain_amount)
-        attacker.current_hp = min(attacker.max_hp, attacker.current_hp + drain_amount)
-        return f"적 HP {drain_amount} 흡수"
-    
-    def _effect_heal_full(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """HP 완전 회복 (오버힐 → 쉴드 50%)"""
-        if any(d and d.type == "heal_block" for d in attacker.debuffs):
-            return "(힐 차단 중!)"
-        heal_amount = attacker.max_hp  # 최대 HP 만큼 힐
-        before_hp = attacker.current_hp
-        attacker.current_hp = min(attacker.max_hp, attacker.current_hp + heal_amount)
-        actual_heal = attacker.current_hp - before_hp
-        overheal = heal_amount - actual_heal
-        shield_gain = 0
-        if overheal > 0:
-            shield_gain = int(overheal * 0.5)
-            attacker.shield += shield_gain
-        if shield_gain > 0:
-            return f"HP 완전 회복 + 쉴드 {shield_gain}"
-        return "HP 완전 회복"
-    
-    def _effect_cleanse(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """디버프 제거"""
-        attacker.debuffs.clear()
-        return "모든 디버프 제거"
-    
-    def _effect_damage(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """기본 데미지"""
-        if ctx.get("dodged"):
-            return ""
-        multiplier = params.get("value", 1.0)
-        dmg = int(attacker.current_atk * multiplier)
-        self.apply_damage(attacker, defender, dmg)
-        return f"{dmg} 데미지"
-    
-    def _effect_fixed_dmg_percent(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """현재 HP 비례 고정 데미지"""
-        if ctx.get("dodged"):
-            return ""
-        dmg = int(defender.current_hp * params.get("value", 0.5))
-        # immortal 체크
-        has_immortal = any(buff.type == "immortal" for buff in defender.buffs)
-        if has_immortal:
-            defender.current_hp = max(1, defender.current_hp - dmg)
-        else:
-            defender.current_hp = max(0, defender.current_hp - dmg)
-        return f"고정 {dmg} 데미지"
-    
-    def _effect_fixed_dmg_maxhp(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """최대 HP 비례 고정 데미지"""
-        dmg = int(defender.max_hp * params.get("value", 0.3))
-        self.apply_damage(attacker, defender, dmg)
-        return f"최대HP {int(params.get('value',0.3)*100)}% 고정 피해 ({dmg})"
-    
-    def _effect_multi_hit(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """다단 히트"""
-        if ctx.get("dodged"):
-            return ""
-        hits = params.get("hits", 2)
-        dmg_per = params.get("dmg_per", 0.4)
-        total_dmg = 0
-        # immortal 체크
-        has_immortal = any(buff.type == "immortal" for buff in defender.buffs)
-        for _ in range(hits):
-            dmg = int(attacker.current_atk * dmg_per * random.uniform(0.8, 1.2))
-            if has_immortal:
-                defender.current_hp = max(1, defender.current_hp - dmg)
-            else:
-                defender.current_hp = max(0, defender.current_hp - dmg)
-            total_dmg += dmg
-        return f"{hits}회 연타! 총 {total_dmg} 데미지"
-    
-    def _effect_execute(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """처형 (HP 낮을 때 강화)"""
-        if ctx.get("dodged"):
-            return ""
-        hp_threshold = params.get("hp_threshold", 0.30)
-        dmg_boost = params.get("dmg_boost", 1.2)
-        
-        if defender.current_hp <= int(defender.max_hp * hp_threshold):
-            dmg = int(attacker.current_atk * (1.0 + dmg_boost))
-            self.apply_damage(attacker, defender, dmg)
-            return f"처형 발동! {dmg} 데미지 (+{int(dmg_boost*100)}%)"
-        else:
-            dmg = attacker.current_atk
-            self.apply_damage(attacker, defender, dmg)
-            return f"{dmg} 데미지 (적 HP {int(hp_threshold*100)}% 이하 시 강화)"
-    
-    def _effect_crit_chance(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """확률 크리티컬"""
-        if ctx.get("dodged"):
-            return ""
-        crit_chance = params.get("value", 0.35)
-        crit_dmg = params.get("crit_dmg", 1.35)
-        if random.random() < crit_chance:
-            dmg = int(attacker.current_atk * crit_dmg)
-            msg = f"크리티컬! {dmg} 데미지"
-        else:
-            dmg = attacker.current_atk
-            msg = f"{dmg} 데미지"
-        self.apply_damage(attacker, defender, dmg)
-        return msg
-    
-    def _effect_triple_crit(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """3회 크리티컬 판정"""
-        if ctx.get("dodged"):
-            return ""
-        crit_chance = params.get("crit_chance", 0.5)
-        crit_dmg = params.get("crit_dmg", 2.0)
-        total_dmg = 0
-        for _ in range(3):
-            if random.random() < crit_chance:
-                dmg = int(attacker.current_atk * crit_dmg)
-            else:
-                dmg = attacker.current_atk
-            self.apply_damage(attacker, defender, dmg)
-            total_dmg += dmg
-        return f"3회 크리티컬 판정! 총 {total_dmg} 데미지"
-    
-    def _effect_dot_dmg(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """즉시 데미지 + 지속 피해"""
-        if ctx.get("dodged"):
-            return ""
-        initial = int(attacker.current_atk * params.get("initial", 1.0))
-        self.apply_damage(attacker, defender, initial)
-        duration = params.get("duration", 3)
-        dot_value = params.get("dot_dmg", 0.2)
-        defender.add_debuff("dot_dmg", dot_value, duration)
-        return f"{initial} 데미지 + {duration}턴간 지속 피해"
-    
-    def _effect_dmg_hp_based(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """적 잃은 HP 비례 추가 데미지"""
-        if ctx.get("dodged"):
-            return ""
-        missing_hp = 1.0 - defender.get_hp_percent()
-        max_bonus = params.get("max_bonus", 0.5)
-        bonus = missing_hp * max_bonus
-        dmg = int(attacker.current_atk * (1.0 + bonus))
-        self.apply_damage(attacker, defender, dmg)
-        return f"{dmg} 데미지 (적 잃은 HP 비례)"
-    
-    def _effect_true_damage(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """관통 데미지 (회피 무시)"""
-        dmg = int(attacker.current_atk * params.get("value", 2.0))
-        self.apply_damage(attacker, defender, dmg)
-        return f"관통 {dmg} 데미지 (회피 무시)"
-    
-    def _effect_pierce_all(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """모든 방어 무시 데미지"""
-        dmg = attacker.current_atk
-        self.apply_damage(attacker, defender, dmg)
-        return f"관통 {dmg} 데미지 (모든 방어 무시)"
-    
-    def _effect_ultra_fixed(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """궁극 고정 피해"""
-        dmg = int(max(defender.current_hp, defender.max_hp) * 0.8)
-        self.apply_damage(attacker, defender, dmg)
-        return f"궁극 고정 피해 {dmg}"
-    
-    def _effect_atk_grow(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """공격 시 ATK 영구 증가"""
-        if ctx.get("dodged"):
-            return ""
-        dmg = attacker.current_atk
-        self.apply_damage(attacker, defender, dmg)
-        attacker.base_atk += dmg
-        attacker.current_atk += dmg
-        return f"{dmg} 데미지 + ATK 영구 +{dmg}"
-    
-    def _effect_ms_multi_hit(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """MS 기반 다단 히트"""
-        if ctx.get("dodged"):
-            return ""
-        hits = min(15, max(1, int(attacker.current_ms / 100)))
-        dmg_per = params.get("dmg_per", 0.18)
-        total_dmg = 0
-        for _ in range(hits):
-            dmg = int(attacker.current_atk * dmg_per)
-            self.apply_damage(attacker, defender, dmg)
-            total_dmg += dmg
-        return f"MS 기반 {hits}회 연타! 총 {total_dmg} 데미지"
-    
-    def _effect_ms_multi_hit_double(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """MS×2 기반 다단 히트"""
-        if ctx.get("dodged"):
-            return ""
-        hits = min(15, max(1, int(attacker.current_ms / 50)))
-        dmg_per = params.get("dmg_per", 0.15)
-        total_dmg = 0
-        for _ in range(hits):
-            dmg = int(attacker.current_atk * dmg_per)
-            self.apply_damage(attacker, defender, dmg)
-            total_dmg += dmg
-        return f"MS×2 기반 {hits}회 연타! 총 {total_dmg} 데미지"
-    
-    def _effect_buff(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """버프 부여"""
-        buff_type = params.get("buff_type", "atk_boost")
-        value = params.get("value", 0.3)
-        duration = params.get("duration", 3)
-        
-        # MS 버프는 base_ms 기준으로 계산
-        if buff_type == "ms_boost":
-            value = int(attacker.base_ms * params.get("value", 0.2))
-        
-        # regen 버프는 발동 턴에 즉시 회복 + 남은 턴 버프
-        if buff_type == "regen":
-            # 힐 차단 확인
-            if any(d and d.type == "heal_block" for d in attacker.debuffs):
-                heal_msg = "(힐 차단 중!)"
-            else:
-                immediate_heal = int(attacker.max_hp * params.get("value", 0.05))
-                actual_heal, shield_gained = self.apply_heal(attacker, immediate_heal)
-                if shield_gained > 0:
-                    heal_msg = f"HP {actual_heal} 회복 (쉴드 +{shield_gained})"
-                else:
-                    heal_msg = f"HP {actual_heal} 회복"
-            
-            # 남은 턴에 대해 버프 추가 (tick_buffs가 먼저 실행되므로 duration 그대로 사용)
-            if duration > 1:
-                attacker.add_buff(buff_type, params.get("value", 0.05), duration)
-                return f"{heal_msg} + {duration - 1}턴간 추가 HP {int(params.get('value',0.05)*100)}% 회복"
-            else:
-                return heal_msg
-        
-        attacker.add_buff(buff_type, value, duration)
-        
-        # 버프 타입별 메시지
-        buff_names = {
-            "atk_boost": f"ATK +{int(params.get('value',0.3)*100)}%",
-            "ms_boost": f"MS +{int(params.get('value',0.2)*100)}%",
-            "def_boost": f"방어 +{int(params.get('value',0.1)*100)}%",
-            "lifesteal": f"흡혈 {int(params.get('value',0.25)*100)}%",
-            "counter": f"반격 {int(params.get('value',0.5)*100)}%",
-            "reflect": f"반사 {int(params.get('value',0.5)*100)}%",
-            "regen": f"HP {int(params.get('value',0.05)*100)}% 회복",
-            "dodge_chance": f"회피 {int(params.get('value',0.5)*100)}%",
-            "guaranteed_crit": f"확정 크리티컬 +{int(params.get('value',0.5)*100)}%",
-            "dmg_boost_once": f"데미지 +{int(params.get('value',1.5)*100)}%",
-            "double_speed": "2배속 행동",
-            "double_hit": "2회 공격",
-            "invincible": "무적",
-            "immortal": "불사",
-            "auto_revive": f"부활 HP {int(params.get('value',1.0)*100)}%",
-            "revive_once": f"1회 부활 HP {int(params.get('value',0.6)*100)}%",
-            "max_hp_grow": f"매턴 최대HP {int(params.get('value',0.05)*100)}% 증가",
-            "random_effect": "랜덤 효과",
-            "death_loop": "사망 시 턴 되돌리기",
-            "delayed_burst": "데미지 누적 후 폭발",
-            "atk_stack": f"매턴 ATK +{int(params.get('value',0.05)*100)}% 누적"
-        }
-        buff_desc = buff_names.get(buff_type, buff_type)
-        return f"{duration}턴간 {buff_desc}"
-    
-    def _effect_debuff(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """적에게 디버프"""
-        debuff_type = params.get("debuff_type", "atk_reduce")
-        value = params.get("value", 0.2)
-        duration = params.get("duration", 2)
-        defender.add_debuff(debuff_type, value, duration)
-        
-        debuff_names = {
-            "atk_reduce": f"적 ATK -{int(value*100)}%",
-            "ms_reduce": f"적 MS -{int(value*100)}%",
-            "def_reduce": f"적 방어 -{int(value*100)}%",
-            "heal_block": "적 힐 차단",
-            "dot_dmg": f"적 매턴 {int(value*100)}% 피해",
-            "no_regen": "자연 회복 불가"
-        }
-        debuff_desc = debuff_names.get(debuff_type, debuff_type)
-        return f"{duration}턴간 {debuff_desc}"
-    
-    def _effect_self_debuff(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """자신에게 디버프"""
-        debuff_type = params.get("debuff_type", "vulnerability")
-        value = params.get("value", 0.3)
-        duration = params.get("duration", 5)
-        attacker.add_debuff(debuff_type, value, duration)
-        
-        debuff_names = {
-            "vulnerability": f"받는 피해 +{int(value*100)}%",
-            "heal_reduce": f"회복 -{int(value*100)}%",
-            "recoil_hp": f"종료 시 HP {int(value*100)}% 손실",
-            "no_regen": "자연 회복 불가"
-        }
-        debuff_desc = debuff_names.get(debuff_type, debuff_type)
-        return f"({debuff_desc})"
-    
-    def _effect_dodge_count(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """횟수 기반 확정 회피"""
-        count = int(params.get("count", params.get("value", 1)))
-        attacker.add_buff("dodge_count", 1.0, 999, count=count)
-        return f"{count}회 확정 회피"
-    
-    def _effect_next_turn_dodge(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """다음 공격 확률 회피"""
-        attacker.next_turn_dodge_active = True
-        attacker.next_turn_dodge_chance = params.get("value", 0.9)
-        return f"다음 공격 {int(params.get('value', 0.9)*100)}% 회피"
-    
-    def _effect_stun(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """스턴"""
-        defender.stunned = params.get("duration", 1)
-        return f"적 {params.get('duration', 1)}턴 행동 불가"
-    
-    def _effect_extra_action(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """추가 행동"""
-        attacker.speed_gauge += attacker.current_ms + defender.current_ms
-        return "추가 행동 획득"
-    
-    def _effect_hp_cost(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """HP 소모"""
-        hp_cost = int(attacker.max_hp * params.get("value", 0.1))
-        attacker.current_hp = max(1, attacker.current_hp - hp_cost)
-        return f"HP {hp_cost} 소모"
-    
-    def _effect_atk_cost(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """ATK 희생"""
-        atk_cost = int(attacker.base_atk * params.get("value", 0.1))
-        attacker.current_atk = max(1, attacker.current_atk - atk_cost)
-        return f"ATK {atk_cost} 희생"
-    
-    def _effect_max_hp_increase(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """최대 HP 증가"""
-        hp_increase = int(attacker.max_hp * params.get("value", 0.1))
-        attacker.max_hp += hp_increase
-        return f"최대HP +{hp_increase}"
-    
-    def _effect_atk_perma_increase(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """ATK 영구 증가"""
-        atk_increase = int(attacker.base_atk * params.get("value", 0.15))
-        attacker.base_atk += atk_increase
-        attacker.current_atk += atk_increase
-        return f"ATK 영구 +{int(params.get('value',0.15)*100)}%"
-    
-    def _effect_hp_swap(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """HP 교환"""
-        temp_hp = attacker.current_hp
-        attacker.current_hp = defender.current_hp
-        defender.current_hp = temp_hp
-        return f"HP 교환 (아군 {attacker.current_hp}, 적군 {defender.current_hp})"
-    
-    def _effect_stat_swap(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """모든 스탯 교환 (base 포함 - apply_buffs에서 리셋되므로)"""
-        # max_hp 교환
-        temp_max_hp = attacker.max_hp
-        attacker.max_hp = defender.max_hp
-        defender.max_hp = temp_max_hp
-        
-        # base 스탯 교환 (apply_buffs에서 리셋되므로 base도 교환해야 함)
-        temp_base_atk, temp_base_ms = attacker.base_atk, attacker.base_ms
-        attacker.base_atk, attacker.base_ms = defender.base_atk, defender.base_ms
-        defender.base_atk, defender.base_ms = temp_base_atk, temp_base_ms
-        
-        # current 스탯 교환
-        temp_hp, temp_atk, temp_ms = attacker.current_hp, attacker.current_atk, attacker.current_ms
-        attacker.current_hp, attacker.current_atk, attacker.current_ms = defender.current_hp, defender.current_atk, defender.current_ms
-        defender.current_hp, defender.current_atk, defender.current_ms = temp_hp, temp_atk, temp_ms
-        return "모든 스탯 교환"
-    
-    def _effect_rewind(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """시간 역행"""
-        heal = int(attacker.max_hp * 0.5)
-        attacker.current_hp = min(attacker.max_hp, attacker.current_hp + heal)
-        for slot in attacker.cooldowns:
-            attacker.cooldowns[slot] = max(0, attacker.cooldowns[slot] - 1)
-        return f"HP {heal} 회복 + 쿨다운 1턴 감소"
-    
-    def _effect_drain_maxhp(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """적 최대HP 흡수"""
-        drain = int(defender.max_hp * params.get("value", 0.15))
-        defender.max_hp = max(1, defender.max_hp - drain)
-        defender.current_hp = min(defender.current_hp, defender.max_hp)
-        attacker.max_hp += drain
-        attacker.current_hp += drain 
-        return f"최대HP {drain} 흡수"
-    
-    def _effect_instant_atk(self, attacker: BattleInstance, defender: BattleInstance, params: dict, ctx: dict) -> str:
-        """즉발 공격"""
-        if ctx.get("dodged"):
-            return ""
-        dmg = int(attacker.current_atk * params.get("dmg_percent", 0.8))
-        self.apply_damage(attacker, defender, dmg)
-        return f"즉발 {dmg} 데미지"
-    
-    # 효과 처리 함수 맵핑
-    def _get_effect_handlers(self):
-        """효과 타입별 처리 함수 맵핑"""
-        return {
-            # 회복 계열
-            "heal": self._effect_heal,
-            "regen": self._effect_regen,
-            "drain": self._effect_drain,
-            "heal_full": self._effect_heal_full,
-            "cleanse": self._effect_cleanse,
-            
-            # 데미지 계열
-            "damage": self._effect_damage,
-            "fixed_dmg_percent": self._effect_fixed_dmg_percent,
-            "fixed_dmg_maxhp": self._effect_fixed_dmg_maxhp,
-            "multi_hit": self._effect_multi_hit,
-            "execute": self._effect_execute,
-            "crit_chance": self._effect_crit_chance,
-            "triple_crit": self._effect_triple_crit,
-            "dot_dmg": self._effect_dot_dmg,
-            "dmg_hp_based": self._effect_dmg_hp_based,
-            "true_damage": self._effect_true_damage,
-            "pierce_all": self._effect_pierce_all,
-            "ultra_fixed": self._effect_ultra_fixed,
-            "atk_grow": self._effect_atk_grow,
-            "ms_multi_hit": self._effect_ms_multi_hit,
-            "ms_multi_hit_double": self._effect_ms_multi_hit_double,
-            "instant_atk": self._effect_instant_atk,
-            
-            # 버프/디버프 계열
-            "buff": self._effect_buff,
-            "debuff": self._effect_debuff,
-            "self_debuff": self._effect_self_debuff,
-            "dodge_count": self._effect_dodge_count,
-            "next_turn_dodge": self._effect_next_turn_dodge,
-            "stun": self._effect_stun,
-            
-            # 유틸리티 계열
-            "extra_action": self._effect_extra_action,
-            "hp_cost": self._effect_hp_cost,
-            "atk_cost": self._effect_atk_cost,
-            "max_hp_increase": self._effect_max_hp_increase,
-            "atk_perma_increase": self._effect_atk_perma_increase,
-            "hp_swap": self._effect_hp_swap,
-            "stat_swap": self._effect_stat_swap,
-            "rewind": self._effect_rewind,
-            "drain_maxhp": self._effect_drain_maxhp,
-        }
-    
-    def _convert_legacy_skill(self, skill: dict) -> list:
-        """기존 단일 effect 스킬을 멀티 이펙트 형식으로 변환"""
-        # 디버그 로그
-        print(f"[DEBUG] _convert_legacy_skill called")
-        print(f"[DEBUG] skill keys: {list(skill.keys())}")
-        print(f"[DEBUG] 'effects' in skill: {'effects' in skill}")
-        if 'effects' in skill:
-            print(f"[DEBUG] effects value: {skill['effects']}")
-        
-        # 이미 effects 배열이 있으면 그대로 반환 (멀티 이펙트 스킬)
-        if "effects" in skill:
-            return skill["effects"]
-        
-        # 레거시 effect 필드가 없으면 빈 배열
-        effect = skill.get("effect", "")
-        if not effect:
-            return []
-        
-        # 기존 effect를 멀티 이펙트로 변환
-        effects = []
-        
-        # 복합 효과들을 분해
-        if effect == "heal_dodge":
-            # 회복 + 확률적 회피
-            effects.append({"type": "heal", "value": skill.get("value", 0.1)})
-            if random.random() < skill.get("block_chance", 0.5):
-                effects.append({"type": "dodge_count", "count": 1})
-        
-        elif effect == "heal_conditional":
-            # 조건부 회복
-            hp_threshold = skill.get("hp_threshold", 0.5)
-            effects.append({"type": "heal", "value": skill.get("value", 0.15), "condition": f"hp_below_{int(hp_threshold*100)}"})
-        
-        elif effect == "heal_ms":
-            # 회복 + MS 버프
-            effects.append({"type": "heal", "value": skill.get("value", 0.15)})
-            effects.append({"type": "buff", "buff_type": "ms_boost", "value": skill.get("ms_boost", 0.1), "duration": skill.get("duration", 2)})
-        
-        elif effect == "heal_sacrifice":
-            # ATK 희생 + 회복
-            effects.append({"type": "atk_cost", "value": skill.get("atk_cost", 0.1)})
-            effects.append({"type": "heal", "value": skill.get("value", 0.22)})
-        
-        elif effect == "heal_maxhp":
-            # 최대HP 증가 + 회복
-            effects.append({"type": "max_hp_increase", "value": skill.get("max_hp_boost", 0.1)})
-            effects.append({"type": "heal", "value": skill.get("value", 0.07)})
-        
-        elif effect == "heal_cleanse":
-            # 회복 + 디버프 제거
-            effects.append({"type": "heal", "value": skill.get("value", 0.55)})
-            effects.append({"type": "cleanse"})
-        
-        elif effect == "heal_allbuff":
-            # 회복 + 전체 스탯 버프
-            effects.append({"type": "heal", "value": skill.get("value", 0.25)})
-            stat_boost = skill.get("stat_boost", 0.25)
-            duration = skill.get("duration", 2)
-            effects.append({"type": "buff", "buff_type": "atk_boost", "value": stat_boost, "duration": duration})
-            effects.append({"type": "buff", "buff_type": "ms_boost", "value": stat_boost, "duration": duration})
-        
-        elif effect == "heal_regen":
-            # 즉시 회복 + 지속 회복
-            effects.append({"type": "heal", "value": skill.get("value", 0.30)})
-            effects.append({"type": "buff", "buff_type": "regen", "value": skill.get("regen", 0.10), "duration": skill.get("duration", 4)})
-        
-        elif effect == "heal_revive":
-            # 회복 + 부활 버프
-            effects.append({"type": "heal", "value": skill.get("value", 0.45)})
-            effects.append({"type": "buff", "buff_type": "revive_once", "value": skill.get("revive_hp", 0.6), "duration": 999})
-        
-        elif effect == "heal_full_noheal":
-            # 완전 회복 + 자연 회복 불가
-            effects.append({"type": "heal_full"})
-            effects.append({"type": "self_debuff", "debuff_type": "no_regen", "value": 1.0, "duration": skill.get("duration", 3)})
-        
-        elif effect == "heal_full_grow":
-            # 완전 회복 + 최대HP 성장
-            effects.append({"type": "heal_full"})
-            effects.append({"type": "buff", "buff_type": "max_hp_grow", "value": skill.get("max_hp_grow", 0.05), "duration": skill.get("duration", 5)})
-        
-        elif effect == "heal_def":
-            # 회복 + 방어 버프
-            effects.append({"type": "heal", "value": skill.get("value", 0.08)})
-            effects.append({"type": "buff", "buff_type": "def_boost", "value": skill.get("def_boost", 0.10), "duration": skill.get("duration", 1)})
-        
-        elif effect == "damage_buff":
-            # 데미지 + 버프
-            effects.append({"type": "damage", "value": skill.get("dmg_value", 0.5)})
-            effects.append({"type": "buff", "buff_type": skill.get("buff_type", "atk_boost"), "value": skill.get("buff_value", 0.3), "duration": skill.get("duration", 3)})
-        
-        elif effect == "damage_debuff":
-            # 데미지 + 적 디버프
-            effects.append({"type": "damage", "value": skill.get("dmg_value", 1.3)})
-            effects.append({"type": "debuff", "debuff_type": skill.get("debuff_type", "atk_reduce"), "value": skill.get("debuff_value", 0.2), "duration": skill.get("duration", 2)})
-        
-        elif effect == "damage_ms_reduce":
-            # 데미지 + MS 감소
-            effects.append({"type": "damage", "value": skill.get("dmg_value", 0.8)})
-            effects.append({"type": "debuff", "debuff_type": "ms_reduce", "value": skill.get("ms_reduce", 0.3), "duration": skill.get("duration", 3)})
-        
-        elif effect == "dmg_heal_block":
-            # 데미지 + 힐 차단
-            effects.append({"type": "damage", "value": 1.0 + skill.get("dmg_boost", 0.8)})
-            effects.append({"type": "debuff", "debuff_type": "heal_block", "value": 1.0, "duration": skill.get("heal_block", 2)})
-        
-        elif effect == "dmg_heal_reduce":
-            # 데미지 + 자신 회복 감소
-            effects.append({"type": "damage", "value": 1.0 + skill.get("dmg_boost", 1.0)})
-            effects.append({"type": "self_debuff", "debuff_type": "heal_reduce", "value": skill.get("heal_reduce", 0.5), "duration": 999})
-        
-        elif effect == "dmg_ignore_def":
-            # 방어 무시 데미지
-            effects.append({"type": "damage", "value": 1.0 + skill.get("dmg_boost", 0.5), "ignore_def": True})
-        
-        elif effect == "fixed_heal_block":
-            # 고정 피해 + 힐 차단
-            effects.append({"type": "fixed_dmg_percent", "value": skill.get("dmg_percent", 0.7)})
-            effects.append({"type": "debuff", "debuff_type": "heal_block", "value": 1.0, "duration": skill.get("heal_block", 5)})
-        
-        elif effect == "maxhp_perma_atk":
-            # 최대HP 비례 피해 + ATK 영구 증가
-            effects.append({"type": "fixed_dmg_maxhp", "value": skill.get("dmg_percent", 0.4)})
-            effects.append({"type": "atk_perma_increase", "value": skill.get("atk_grow", 0.2)})
-        
-        elif effect == "atk_hp_trade":
-            # HP 소모 + ATK 버프
-            effects.append({"type": "hp_cost", "value": skill.get("hp_cost", 0.05)})
-            effects.append({"type": "buff", "buff_type": "atk_boost", "value": skill.get("atk_boost", 0.7), "duration": skill.get("duration", 6)})
-        
-        elif effect == "atk_vuln":
-            # ATK 버프 + 받는 피해 증가
-            effects.append({"type": "buff", "buff_type": "atk_boost", "value": skill.get("atk_boost", 0.8), "duration": skill.get("duration", 5)})
-            effects.append({"type": "self_debuff", "debuff_type": "vulnerability", "value": skill.get("vuln", 0.3), "duration": skill.get("duration", 5)})
-        
-        elif effect == "atk_recoil":
-            # ATK 버프 + HP 손실 예약
-            effects.append({"type": "buff", "buff_type": "atk_boost", "value": skill.get("atk_boost", 0.6), "duration": skill.get("duration", 5)})
-            effects.append({"type": "self_debuff", "debuff_type": "recoil_hp", "value": skill.get("recoil_hp", 0.2), "duration": skill.get("duration", 5)})
-        
-        elif effect == "atk_stack":
-            # ATK 버프 + 매턴 누적
-            effects.append({"type": "buff", "buff_type": "atk_boost", "value": skill.get("initial", 0.4), "duration": skill.get("duration", 4)})
-            effects.append({"type": "buff", "buff_type": "atk_stack", "value": skill.get("stack_per_turn", 0.05), "duration": skill.get("duration", 4)})
-        
-        elif effect == "atk_buff":
-            effects.append({"type": "buff", "buff_type": "atk_boost", "value": skill.get("value", 0.15), "duration": skill.get("duration", 3)})
-        
-        elif effect == "def_break":
-            effects.append({"type": "debuff", "debuff_type": "def_reduce", "value": skill.get("value", 0.2), "duration": skill.get("duration", 2)})
-        
-        elif effect == "ms_buff":
-            effects.append({"type": "buff", "buff_type": "ms_boost", "value": skill.get("value", 0.2), "duration": skill.get("duration", 3)})
-        
-        elif effect == "ms_atk_buff":
-            effects.append({"type": "buff", "buff_type": "ms_boost", "value": skill.get("ms_boost", 1.2), "duration": skill.get("duration", 4)})
-            effects.append({"type": "buff", "buff_type": "atk_boost", "value": skill.get("atk_boost", 0.2), "duration": skill.get("duration", 4)})
-        
-        elif effect == "lifesteal":
-            effects.append({"type": "buff", "buff_type": "lifesteal", "value": skill.get("value", 0.25), "duration": skill.get("duration", 3)})
-        
-        elif effect == "counter":
-            effects.append({"type": "buff", "buff_type": "counter", "value": skill.get("value", 0.5), "duration": skill.get("duration", 1)})
-        
-        elif effect == "reflect":
-            effects.append({"type": "buff", "buff_type": "reflect", "value": skill.get("value", 0.5), "duration": skill.get("duration", 2)})
-        
-        elif effect == "dodge":
-            effects.append({"type": "buff", "buff_type": "dodge_chance", "value": skill.get("value", 0.5), "duration": skill.get("duration", 1)})
-        
-        elif effect == "dodge_multi":
-            effects.append({"type": "dodge_count", "count": skill.get("value", 1)})
-        
-        elif effect == "dodge_ms_buff":
-            effects.append({"type": "dodge_count", "count": int(skill.get("dodge", 1))})
-            effects.append({"type": "buff", "buff_type": "ms_boost", "value": skill.get("ms_boost", 0.6), "duration": skill.get("duration", 3)})
-        
-        elif effect == "dodge_heal":
-            effects.append({"type": "dodge_count", "count": skill.get("dodge_count", 3)})
-            effects.append({"type": "heal", "value": skill.get("heal_value", 0.15)})
-        
-        elif effect == "dmg_boost_once":
-            effects.append({"type": "buff", "buff_type": "dmg_boost_once", "value": skill.get("value", 1.5), "duration": 1})
-        
-        elif effect == "guaranteed_crit":
-            effects.append({"type": "buff", "buff_type": "guaranteed_crit", "value": skill.get("dmg_boost", 0.5), "duration": skill.get("duration", 2)})
-        
-        elif effect == "double_speed":
-            effects.append({"type": "buff", "buff_type": "double_speed", "value": 1.0, "duration": skill.get("duration", 3)})
-        
-        elif effect == "ms_double_hit":
-            effects.append({"type": "buff", "buff_type": "ms_boost", "value": skill.get("ms_boost", 5.0), "duration": skill.get("duration", 5)})
-            effects.append({"type": "buff", "buff_type": "double_hit", "value": 1.0, "duration": skill.get("duration", 5)})
-        
-        elif effect == "invincible" or effect == "invincible_atk":
-            effects.append({"type": "buff", "buff_type": "invincible", "value": 1.0, "duration": skill.get("duration", 3)})
-        
-        elif effect == "immortal":
-            effects.append({"type": "buff", "buff_type": "immortal", "value": 1.0, "duration": skill.get("duration", 7)})
-        
-        elif effect == "auto_revive":
-            effects.append({"type": "buff", "buff_type": "auto_revive", "value": skill.get("revive_hp", 1.0), "duration": 999})
-        
-        elif effect == "random_effect":
-            effects.append({"type": "buff", "buff_type": "random_effect", "value": 1.0, "duration": skill.get("duration", 5)})
-        
-        elif effect == "death_loop":
-            effects.append({"type": "buff", "buff_type": "death_loop", "value": 1.0, "duration": skill.get("duration", 5)})
-        
-        elif effect == "delayed_burst":
-            effects.append({"type": "buff", "buff_type": "delayed_burst", "value": 1.0, "duration": skill.get("duration", 5)})
-        
-        elif effect == "atk_debuff_enemy":
-            effects.append({"type": "debuff", "debuff_type": "atk_reduce", "value": skill.get("value", 0.8), "duration": skill.get("duration", 2)})
-        
-        elif effect == "ms_debuff_enemy":
-            effects.append({"type": "debuff", "debuff_type": "ms_reduce", "value": skill.get("value", 0.3), "duration": skill.get("duration", 3)})
-        
-        # 단일 효과들
-        elif effect in ["heal", "regen", "drain", "damage", "fixed_dmg_percent", "fixed_dmg_maxhp",
-                       "multi_hit", "execute", "crit_chance", "triple_crit", "dot_dmg", "dmg_hp_based",
-                       "true_damage", "pierce_all", "ultra_fixed", "atk_grow", "ms_multi_hit",
-                       "ms_multi_hit_double", "next_turn_dodge", "stun", "extra_action", "hp_swap",
-                       "stat_swap", "rewind", "drain_maxhp", "instant_atk"]:
-            # 단일 효과는 그대로 변환
-            effect_params = {"type": effect}
-            for key in ["value", "duration", "hits", "dmg_per", "hp_threshold", "dmg_boost",
-                       "crit_chance", "crit_dmg", "initial", "dot_dmg", "max_bonus", "dmg_percent"]:
-                if key in skill:
-                    effect_params[key] = skill[key]
-            effects.append(effect_params)
-        
-        else:
-            # 알 수 없는 효과는 단일 효과로 처리
-            effects.append({"type": effect, **{k: v for k, v in skill.items() if k not in ["grade", "slot", "name", "resource", "effect", "cooldown", "desc"]}})
-        
-        return effects
-    
-    def use_skill(self, attacker: BattleInstance, skill_slot: int) -> str:
-        """스킬 사용 (멀티 이펙트 시스템)"""
-        if skill_slot not in attacker.skills:
-            return "스킬 없음"
-        
-        skill = attacker.skills[skill_slot]
-        defender = self.enemy if attacker.is_player else self.player
-        attacker_name = "아군" if attacker.is_player else "적군"
-        defender_name = "적군" if attacker.is_player else "아군"
-        
-        # 쿨다운 설정
-        attacker.cooldowns[skill_slot] = skill.get("cooldown", 3)
-        
-        # Mystic 스킬 마킹
-        if skill.get("grade") == "Mystic":
-            attacker.mystic_used.add(skill_slot)
-        
-        result = f"{attacker_name}이(가) '{skill['name']}' 사용!"
-        
-        # 디버그: skill 객체의 키 확인
-        print(f"[DEBUG] skill name: {skill.get('name')}")
-        print(f"[DEBUG] skill keys: {list(skill.keys())}")
-        print(f"[DEBUG] 'effects' in skill: {'effects' in skill}")
-        
-        # 효과 목록 가져오기 (직접 확인)
-        if "effects" in skill and skill["effects"]:
-            effects = skill["effects"]
-            print(f"[DEBUG] Using skill['effects'] directly: {effects}")
-        else:
-            effects = self._convert_legacy_skill(skill)
-            print(f"[DEBUG] Using _convert_legacy_skill result: {effects}")
-        
-        if not effects:
-            return result + f" 효과 발동! [DEBUG: effects empty, skill keys={list(skill.keys())}]"
-        
-        # 회피 체크 (공격 효과가 있는 경우만)
-        attack_effects = {"damage", "fixed_dmg_percent", "multi_hit", "execute", "crit_chance",
-                         "triple_crit", "dot_dmg", "dmg_hp_based", "atk_grow", "ms_multi_hit",
-                         "ms_multi_hit_double", "drain", "instant_atk"}
-        has_attack = any(e.get("type") in attack_effects for e in effects)
-        
-        ctx = {"dodged": False}
-        if has_attack:
-            if self.check_dodge_simple(defender):
-                dodged = self.check_and_consume_dodge(defender, defender_name)
-                result += f" -> {dodged}"
-                ctx["dodged"] = True
-        
-        # 효과 처리 함수 맵
-        handlers = self._get_effect_handlers()
-        
-        # 각 효과 순차 처리
-        effect_results = []
-        for effect_data in effects:
-            effect_type = effect_data.get("type", "")
-            
-            # 조건 체크
-            condition = effect_data.get("condition", "")
-            if condition.startswith("hp_below_"):
-                threshold = int(condition.split("_")[-1]) / 100.0
-                if attacker.get_hp_percent() > threshold:
-                    effect_results.append(f"(HP {int(threshold*100)}% 이하 시 발동)")
-                    continue
-            
-            # 핸들러 실행
-            if effect_type in handlers:
-                msg = handlers[effect_type](attacker, defender, effect_data, ctx)
-                if msg:
-                    effect_results.append(msg)
-            else:
-                # 알 수 없는 효과
-                effect_results.append(f"효과 발동")
-        
-        # 결과 조합
-        if effect_results:
-            result += " " + " + ".join(effect_results) + "!"
-        
-        # 버프/디버프로 인한 스탯 변경사항 즉시 반영
-        attacker.apply_buffs()
-        defender.apply_buffs()
-        
-        return result
-    
-    def basic_attack(self, attacker: BattleInstance) -> str:
-        """기본 공격"""
-        defender = self.enemy if attacker.is_player else self.player
-        attacker_name = "아군" if attacker.is_player else "적군"
-        defender_name = "적군" if attacker.is_player else "아군"
-        
-        # 회피 체크
-        dodged = self.check_and_consume_dodge(defender, defender_name)
-        if dodged:
-            return dodged
-        
-        # 데미지 계산
-        base_dmg = attacker.current_atk * random.uniform(0.8, 1.2)
-        
-        # dmg_boost_once 버프 적용 (1턴 데미지 증가)
-        dmg_boost_buff = next((b for b in attacker.buffs if b.type == "dmg_boost_once"), None)
-        if dmg_boost_buff:
-            base_dmg *= (1.0 + dmg_boost_buff.value)
-            attacker.buffs.remove(dmg_boost_buff)  # 1회 사용 후 제거
-        
-        # guaranteed_crit 버프 적용 (확정 크리티컬)
-        crit_buff = next((b for b in attacker.buffs if b.type == "guaranteed_crit"), None)
-        if crit_buff:
-            base_dmg *= (1.0 + crit_buff.value)
-        
-        # 방어 감소 적용
-        def_modifier = 1.0
-        for debuff in defender.debuffs:
-            if debuff.type == "def_reduce":
-                def_modifier += debuff.value
-        
-        final_dmg = int(base_dmg * def_modifier)
-        final_dmg = max(1, final_dmg)
-        
-        # 무적 체크
-        if defender.invincible > 0:
-            return f"{attacker_name}의 공격! 하지만 {defender_name}은(는) 무적 상태!"
-        
-        # double_hit 버프 체크 (2회 공격)
-        double_hit_buff = next((b for b in attacker.buffs if b.type == "double_hit"), None)
-        hit_count = 2 if double_hit_buff else 1
-        
-        total_dmg = 0
-        for i in range(hit_count):
-            # 피해 적용 (쉴드 처리 포함)
-            actual_dmg = self.apply_damage(attacker, defender, final_dmg)
-            total_dmg += actual_dmg
-            
-            # delayed_burst 버프 체크 (데미지 누적)
-            burst_buff = next((b for b in attacker.buffs if b.type == "delayed_burst"), None)
-            if burst_buff:
-                if not hasattr(attacker, 'delayed_damage'):
-                    attacker.delayed_damage = 0
-                attacker.delayed_damage += actual_dmg
-        
-        # 반사 데미지
-        reflect_dmg = 0
-        for buff in defender.buffs:
-            if buff.type == "reflect":
-                reflect_dmg += int(total_dmg * buff.value)
-        
-        # 쉴드로 막았는지 체크
-        shield_blocked = defender.shield > 0 or (final_dmg > total_dmg)
-        
-        if hit_count > 1:
-            result = f"{attacker_name}의 2회 공격! {defender_name}에게 총 {total_dmg} 데미지!"
-        elif shield_blocked:
-            result = f"{attacker_name}의 공격! {defender_name}에게 {total_dmg} 데미지! 🛡️"
-        else:
-            result = f"{attacker_name}의 공격! {defender_name}에게 {total_dmg} 데미지!"
-        
-        # 반격 데미지 표시
-        if defender.last_counter_damage > 0:
-            result += f" ⚔️ 반격 {defender.last_counter_damage}!"
-        
-        if reflect_dmg > 0:
-            # immortal 체크
-            attacker_immortal = any(buff.type == "immortal" for buff in attacker.buffs)
-            if attacker_immortal:
-                attacker.current_hp = max(1, attacker.current_hp - reflect_dmg)
-            else:
-                attacker.current_hp = max(0, attacker.current_hp - reflect_dmg)
-            result += f" 반사 {reflect_dmg} 데미지!"
-        
-        return result
-    
-    def execute_turn(self):
-        """턴 실행 (1명의 행동) - 행동자가 있을 때만 호출"""
-        # first_strike 플래그 처리 (게이지 우선 설정) - 상대보다 높게
-        if self.player.next_turn_first_strike:
-            # 상대 게이지보다 높게 설정 (최소 100)
-            self.player.speed_gauge = max(100, self.enemy.speed_gauge + 1)
-            self.player.next_turn_first_strike = False
-        if self.enemy.next_turn_first_strike:
-            # 상대 게이지보다 높게 설정 (최소 100)
-            self.enemy.speed_gauge = max(100, self.player.speed_gauge + 1)
-            self.enemy.next_turn_first_strike = False
-        
-        # 버프/디버프 적용
-        self.player.apply_buffs()
-        self.enemy.apply_buffs()
-        
-        # 다음 행동자 결정 (게이지 시스템)
-        actor = self.tick_and_get_next_actor()
-        
-        if not actor:
-            # 아무도 행동하지 않음 (게이지만 증가)
-            return False
-        
-        # 실제 행동 발생 - 턴 증가
-        self.turn += 1
-        
-        name = "아군" if actor.is_player else "적군"
-        self.add_log(f"=== {name}의 턴 ===")
-        
-        # 턴 시작 시 버프/디버프 지속시간 감소 (이전 턴에 받은 효과 소진)
-        # 스턴 체크 (tick_buffs 전에 체크하여 정확한 지속시간 반영)
-        if actor.stunned > 0:
-            self.add_log(f"{name}은(는) 행동 불가!")
-            actor.stunned -= 1
-            return True
-        
-        actor.tick_buffs()
-        
-        # 턴 시작 효과 (지속 회복 등) - 행동자만
-        for buff in actor.buffs:
-            if buff and buff.type == "regen":
-                # 힐 차단 디버프 확인
-                if any(d and d.type == "heal_block" for d in actor.debuffs):
-                    self.add_log(f"{name} 지속 회복 차단 (힐 차단 중)")
-                    continue
-                heal = int(actor.max_hp * buff.value)
-                actor.current_hp = min(actor.max_hp, actor.current_hp + heal)
-                self.add_log(f"{name} HP {heal} 회복 (지속 회복)")
-            
-            # max_hp_grow 버프 처리 (매턴 최대HP 증가)
-            elif buff and buff.type == "max_hp_grow":
-                hp_increase = int(actor.max_hp * buff.value)
-                actor.max_hp += hp_increase
-                actor.current_hp += hp_increase  # 현재 HP도 함께 증가
-                self.add_log(f"{name} 최대HP +{hp_increase} (성장)")
-            
-            # random_effect 버프 처리
-            elif buff and buff.type == "random_effect":
-                self._apply_random_effect(actor, name)
-        
-        # delayed_burst 폭발 체크 (버프 duration이 0이 되면 폭발)
-        burst_buff = next((b for b in actor.buffs if b.type == "delayed_burst" and b.duration <= 0), None)
-        if burst_buff and hasattr(actor, 'delayed_damage') and actor.delayed_damage > 0:
-            opponent = self.enemy if actor.is_player else self.player
-            burst_dmg = actor.delayed_damage
-            # immortal 체크
-            has_immortal = any(buff.type == "immortal" for buff in opponent.buffs)
-            if has_immortal:
-                opponent.current_hp = max(1, opponent.current_hp - burst_dmg)
-            else:
-                opponent.current_hp = max(0, opponent.current_hp - burst_dmg)
-            opponent_name = "적군" if actor.is_player else "아군"
-            self.add_log(f"💥 {name} 누적 데미지 폭발! {opponent_name}에게 {burst_dmg} 데미지!")
-            actor.delayed_damage = 0
-        
-        # 스킬 선택 및 사용
-        skill_slot = self.select_skill(actor)
-        if skill_slot:
-            result = self.use_skill(actor, skill_slot)
-            self.add_log(result)
-        
-        # 기본 공격
-        result = self.basic_attack(actor)
-        self.add_log(result)
-        
-        # double_speed 버프 체크 (2배속 - 추가 행동)
-        double_speed_buff = next((b for b in actor.buffs if b.type == "double_speed"), None)
-        if double_speed_buff:
-            self.add_log(f"⚡ {name} 2배속 추가 행동!")
-            # 추가 기본 공격
-            result = self.basic_attack(actor)
-            self.add_log(result)
-        
-        # 턴 종료 후 DoT 데미지 처리 (상대방)
-        opponent = self.enemy if actor.is_player else self.player
-        opponent_name = "적군" if actor.is_player else "아군"
-        
-        # 상대방의 DoT 디버프 처리
-        for debuff in opponent.debuffs:
-            if debuff and hasattr(debuff, 'type') and debuff.type == "dot_dmg":
-                # immortal 버프 확인
-                has_immortal = any(buff and buff.type == "immortal" for buff in opponent.buffs)
-                dot_damage = int(opponent.max_hp * debuff.value)
-                
-                if has_immortal:
-                    # immortal 중이면 HP 최소 1 보장
-                    opponent.current_hp = max(1, opponent.current_hp - dot_damage)
-                    self.add_log(f"{opponent_name} DoT {dot_damage} 데미지! (불멸 상태, HP: {opponent.current_hp})")
-                else:
-                    opponent.current_hp = max(0, opponent.current_hp - dot_damage)
-                    self.add_log(f"{opponent_name} DoT {dot_damage} 데미지! (HP: {opponent.current_hp})")
-        
-        return True  # 행동 발생함
-    
-    def _apply_random_effect(self, actor: BattleInstance, name: str):
-        """랜덤 효과 적용"""
-        effects = [
-            ("heal", 0.1),      # HP 10% 회복
-            ("atk_boost", 0.2), # ATK 20% 증가
-            ("ms_boost", 0.3),  # MS 30% 증가
-            ("shield", 0.1),    # 쉴드 10%
-            ("damage", 0.15),   # 적에게 15% 데미지
-        ]
-        effect_type, value = random.choice(effects)
-        
-        if effect_type == "heal":
-            heal = int(actor.max_hp * value)
-            actor.current_hp = min(actor.max_hp, actor.current_hp + heal)
-            self.add_log(f"🎲 {name} 랜덤 회복! HP +{heal}")
-        elif effect_type == "atk_boost":
-            actor.add_buff("atk_boost", value, 1)
-            self.add_log(f"🎲 {name} 랜덤 ATK +{int(value*100)}%!")
-        elif effect_type == "ms_boost":
-            ms_boost = int(actor.base_ms * value)
-            actor.add_buff("ms_boost", ms_boost, 1)
-            self.add_log(f"🎲 {name} 랜덤 MS +{int(value*100)}%!")
-        elif effect_type == "shield":
-            shield = int(actor.max_hp * value)
-            actor.shield += shield
-            self.add_log(f"🎲 {name} 랜덤 쉴드 +{shield}!")
-        elif effect_type == "damage":
-            opponent = self.enemy if actor.is_player else self.player
-            dmg = int(opponent.current_hp * value)
-            # immortal 체크
-            has_immortal = any(buff.type == "immortal" for buff in opponent.buffs)
-            if has_immortal:
-                opponent.current_hp = max(1, opponent.current_hp - dmg)
-            else:
-                opponent.current_hp = max(0, opponent.current_hp - dmg)
-            opponent_name = "적군" if actor.is_player else "아군"
-            self.add_log(f"🎲 {name} 랜덤 공격! {opponent_name}에게 {dmg} 데미지!")
-    
-    def check_victory(self) -> bool:
-        """승패 판정"""
-        # 플레이어 부활 체크
-        if self.player.current_hp <= 0:
-            # 1. death_loop 체크 (Time Loop: 부활 + 슬롗1,2 발동)
-            death_loop_buff = next((buff for buff in self.player.buffs if buff.type == "death_loop"), None)
-            if death_loop_buff:
-                # HP 50% 부활
-                revive_hp = int(self.player.max_hp * 0.5)
-                self.player.current_hp = max(1, revive_hp)
-                # death_loop 버프 제거
-                self.player.buffs = [b for b in self.player.buffs if b.type != "death_loop"]
-                self.add_log(f"⏰ 아군 Time Loop 발동! HP {self.player.current_hp}로 부활!")
-                
-                # 슬롗1, 슬롗2 쿨다운 초기화 후 발동
-                for slot in [1, 2]:
-                    skill_id = getattr(self.player, f"skill_{slot}_id", None)
-                    if skill_id:
-                        setattr(self.player, f"skill_{slot}_cooldown", 0)  # 쿨다운 초기화
-                        result = self.use_skill(self.player, slot)
-                        self.add_log(f"⏰ {result}")
-                
-                return False
-            
-            # 2. revive_once 체크 (1회 부활)
-            revive_buff = next((buff for buff in self.player.buffs if buff.type == "revive_once"), None)
-            if revive_buff:
-                revive_hp = int(self.player.max_hp * revive_buff.value)
-                self.player.current_hp = max(1, revive_hp)
-                self.player.buffs = [b for b in self.player.buffs if b.type != "revive_once"]
-                self.add_log(f"아군이 부활했습니다! (HP: {self.player.current_hp})")
-                return False
-            
-            # 2. auto_revive 체크 (전투당 1회)
-            auto_revive_buff = next((buff for buff in self.player.buffs if buff.type == "auto_revive"), None)
-            if auto_revive_buff and hasattr(self.player, 'auto_revive_used') and not self.player.auto_revive_used:
-                revive_hp = int(self.player.max_hp * auto_revive_buff.value)
-                self.player.current_hp = max(1, revive_hp)
-                self.player.auto_revive_used = True  # 한 번만 사용
-                # 모든 쿨다운 초기화
-                for i in range(1, 4):
-                    setattr(self.player, f"skill_{i}_cooldown", 0)
-                self.add_log(f"아군이 자동으로 부활했습니다! (HP: {self.player.current_hp}) + 모든 스킬 쿨다운 초기화")
-                return False
-        
-        # 적 부활 체크
-        if self.enemy.current_hp <= 0:
-            # 1. death_loop 체크 (Time Loop: 부활 + 슬롗1,2 발동)
-            death_loop_buff = next((buff for buff in self.enemy.buffs if buff.type == "death_loop"), None)
-            if death_loop_buff:
-                # HP 50% 부활
-                revive_hp = int(self.enemy.max_hp * 0.5)
-                self.enemy.current_hp = max(1, revive_hp)
-                # death_loop 버프 제거
-                self.enemy.buffs = [b for b in self.enemy.buffs if b.type != "death_loop"]
-                self.add_log(f"⏰ 적군 Time Loop 발동! HP {self.enemy.current_hp}로 부활!")
-                
-                # 슬롗1, 슬롗2 쿨다운 초기화 후 발동
-                for slot in [1, 2]:
-                    skill_id = getattr(self.enemy, f"skill_{slot}_id", None)
-                    if skill_id:
-                        setattr(self.enemy, f"skill_{slot}_cooldown", 0)  # 쿨다운 초기화
-                        result = self.use_skill(self.enemy, slot)
-                        self.add_log(f"⏰ {result}")
-                
-                return False
-            
-            # 2. revive_once 체크
-            revive_buff = next((buff for buff in self.enemy.buffs if buff.type == "revive_once"), None)
-            if revive_buff:
-                revive_hp = int(self.enemy.max_hp * revive_buff.value)
-                self.enemy.current_hp = max(1, revive_hp)
-                self.enemy.buffs = [b for b in self.enemy.buffs if b.type != "revive_once"]
-                self.add_log(f"적군이 부활했습니다! (HP: {self.enemy.current_hp})")
-                return False
-            
-            # 2. auto_revive 체크
-            auto_revive_buff = next((buff for buff in self.enemy.buffs if buff.type == "auto_revive"), None)
-            if auto_revive_buff and hasattr(self.enemy, 'auto_revive_used') and not self.enemy.auto_revive_used:
-                revive_hp = int(self.enemy.max_hp * auto_revive_buff.value)
-                self.enemy.current_hp = max(1, revive_hp)
-                self.enemy.auto_revive_used = True
-                # 모든 쿨다운 초기화
-                for i in range(1, 4):
-                    setattr(self.enemy, f"skill_{i}_cooldown", 0)
-                self.add_log(f"적군이 자동으로 부활했습니다! (HP: {self.enemy.current_hp}) + 모든 스킬 쿨다운 초기화")
-                return False
-        
-        # 부활이 없으면 일반 승패 판정
-        if self.player.current_hp <= 0 and self.enemy.current_hp <= 0:
-            self.winner = "draw"
-            self.add_log("무승부!")
-            return True
-        elif self.player.current_hp <= 0:
-            self.winner = "enemy"
-            self.add_log("적군 승리!")
-            return True
-        elif self.enemy.current_hp <= 0:
-            self.winner = "player"
-            self.add_log("아군 승리!")
-            return True
-        elif self.turn >= self.max_turns:
-            # 타임아웃 시 무조건 패배
-            self.winner = "enemy"
-            self.add_log("시간 초과! 전투 실패!")
-            return True
-        return False
-    
-    def run_battle(self):
-        """전투 실행"""
-        self.add_log("=== 전투 시작! ===")
-        self.add_log(f"아군: {self.player.original['name']} (HP: {self.player.max_hp}, ATK: {self.player.base_atk}, MS: {self.player.base_ms})")
-        self.add_log(f"적군: {self.enemy.original['name']} (HP: {self.enemy.max_hp}, ATK: {self.enemy.base_atk}, MS: {self.enemy.base_ms})")
-        
-        while not self.check_victory():
-            self.execute_turn()
-        
-        return self.winner, self.log
-
 # ============================================================================
 # 랜덤 박스 시스템
 # ============================================================================
@@ -3000,7 +1483,7 @@ def calculate_power_score(stats: Dict) -> int:
     - ATK는 공격력 (가중치 10)
     - MS는 속도 (가중치 5)
     """
-    return stats["hp"] + stats["atk"] * 10 + stats["ms"] * 5
+    return power_score(stats)
 
 
 def format_korean_number(n: int) -> str:
@@ -3121,6 +1604,27 @@ def get_all_users_representatives() -> List[Dict]:
     
     return representatives
 
+@st.cache_data(ttl=600)  # 10분 캐싱 (래더는 배치로 갱신)
+def get_pvp_ladder() -> List[Dict]:
+    """오프라인 PvP 래더 결과 (python -m analysis.pvp_ladder 가 저장, 레이팅 내림차순)"""
+    try:
+        from supabase_db import load_pvp_ladder
+        ladder = load_pvp_ladder()
+        if ladder:
+            return ladder
+    except Exception as e:
+        print(f"⚠️ PvP 래더 조회 실패: {e}")
+    
+    # 로컬 파일 보완 (Supabase 미사용 혹은 실패 시)
+    local_path = os.path.join("saves", "pvp_ladder.json")
+    if os.path.exists(local_path):
+        try:
+            with open(local_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ 로컬 PvP 래더 조회 실패: {e}")
+    return []
+
 def cleanup_session_state():
     """불필요한 세션 상태 정리 (메모리 최적화)"""
     # 임시 페이지 상태 정리
@@ -4699,7 +3203,31 @@ def page_ranking():
         max_power = representatives[0]['power_score'] if representatives else 0
         st.metric("👑 1위 전투력", f"{format_korean_number(max_power)}")
     
-    st.caption("💡 전투력 = HP + ATK×10 + MS×5")
+    # 오프라인 PvP 래더 레이팅 (스킬까지 반영한 시뮬레이션 Elo, 배치로 주기 갱신)
+    # 래더 계산 이후 대표 유닛을 바꾼 유저는 이전 유닛의 레이팅이므로 표시하지 않음
+    current_instance_ids = {rep["username"]: rep["instance"].get("id") for rep in representatives}
+    ladder = {
+        row["username"]: row for row in get_pvp_ladder()
+        if row["username"] in current_instance_ids
+        and row.get("instance_id") == current_instance_ids[row["username"]]
+    }
+    
+    def rating_text(username: str) -> str:
+        row = ladder.get(username)
+        return f"⚔️ {row['rating']:.0f}" if row else ""
+    
+    sort_mode = "전투력"
+    if ladder:
+        sort_mode = st.radio("정렬 기준", ["전투력", "PvP 레이팅"], horizontal=True, key="ranking_sort")
+    if sort_mode == "PvP 레이팅":
+        # 래더에 아직 없는 유저(새 대표 유닛)는 뒤로
+        representatives = sorted(
+            representatives,
+            key=lambda r: (r["username"] not in ladder, -ladder.get(r["username"], {}).get("rating", 0))
+        )
+        st.caption("💡 PvP 레이팅 = 대표 유닛끼리 시뮬레이션 전투로 계산한 Elo (주기적으로 갱신)")
+    else:
+        st.caption("💡 전투력 = HP + ATK×10 + MS×5")
     st.markdown("---")
     
     # 내 랭킹 표시
@@ -4721,6 +3249,8 @@ def page_ranking():
         with col2:
             st.markdown(f"**{my_rep['instance']['name']}**")
             st.markdown(f"💪 **{format_korean_number(my_rep['power_score'])}** | HP {my_rep['instance']['stats']['hp']:,} | ATK {my_rep['instance']['stats']['atk']:,} | MS {my_rep['instance']['stats']['ms']:,}")
+            if my_username in ladder:
+                st.caption(f"{rating_text(my_username)} PvP 레이팅 ({ladder[my_username]['rank']}위)")
         with col3:
             with st.expander("⚔️ 스킬 보기"):
                 for i in range(1, 4):
@@ -4762,7 +3292,7 @@ def page_ranking():
                 <div style="padding: 15px; border-radius: 10px; border: 2px solid {border_colors[idx]}; text-align: center; background: {'rgba(255, 215, 0, 0.1)' if idx==0 else 'transparent'};">
                     <div style="font-size: 2em;">{medal}</div>
                     <div style="font-weight: bold; margin: 5px 0;">{rep['username']}</div>
-                    <div style="font-size: 0.9em; opacity: 0.8;">💪 {format_korean_number(rep['power_score'])}</div>
+                    <div style="font-size: 0.9em; opacity: 0.8;">💪 {format_korean_number(rep['power_score'])} {rating_text(rep['username'])}</div>
                 </div>
                 """, unsafe_allow_html=True)
                 
@@ -4818,7 +3348,7 @@ def page_ranking():
                     st.markdown(f'<div style="min-height:60px; display:flex; flex-direction:column; justify-content:center;"><div style="{name_style}">{rep["username"]}</div><div style="opacity:0.7; font-size:0.85em;">{rep["instance"]["name"]}</div></div>', unsafe_allow_html=True)
                 
                 with col4:
-                    st.markdown(f'<div style="min-height:60px; display:flex; align-items:center;">💪 <strong>{format_korean_number(rep["power_score"])}</strong></div>', unsafe_allow_html=True)
+                    st.markdown(f'<div style="min-height:60px; display:flex; align-items:center;">💪 <strong>{format_korean_number(rep["power_score"])}</strong>&nbsp;{rating_text(rep["username"])}</div>', unsafe_allow_html=True)
                     with st.expander("상세"):
                         st.markdown(f"HP: {rep['instance']['stats']['hp']:,}")
                         st.markdown(f"ATK: {rep['instance']['stats']['atk']:,}")
@@ -4839,180 +3369,84 @@ def page_ranking():
     elif len(representatives) <= 3:
         st.info("4위 이하 랭킹이 없습니다.")
 
-def generate_stage_enemy(stage: int) -> Dict:
-    """스테이지별 적 생성 (스킬 고정)"""
-    # 스테이지별 시드 고정 (스킬이 항상 같게)
-    random.seed(stage * 12345)
-    
-    # 기본 스탯 (스테이지에 비례)
-    base_hp = 100 + (stage - 1) * 50
-    base_atk = 10 + (stage - 1) * 5
-    base_ms = 10 + (stage - 1) * 3  # MS 기본값 증가 (5→10), 증가량 증가 (2→3)
-    
-    # 스테이지별 스탯 증가 (모두 1.2배씩)
-    hp = int(base_hp * (1.2 ** (stage - 1)))
-    atk = int(base_atk * (1.2 ** (stage - 1)))
-    ms = int(base_ms * (1.2 ** (stage - 1)))  # MS도 1.2배로 통일
-    
-    # 로그 스케일 기반 스킬 장착 (무한 스테이지 대응)
-    import math
-    
-    # 스테이지 로그 값 계산 (log10 사용)
-    log_stage = math.log10(max(stage, 1))
-    
-    # 스킬 개수 결정 (단계별 구간)
-    if stage <= 20:
-        skill_count = 0
-    elif stage <= 40:
-        skill_count = 1
-    elif stage <= 80:
-        skill_count = 2
-    else:
-        skill_count = 3
+@st.cache_resource(max_entries=2)
+def get_stage_enemy_table(skill_digest: str) -> StageEnemyTable:
+    """스테이지 보스 테이블 (모든 세션이 공유, 보스는 스테이지별 1회만 생성)
     
-    # 등급별 가중치 계산 (로그 스케일로 점진 상승)
-    # log_stage 0 → Normal 100%
-    # log_stage 1 → Normal 70%, Rare 25%, Epic 5%
-    # log_stage 2 → Rare 40%, Epic 35%, Unique 20%, Legendary 5%
-    # log_stage 3+ → Epic 20%, Unique 30%, Legendary 35%, Mystic 15%
+    skill_digest(스킬 마스터 해시)가 캐시 키이므로 스킬 마스터가 바뀌면 새 테이블을 만든다.
+    """
+    return StageEnemyTable(
+        get_skill_master(),
+        lambda **kwargs: create_instance(**kwargs, register_collection=False)
+    )
+
+def generate_stage_enemy(stage: int) -> Dict:
+    """스테이지별 적 (스킬 고정, 공유 캐시 - 반환값을 수정하지 말 것)
     
-    log_factor = min(log_stage / 3.0, 1.0)  # 0.0 ~ 1.0
+    보스 스킬은 도감에 등록하지 않으며 전역 random 상태도 바꾸지 않는다.
+    """
+    return get_stage_enemy_table(get_skill_master_digest()).get(stage)
+
+@st.cache_resource
+def get_battle_result_cache() -> BattleResultCache:
+    """시뮬레이션 결과 캐시 (모든 세션이 공유, 서버 재시작 후에도 saves/battle_cache에서 재사용)
     
-    normal_weight = max(100 - log_stage * 50, 0)
-    rare_weight = max(30 * log_stage - 10, 0)
-    epic_weight = max(25 * log_stage, 5)
-    unique_weight = max(30 * log_stage - 30, 0)
-    legendary_weight = max(25 * log_stage - 40, 0)
-    mystic_weight = max(15 * log_stage - 40, 0)
+    시작 시 이전 엔진 버전/스킬 마스터의 디스크 항목을 지우고, 스킬 마스터가 바뀌면 전부 비운다.
+    """
+    cache = BattleResultCache(cache_dir=os.path.join("saves", "battle_cache"))
+    cache.prune()
+    add_skill_master_reload_listener(lambda: cache.clear(disk=True))
+    return cache
+
+def estimate_stage_win_rate(instance: Dict, stage: int, n_trials: int = 1000,
+                            workers: Optional[int] = None) -> Dict:
+    """스테이지 보스 상대 클리어 확률 추정 (몬테카를로 시뮬레이션, 결론이 나면 조기 종료)
     
-    # 가중치 기반 등급 선택 함수
-    def get_grade_by_weight():
-        weights = {
-            "Normal": normal_weight,
-            "Rare": rare_weight,
-            "Epic": epic_weight,
-            "Unique": unique_weight,
-            "Legendary": legendary_weight,
-            "Mystic": mystic_weight
-        }
-        weights = {k: v for k, v in weights.items() if v > 0}
-        if not weights:
-            return "Normal"
-        grades_list = list(weights.keys())
-        weight_list = list(weights.values())
-        return random.choices(grades_list, weights=weight_list, k=1)[0]
-    
-    # 스킬 장착
-    acc1 = None
-    acc2 = None
-    acc3 = None
-    
-    if skill_count >= 1:
-        acc1_grade = get_grade_by_weight()
-        acc1_candidates = get_skill_ids_by_grade_and_slot(acc1_grade, 1)
-        acc1 = {"grade": acc1_grade, "id": random.choice(acc1_candidates)} if acc1_candidates else None
-    
-    if skill_count >= 2:
-        acc2_grade = get_grade_by_weight()
-        acc2_candidates = get_skill_ids_by_grade_and_slot(acc2_grade, 2)
-        acc2 = {"grade": acc2_grade, "id": random.choice(acc2_candidates)} if acc2_candidates else None
-    
-    if skill_count >= 3:
-        acc3_grade = get_grade_by_weight()
-        acc3_candidates = get_skill_ids_by_grade_and_slot(acc3_grade, 3)
-        acc3 = {"grade": acc3_grade, "id": random.choice(acc3_candidates)} if acc3_candidates else None
-    
-    # 시드 리셋 (다른 랜덤 작업에 영향 없도록)
-    random.seed()
-    
-    # 적 생성
-    enemy = create_instance(
-        hp=hp,
-        atk=atk,
-        ms=ms,
-        main_color={"grade": "Normal", "id": "normal04"},
-        sub_color={"grade": "Normal", "id": "normal05"},
-        pattern_color={"grade": "Normal", "id": "normal06"},
-        pattern={"grade": "Normal", "id": "normal01"},
-        accessory_1=acc1,
-        accessory_2=acc2,
-        accessory_3=acc3,
-        name=f"Stage {stage} Boss",
-        created_by="Battle"
+    같은 스탯/스킬 빌드의 결과는 캐시에서 바로 반환한다.
+    """
+    key = matchup_key(instance, stage, "stage_win_rate", n_trials=n_trials)
+    return get_battle_result_cache().get_or_compute(
+        key,
+        lambda: estimate_win_rate_sequential(instance, generate_stage_enemy(stage),
+                                             max_trials=n_trials, workers=workers)
+    )
+
+def find_max_stage_for_instance(instance: Dict, min_win_rate: float = 0.5,
+                                workers: Optional[int] = None) -> Dict:
+    """개체가 min_win_rate 이상으로 클리어 가능한 최고 스테이지 탐색 (이진 탐색, 빌드별 캐시)"""
+    key = matchup_key(instance, None, "max_stage", min_win_rate=min_win_rate)
+    return get_battle_result_cache().get_or_compute(
+        key,
+        lambda: find_max_clearable_stage(
+            instance,
+            generate_stage_enemy,
+            min_win_rate=min_win_rate,
+            workers=workers
+        )
     )
-    
-    return enemy
 
-def generate_battle_reward(boss_power: int, stage: int) -> Dict:
-    """전투 승리 보상 개체 생성 (보스 전투력의 1.1배)"""
-    target_power = int(boss_power * 1.1)
-    
-    # 전투력 = HP + ATK×10 + MS×5
-    # HP는 10단위, ATK:MS ≈ 2:1 비율
-    # target_power = HP + ATK×10 + MS×5
-    # HP + ATK×10 + (ATK/2)×5 = target_power
-    # HP + ATK×12.5 = target_power
-    # ATK = (target_power - HP) / 12.5
-    
-    # HP를 전투력의 30~40%로 설정 (10단위)
-    hp = int((target_power * 0.35) / 10) * 10
-    
-    # 나머지를 ATK와 MS로 분배
-    remaining = target_power - hp
-    atk = int(remaining / 12.5)
-    ms = int(atk / 2)
-    
-    # 미세 조정 (정확한 전투력 맞추기)
-    actual_power = hp + atk * 10 + ms * 5
-    if actual_power < target_power:
-        diff = target_power - actual_power
-        if diff >= 10:
-            atk += 1
-        elif diff >= 5:
-            ms += 1
-    
-    # 스테이지별 등급 확률 (점진적 증가, 200+ 스테이지 대응)
-    # 기본 확률 설정
-    stage_factor = min(stage / 200.0, 1.0)  # 0.0 ~ 1.0 (200 스테이지에서 1.0)
-    
-    # 등급별 기본 가중치 계산
-    normal_weight = max(100 - stage * 0.4, 10)  # 100 → 10 (느리게 감소)
-    rare_weight = 30 + stage * 0.3  # 30 → 90 (스테이지 200에서)
-    epic_weight = 10 + stage * 0.25  # 10 → 60
-    unique_weight = max(stage * 0.2 - 10, 0)  # 50 스테이지부터 서서히
-    legendary_weight = max(stage * 0.1 - 20, 0)  # 200 스테이지부터 서서히
-    mystic_weight = max(stage * 0.05 - 30, 0)  # 600+ 스테이지부터 (극후반)
-    
-    # 스킬용 등급 풀 생성 (가중치 기반)
+def compare_stage_builds(instance_a: Dict, instance_b: Dict, stage: int,
+                         workers: Optional[int] = None) -> Dict:
+    """스테이지 보스 상대로 두 개체 비교 (공통 난수, 우열이 확정되면 조기 종료, 빌드 쌍별 캐시)"""
+    key = matchup_key(instance_a, stage, "compare_builds", other=matchup_key(instance_b, stage, "compare_builds"))
+    return get_battle_result_cache().get_or_compute(
+        key,
+        lambda: compare_builds(instance_a, instance_b, generate_stage_enemy(stage), workers=workers)
+    )
+
+def generate_battle_reward(stage: int) -> Dict:
+    """전투 승리 보상 개체 생성 (보스 전투력의 1.1배, 스탯/등급 가중치는 스테이지 곡선 캐시 사용)"""
+    curve = stage_curve(stage)
+    stats = curve["reward_stats"]
+    
+    # 스킬용 등급 (스테이지별 점진 증가, 200+ 스테이지 대응)
     def get_grade_by_weight():
-        weights = {
-            "Normal": normal_weight,
-            "Rare": rare_weight,
-            "Epic": epic_weight,
-            "Unique": unique_weight,
-            "Legendary": legendary_weight,
-            "Mystic": mystic_weight
-        }
-        # 0 이하 제거
-        weights = {k: v for k, v in weights.items() if v > 0}
-        grades = list(weights.keys())
-        weight_list = list(weights.values())
+        grades, weight_list = curve["reward_grade_weights"]
         return random.choices(grades, weights=weight_list, k=1)[0]
     
     # 외형용 등급 (Normal 확률 3배 증가)
     def get_appearance_grade():
-        weights = {
-            "Normal": normal_weight * 3,  # Normal 확률 3배
-            "Rare": rare_weight,
-            "Epic": epic_weight,
-            "Unique": unique_weight,
-            "Legendary": legendary_weight,
-            "Mystic": mystic_weight
-        }
-        # 0 이하 제거
-        weights = {k: v for k, v in weights.items() if v > 0}
-        grades = list(weights.keys())
-        weight_list = list(weights.values())
+        grades, weight_list = curve["reward_appearance_grade_weights"]
         return random.choices(grades, weights=weight_list, k=1)[0]
     
     # 랜덤 외형 생성 (50% 확률로 normal01 고정)
@@ -5053,9 +3487,9 @@ def generate_battle_reward(boss_power: int, stage: int) -> Dict:
     
     # 개체 생성
     reward = create_instance(
-        hp=hp,
-        atk=atk,
-        ms=ms,
+        hp=stats["hp"],
+        atk=stats["atk"],
+        ms=stats["ms"],
         main_color=main_color,
         sub_color=sub_color,
         pattern_color=pattern_color,
@@ -5069,6 +3503,169 @@ def generate_battle_reward(boss_power: int, stage: int) -> Dict:
     
     return reward
 
+def replay_stage_battle(replay: Dict) -> Battle:
+    """리플레이 기록으로 스테이지 전투 재현 (적은 스테이지 번호로 다시 생성)"""
+    enemy = generate_stage_enemy(replay["stage"])
+    return replay_battle(replay, enemy)
+
+@st.cache_data(max_entries=64)
+def render_stage_replay(replay: Dict, skill_digest: str) -> Tuple[str, List[tuple]]:
+    """리플레이 재현 결과 (로그 텍스트, 이벤트) - 재실행마다 다시 시뮬레이션하지 않도록 캐시
+    
+    리플레이(빌드, 스테이지, 시드, 엔진 버전)와 스킬 마스터 해시가 같으면 결과도 같다.
+    
+    Raises:
+        ValueError: 다른 전투 엔진 버전에서 만든 리플레이, 또는 재현 결과가 실제 전투와 다름 (캐시되지 않음)
+    """
+    battle = replay_stage_battle(replay)
+    return "\n".join(battle.log), battle.events
+
+def show_battle_replay(replay: Dict):
+    """리플레이 재현 후 전투 로그/통계 표시"""
+    try:
+        log_text, events = render_stage_replay(replay, get_skill_master_digest())
+    except ValueError as e:
+        st.warning(f"⚠️ {e}")
+        return
+    
+    st.text_area("로그", value=log_text, height=400, disabled=True)
+    show_battle_stats(events)
+    
+    with st.expander("🔁 리플레이 정보 (버그 제보용)"):
+        st.caption(f"Stage {replay['stage']} · seed {replay['seed']} · 엔진 v{replay['engine_version']}")
+        st.code(json.dumps(replay, ensure_ascii=False), language="json")
+
+BATTLE_ANIMATION_HTML = """
+<style>
+    body { margin: 0; font-family: "Source Sans Pro", sans-serif; color: #31333f; }
+    .row { display: flex; align-items: center; gap: 10px; margin: 10px 0; }
+    .side { flex: 1; }
+    .label { font-weight: bold; margin-bottom: 5px; }
+    .bar { background: rgba(0,0,0,0.1); border-radius: 5px; overflow: hidden; position: relative; }
+    .fill { height: 100%; position: absolute; top: 0; }
+    #log { height: 250px; overflow-y: auto; padding: 10px; border: 1px solid rgba(128,128,128,0.3);
+           border-radius: 5px; background-color: rgba(0,0,0,0.05); font-family: monospace;
+           white-space: pre-wrap; font-size: 0.9em; }
+    button { margin-top: 8px; padding: 4px 12px; border-radius: 5px; border: 1px solid rgba(128,128,128,0.5);
+             background: white; cursor: pointer; }
+</style>
+<div class="row">
+    <div class="side" style="text-align: right;">
+        <div class="label" id="p-gauge-label">🔵 플레이어 게이지</div>
+        <div class="bar" style="height: 30px;"><div class="fill" id="p-gauge" style="background: #0066ff; left: 0; transition: width 0.1s;"></div></div>
+    </div>
+    <div style="font-size: 24px; font-weight: bold; padding: 0 10px;">⚔️</div>
+    <div class="side">
+        <div class="label" id="e-gauge-label">🔴 적군 게이지</div>
+        <div class="bar" style="height: 30px;"><div class="fill" id="e-gauge" style="background: #ff0000; right: 0; transition: width 0.1s;"></div></div>
+    </div>
+</div>
+<div class="row" style="gap: 20px;">
+    <div class="side">
+        <div class="label" id="p-hp-label"></div>
+        <div class="bar" style="height: 25px;">
+            <div class="fill" id="p-trail" style="transition: width 0.8s;"></div>
+            <div class="fill" id="p-hp" style="background: #00cc00; transition: width 0.3s;"></div>
+            <div class="fill" id="p-shield" style="background: rgba(255, 215, 0, 0.7); transition: width 0.3s;"></div>
+        </div>
+    </div>
+    <div class="side">
+        <div class="label" id="e-hp-label"></div>
+        <div class="bar" style="height: 25px;">
+            <div class="fill" id="e-trail" style="transition: width 0.8s;"></div>
+            <div class="fill" id="e-hp" style="background: #00cc00; transition: width 0.3s;"></div>
+            <div class="fill" id="e-shield" style="background: rgba(255, 215, 0, 0.7); transition: width 0.3s;"></div>
+        </div>
+    </div>
+</div>
+<div id="log"></div>
+<button id="skip">⏩ 건너뛰기</button>
+<script>
+const DATA = __BATTLE_DATA__;
+const frames = DATA.frames, lines = DATA.log;
+const $ = (id) => document.getElementById(id);
+const prevHp = {p: null, e: null};
+
+function drawHp(key, name, hp, maxHp, shield) {
+    const pct = maxHp > 0 ? Math.max(0, Math.min(100, hp / maxHp * 100)) : 0;
+    const prev = prevHp[key] === null ? hp : prevHp[key];
+    const prevPct = maxHp > 0 ? Math.max(0, Math.min(100, prev / maxHp * 100)) : 0;
+    // 데미지: 빨강이 이전 HP에서 천천히 줄어듦 / 회복: 하늘색이 먼저 차오름
+    const trail = $(key + "-trail");
+    trail.style.background = prev < hp ? "#33ccff" : "#ff3333";
+    trail.style.width = Math.max(pct, prevPct) + "%";
+    $(key + "-hp").style.width = Math.min(pct, prevPct) + "%";
+    const shieldPct = shield > 0 && maxHp > 0 ? Math.min(100, shield / maxHp * 100) : 0;
+    $(key + "-shield").style.left = pct + "%";
+    $(key + "-shield").style.width = shieldPct + "%";
+    $(key + "-hp-label").textContent = `${name} HP: ${hp}/${maxHp}` + (shield > 0 ? ` + 🛡️${shield}` : "");
+}
+
+function draw(i) {
+    const f = frames[i];
+    $("p-gauge").style.width = f[1] + "%";
+    $("e-gauge").style.width = f[2] + "%";
+    $("p-gauge-label").textContent = "🔵 플레이어 " + (f[1] >= 100 ? "⚡ 행동!" : "게이지");
+    $("e-gauge-label").textContent = "🔴 적군 " + (f[2] >= 100 ? "⚡ 행동!" : "게이지");
+    drawHp("p", "🔵 플레이어", f[3], f[4], f[5]);
+    drawHp("e", "🔴 적군", f[6], f[7], f[8]);
+    if (f[9]) { prevHp.p = f[3]; prevHp.e = f[6]; }
+    // 최근 15줄만 표시
+    const log = $("log");
+    log.textContent = lines.slice(Math.max(0, f[10] - 15), f[10]).join("\\n");
+    log.scrollTop = log.scrollHeight;
+}
+
+let index = 0, timer = null;
+function step() {
+    if (index >= frames.length) return;
+    draw(index);
+    // 고정 프레임 간격 + 행동 발생 시 0.3초 (게이지 리셋 상태 보여주기)
+    const delay = 1000 / DATA.fps + (frames[index][9] ? 300 : 0);
+    index += 1;
+    timer = setTimeout(step, delay);
+}
+$("skip").onclick = () => {
+    clearTimeout(timer);
+    if (frames.length) {
+        index = frames.length - 1;
+        draw(index);
+        $("log").textContent = lines.join("\\n");
+        $("log").scrollTop = $("log").scrollHeight;
+        index = frames.length;
+    }
+};
+step();
+</script>
+"""
+
+def show_battle_animation(animation: Dict):
+    """미리 계산한 전투 타임라인을 브라우저에서 재생 (서버는 JSON 1회 전송만)"""
+    data = json.dumps({"frames": animation["frames"], "log": animation["log"], "fps": TIMELINE_FPS},
+                      ensure_ascii=False)
+    # 로그 문자열에 </script>가 섞여도 스크립트 블록이 끊기지 않도록 처리
+    html = BATTLE_ANIMATION_HTML.replace("__BATTLE_DATA__", data.replace("</", "<\\/"))
+    components.html(html, height=480)
+
+def show_battle_stats(events: list):
+    """전투 이벤트 기반 통계 표시 (출처별 데미지, 회복 총량)"""
+    summary = summarize_events(events)
+    
+    with st.expander("📊 전투 통계"):
+        col1, col2 = st.columns(2)
+        for col, side, label in ((col1, "player", "🔵 아군"), (col2, "enemy", "🔴 적군")):
+            stats = summary[side]
+            with col:
+                st.markdown(f"**{label}**")
+                st.caption(f"총 데미지 {stats['damage']:,} · 총 회복 {stats['heal']:,}")
+                for source, dmg in sorted(stats["damage_by_source"].items(), key=lambda x: -x[1]):
+                    if source in SKILL_MASTER:
+                        source_name = SKILL_MASTER[source]["name"]
+                    else:
+                        source_name = {"basic_attack": "기본 공격", "dot": "지속 피해",
+                                       "delayed_burst": "누적 폭발", "random_effect": "랜덤 효과"}.get(source, source)
+                    st.write(f"- {source_name}: {dmg:,}")
+
 def page_battle():
     """전투 화면"""
     st.title("⚔️ 전투 - 스테이지 보스 도전")
@@ -5084,6 +3681,13 @@ def page_battle():
         result = st.session_state.battle_result
         
         st.markdown(f"**현재 스테이지**: Stage {current_stage}")
+        
+        # 방금 끝난 전투 애니메이션 (브라우저에서 1회 재생)
+        animation = st.session_state.pop("battle_animation", None)
+        if animation:
+            st.markdown("### ⚔️ 전투")
+            show_battle_animation(animation)
+        
         st.markdown("---")
         st.markdown(f"### 📊 전투 결과 - Stage {result.get('stage', 1)}")
         
@@ -5164,7 +3768,7 @@ def page_battle():
         with col1:
             st.markdown("**🔵 플레이어**")
             player_final_hp = result["player_final_hp"]
-            player_max_hp = result["player"]["stats"]["hp"]
+            player_max_hp = result["replay"]["player"]["stats"]["hp"]
             hp_percent = (player_final_hp / player_max_hp) * 100 if player_max_hp > 0 else 0
             hp_percent = max(0, min(100, hp_percent))  # 0~100 범위로 제한
             
@@ -5174,7 +3778,7 @@ def page_battle():
         with col2:
             st.markdown("**🔴 적군")
             enemy_final_hp = result["enemy_final_hp"]
-            enemy_max_hp = result["enemy"]["stats"]["hp"]
+            enemy_max_hp = result["enemy_max_hp"]
             hp_percent = (enemy_final_hp / enemy_max_hp) * 100 if enemy_max_hp > 0 else 0
             hp_percent = max(0, min(100, hp_percent))  # 0~100 범위로 제한
             
@@ -5183,8 +3787,7 @@ def page_battle():
         
         # 전투 로그
         st.markdown("### 📜 전투 로그")
-        log_text = "\n".join(result["log"])
-        st.text_area("로그", value=log_text, height=400, disabled=True)
+        show_battle_replay(result["replay"])
         
         # 다시 전투 버튼
         if st.button("🔄 다시 전투", use_container_width=True):
@@ -5257,7 +3860,7 @@ def page_battle():
     with col2:
         st.markdown("**적군 정보**")
         
-        # 현재 스테이지 적 생성
+        # 현재 스테이지 적 (공유 테이블에서 조회)
         enemy = generate_stage_enemy(current_stage)
         
         # 적 정보
@@ -5273,6 +3876,81 @@ def page_battle():
         st.metric("전투력 비교", f"{format_korean_number(player_power)} vs {format_korean_number(enemy_power)}", 
                   delta=player_power - enemy_power,
                   delta_color="normal")
+        
+        # 클리어 확률 미리보기 (시뮬레이션)
+        win_rate_key = (player_instance["id"], current_stage)
+        if st.button("🎲 클리어 확률 계산", use_container_width=True):
+            with st.spinner("전투 시뮬레이션 중..."):
+                st.session_state.win_rate_preview = {
+                    "key": win_rate_key,
+                    "result": estimate_stage_win_rate(player_instance, current_stage)
+                }
+        preview = st.session_state.get("win_rate_preview")
+        if preview and preview["key"] == win_rate_key:
+            estimate = preview["result"]
+            st.metric("클리어 확률", f"{estimate['win_rate']*100:.1f}%")
+            st.caption(f"{estimate['trials']}회 시뮬레이션 · {estimate['confidence']*100:.4g}% 신뢰구간 "
+                       f"{estimate['ci_low']*100:.1f}% ~ {estimate['ci_high']*100:.1f}% · 평균 {estimate['avg_turns']:.0f}턴")
+    
+    # 최대 클리어 스테이지 계산 (시뮬레이션 이진 탐색)
+    with st.expander("🏔️ 최대 클리어 스테이지 계산", expanded=False):
+        st.caption("애니메이션 전투 없이 시뮬레이션으로 이 개체가 도달 가능한 최고 스테이지를 찾습니다.")
+        min_win_rate_pct = st.slider("최소 클리어 확률 (%)", min_value=50, max_value=95, value=50, step=5,
+                                     key="max_stage_min_win_rate")
+        max_stage_key = (player_instance["id"], min_win_rate_pct)
+        if st.button("🔍 최대 스테이지 찾기", use_container_width=True):
+            with st.spinner("스테이지 탐색 중..."):
+                st.session_state.max_stage_result = {
+                    "key": max_stage_key,
+                    "result": find_max_stage_for_instance(player_instance, min_win_rate_pct / 100)
+                }
+        max_stage_result = st.session_state.get("max_stage_result")
+        if max_stage_result and max_stage_result["key"] == max_stage_key:
+            search = max_stage_result["result"]
+            if search["max_stage"] == 0:
+                st.warning(f"Stage 1도 {min_win_rate_pct}% 이상 확률로 클리어하기 어렵습니다.")
+            else:
+                st.success(f"**Stage {search['max_stage']}**까지 클리어 가능 "
+                           f"(승률 {search['win_rate']*100:.1f}%)")
+            probe_text = ", ".join(f"{stage}({rate*100:.0f}%)" for stage, rate, _ in search["probes"])
+            st.caption(f"탐색 지점: {probe_text} · 총 {search['total_trials']:,}회 시뮬레이션")
+    
+    # 두 개체 비교 (같은 보스, 공통 난수 시뮬레이션)
+    with st.expander("⚖️ 다른 개체와 비교", expanded=False):
+        st.caption("두 개체를 같은 난수로 현재 스테이지 보스와 싸우게 해서 어느 쪽이 더 강한지 판정합니다.")
+        other_options = [opt for opt, inst in zip(instance_options, sorted_instances) if inst["id"] != player_instance["id"]]
+        if not other_options:
+            st.info("비교할 다른 개체가 없습니다.")
+        else:
+            other_display = st.selectbox("비교 개체", other_options, key="compare_instance")
+            other_instance = sorted_instances[instance_options.index(other_display)]
+            compare_key = (player_instance["id"], other_instance["id"], current_stage)
+            if st.button("⚖️ 비교하기", use_container_width=True):
+                with st.spinner("비교 시뮬레이션 중..."):
+                    st.session_state.compare_result = {
+                        "key": compare_key,
+                        "result": compare_stage_builds(player_instance, other_instance, current_stage)
+                    }
+            compare_result = st.session_state.get("compare_result")
+            if compare_result and compare_result["key"] == compare_key:
+                comparison = compare_result["result"]
+                col_a, col_b = st.columns(2)
+                with col_a:
+                    st.metric(player_instance["name"], f"{comparison['a_win_rate']*100:.1f}%")
+                with col_b:
+                    st.metric(other_instance["name"], f"{comparison['b_win_rate']*100:.1f}%")
+                diff_text = (f"승률 차이 {comparison['diff']*100:+.1f}%p "
+                             f"({int(comparison['confidence']*100)}% 신뢰구간 "
+                             f"{comparison['ci_low']*100:+.1f} ~ {comparison['ci_high']*100:+.1f}%p)")
+                if comparison["better"] == "a":
+                    st.success(f"**{player_instance['name']}** 쪽이 더 강합니다 · {diff_text}")
+                elif comparison["better"] == "b":
+                    st.success(f"**{other_instance['name']}** 쪽이 더 강합니다 · {diff_text}")
+                else:
+                    st.info(f"의미 있는 차이가 없습니다 · {diff_text}")
+                efficiency_text = (f" · 따로 추정할 때보다 분산 {comparison['efficiency']:.1f}배 감소"
+                                   if comparison["efficiency"] else "")
+                st.caption(f"{comparison['trials']:,}회 비교 (전투 {comparison['battles']:,}회){efficiency_text}")
     
     # 전투 시작 버튼
     st.markdown("---")
@@ -5284,183 +3962,23 @@ def page_battle():
         # 전투 진행 플래그 설정
         st.session_state.battle_in_progress = True
         
-        # 전투 진행 상태 표시
-        st.markdown("### ⚔️ 전투 진행 중...")
-        
-        # 화면 영역 분리
-        gauge_area = st.empty()
-        status_area = st.empty()
-        log_area = st.empty()
-        
-        # 전투 실행 (실시간 업데이트)
+        # 전투 전체를 먼저 계산 (시드는 리플레이 기록용으로 Battle이 생성)
+        # 게이지/HP/로그 애니메이션은 타임라인을 받아 브라우저에서 재생
+        # 긴 전투는 프레임 예산(TIMELINE_MAX_FRAMES) 안으로 틱을 묶어 전송
         battle = Battle(player_instance, enemy)
-        
-        # 턴별 실행
-        turn_count = 0
-        max_turns = 50
-        action_threshold = battle.action_threshold  # Battle 클래스의 고정 임계값 사용
-        
-        # 이전 HP 추적 (데미지 시각화용)
-        prev_player_hp = battle.player.current_hp
-        prev_enemy_hp = battle.enemy.current_hp
-        
-        while battle.turn < max_turns:
-            # 승패 체크
-            if battle.player.current_hp <= 0 or battle.enemy.current_hp <= 0:
-                break
-            
-            # 한 틱 실행 (행동 발생 시 True 반환)
-            action_occurred = battle.execute_turn()
-            
-            # 행동 발생 시 승패 체크
-            if action_occurred and battle.check_victory():
-                break
-            
-            # === ATB 게이지 시각화 ===
-            # 게이지를 0-100% 범위로 정규화 (임계값을 100%로)
-            player_gauge_percent = min(100, (battle.player.speed_gauge / action_threshold) * 100)
-            enemy_gauge_percent = min(100, (battle.enemy.speed_gauge / action_threshold) * 100)
-            
-            # 행동 중인지 체크 (게이지가 100% 도달)
-            player_ready = player_gauge_percent >= 100
-            enemy_ready = enemy_gauge_percent >= 100
-            
-            # 게이지 색상 (고정)
-            player_gauge_color = "#0066ff"
-            enemy_gauge_color = "#ff0000"
-            
-            player_text = "⚡ 행동!" if player_ready else "게이지"
-            enemy_text = "⚡ 행동!" if enemy_ready else "게이지"
-            
-            gauge_area.markdown(f"""
-            <div style="display: flex; align-items: center; gap: 10px; margin: 20px 0;">
-                <div style="flex: 1; text-align: right;">
-                    <div style="margin-bottom: 5px; font-weight: bold;">🔵 플레이어 {player_text}</div>
-                    <div style="background: rgba(0,0,0,0.1); height: 30px; border-radius: 5px; overflow: hidden;">
-                        <div style="background: {player_gauge_color}; height: 100%; width: {player_gauge_percent}%; transition: width 0.1s; float: left;"></div>
-                    </div>
-                </div>
-                <div style="font-size: 24px; font-weight: bold; padding: 0 10px;">⚔️</div>
-                <div style="flex: 1; text-align: left;">
-                    <div style="margin-bottom: 5px; font-weight: bold;">🔴 적군 {enemy_text}</div>
-                    <div style="background: rgba(0,0,0,0.1); height: 30px; border-radius: 5px; overflow: hidden;">
-                        <div style="background: {enemy_gauge_color}; height: 100%; width: {enemy_gauge_percent}%; transition: width 0.1s; float: right;"></div>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # === HP 상태 업데이트 (데미지/회복 시각화) ===
-            player_hp_percent = (battle.player.current_hp / battle.player.max_hp) * 100
-            enemy_hp_percent = (battle.enemy.current_hp / battle.enemy.max_hp) * 100
-            
-            # 이전 HP 비율
-            prev_player_hp_percent = (prev_player_hp / battle.player.max_hp) * 100
-            prev_enemy_hp_percent = (prev_enemy_hp / battle.enemy.max_hp) * 100
-            
-            # HTML 직접 생성
-            html_parts = ['<div style="display: flex; gap: 20px; margin: 10px 0;">']
-            
-            # 플레이어 HP + 쉴드
-            html_parts.append('<div style="flex: 1;">')
-            shield_text_player = f' + 🛡️{battle.player.shield}' if battle.player.shield > 0 else ''
-            html_parts.append(f'<div style="font-weight: bold; margin-bottom: 5px;">🔵 플레이어 HP: {battle.player.current_hp}/{battle.player.max_hp}{shield_text_player}</div>')
-            html_parts.append('<div style="background: rgba(0,0,0,0.1); height: 25px; border-radius: 5px; overflow: hidden; position: relative;">')
-            
-            if prev_player_hp > battle.player.current_hp:  # 데미지
-                # 빨강이 이전 HP 위치에서 천천히 줄어듬
-                html_parts.append(f'<div style="background: #ff3333; height: 100%; width: {prev_player_hp_percent}%; transition: width 0.8s; position: absolute;"></div>')
-                html_parts.append(f'<div style="background: #00cc00; height: 100%; width: {player_hp_percent}%; transition: width 0.3s; position: absolute;"></div>')
-            elif prev_player_hp < battle.player.current_hp:  # 회복
-                # 하늘색이 현재 HP까지, 녹색이 천천히 따라감
-                html_parts.append(f'<div style="background: #33ccff; height: 100%; width: {player_hp_percent}%; transition: width 0.3s; position: absolute;"></div>')
-                html_parts.append(f'<div style="background: #00cc00; height: 100%; width: {prev_player_hp_percent}%; transition: width 0.8s; position: absolute;"></div>')
-            else:
-                # 변화 없음
-                html_parts.append(f'<div style="background: #00cc00; height: 100%; width: {player_hp_percent}%; transition: width 0.3s; position: absolute;"></div>')
-            
-            # 쉴드 바 추가 (HP 바 위에 노란색으로 표시)
-            if battle.player.shield > 0:
-                shield_percent = min(100, (battle.player.shield / battle.player.max_hp) * 100)
-                html_parts.append(f'<div style="background: rgba(255, 215, 0, 0.7); height: 100%; width: {shield_percent}%; transition: width 0.3s; position: absolute; left: {player_hp_percent}%;"></div>')
-            
-            html_parts.append('</div></div>')
-            
-            # 적군 HP + 쉴드
-            html_parts.append('<div style="flex: 1;">')
-            shield_text_enemy = f' + 🛡️{battle.enemy.shield}' if battle.enemy.shield > 0 else ''
-            html_parts.append(f'<div style="font-weight: bold; margin-bottom: 5px;">🔴 적군 HP: {battle.enemy.current_hp}/{battle.enemy.max_hp}{shield_text_enemy}</div>')
-            html_parts.append('<div style="background: rgba(0,0,0,0.1); height: 25px; border-radius: 5px; overflow: hidden; position: relative;">')
-            
-            if prev_enemy_hp > battle.enemy.current_hp:  # 데미지
-                html_parts.append(f'<div style="background: #ff3333; height: 100%; width: {prev_enemy_hp_percent}%; transition: width 0.8s; position: absolute;"></div>')
-                html_parts.append(f'<div style="background: #00cc00; height: 100%; width: {enemy_hp_percent}%; transition: width 0.3s; position: absolute;"></div>')
-            elif prev_enemy_hp < battle.enemy.current_hp:  # 회복
-                html_parts.append(f'<div style="background: #33ccff; height: 100%; width: {enemy_hp_percent}%; transition: width 0.3s; position: absolute;"></div>')
-                html_parts.append(f'<div style="background: #00cc00; height: 100%; width: {prev_enemy_hp_percent}%; transition: width 0.8s; position: absolute;"></div>')
-            else:
-                html_parts.append(f'<div style="background: #00cc00; height: 100%; width: {enemy_hp_percent}%; transition: width 0.3s; position: absolute;"></div>')
-            
-            # 쉴드 바 추가 (HP 바 위에 노란색으로 표시)
-            if battle.enemy.shield > 0:
-                shield_percent = min(100, (battle.enemy.shield / battle.enemy.max_hp) * 100)
-                html_parts.append(f'<div style="background: rgba(255, 215, 0, 0.7); height: 100%; width: {shield_percent}%; transition: width 0.3s; position: absolute; left: {enemy_hp_percent}%;"></div>')
-            
-            html_parts.append('</div></div>')
-            
-            html_parts.append('</div>')
-            
-            status_area.markdown(''.join(html_parts), unsafe_allow_html=True)
-            
-            # HP 변경 시 이전 값 업데이트
-            if action_occurred:
-                prev_player_hp = battle.player.current_hp
-                prev_enemy_hp = battle.enemy.current_hp
-            
-            # 로그 업데이트 (스크롤 자동으로 아래로)
-            log_text = "\n".join(battle.log[-15:])  # 최근 15줄만 표시
-            log_area.markdown(f"""
-            <div style="
-                height: 250px; 
-                overflow-y: auto; 
-                padding: 10px; 
-                border: 1px solid rgba(128, 128, 128, 0.3); 
-                border-radius: 5px;
-                background-color: rgba(0, 0, 0, 0.05);
-                font-family: monospace;
-                white-space: pre-wrap;
-                font-size: 0.9em;
-            " id="battle-log-{turn_count}">
-{log_text}
-            </div>
-            <script>
-                var logDiv = document.getElementById('battle-log-{battle.turn}');
-                if (logDiv) {{
-                    logDiv.scrollTop = logDiv.scrollHeight;
-                }}
-            </script>
-            """, unsafe_allow_html=True)
-            
-            # 0.1초 대기 (부드러운 애니메이션)
-            time.sleep(0.1)
-            
-            # 행동 발생 시 0.3초 추가 대기 (게이지 리셋 상태 보여주기)
-            if action_occurred:
-                time.sleep(0.3)
-        
-        # 최종 승패 판정 (턴 초과 시)
-        if not battle.check_victory():
-            # 타임아웃이 아직 체크되지 않았다면
-            battle.check_victory()
+        timeline = coalesce_timeline(battle.run_timeline())
+        st.session_state.battle_animation = {
+            "frames": timeline,
+            "log": render_events(battle.events)
+        }
         
         winner = battle.winner
         
-        # 결과 저장
+        # 결과 저장 (로그는 리플레이 기록으로 필요할 때 재현)
         st.session_state.battle_result = {
             "winner": winner,
-            "log": battle.log,
-            "player": player_instance,
-            "enemy": enemy,
+            "replay": make_replay(player_instance, current_stage, battle.seed, result=battle.get_summary()),
+            "enemy_max_hp": enemy["stats"]["hp"],
             "player_final_hp": battle.player.current_hp,
             "enemy_final_hp": battle.enemy.current_hp,
             "stage": current_stage,
@@ -5475,8 +3993,7 @@ def page_battle():
             st.session_state.current_stage = current_stage + 1
             
             # 보상 개체 생성
-            boss_power = calculate_power_score(enemy["stats"])
-            reward_instance = generate_battle_reward(boss_power, current_stage)
+            reward_instance = generate_battle_reward(current_stage)
             st.session_state.battle_reward = reward_instance
             
             save_game_data()
@@ -5554,7 +4071,7 @@ def page_battle():
         with col1:
             st.markdown("**🔵 플레이어**")
             player_final_hp = result["player_final_hp"]
-            player_max_hp = result["player"]["stats"]["hp"]
+            player_max_hp = result["replay"]["player"]["stats"]["hp"]
             hp_percent = (player_final_hp / player_max_hp) * 100 if player_max_hp > 0 else 0
             hp_percent = max(0, min(100, hp_percent))  # 0~100 범위로 제한
             
@@ -5564,7 +4081,7 @@ def page_battle():
         with col2:
             st.markdown("**🔴 적군**")
             enemy_final_hp = result["enemy_final_hp"]
-            enemy_max_hp = result["enemy"]["stats"]["hp"]
+            enemy_max_hp = result["enemy_max_hp"]
             hp_percent = (enemy_final_hp / enemy_max_hp) * 100 if enemy_max_hp > 0 else 0
             hp_percent = max(0, min(100, hp_percent))  # 0~100 범위로 제한
             
@@ -5573,8 +4090,7 @@ def page_battle():
         
         # 전투 로그
         st.markdown("### 📜 전투 로그")
-        log_text = "\n".join(result["log"])
-        st.text_area("로그", value=log_text, height=400, disabled=True)
+        show_battle_replay(result["replay"])
         
         # 다시 전투 버튼
         if st.button("🔄 다시 전투", use_container_width=True):
@@ -7072,6 +5588,65 @@ def page_dev():
     
     st.markdown("---")
     
+    # 전투 프로파일링 (단계/효과별 호출 횟수와 누적 시간)
+    st.markdown("### ⏱️ 전투 프로파일링")
+    st.caption("선택한 개체로 스테이지 보스와 헤드리스 전투를 반복해 어떤 단계/스킬 효과가 시간을 쓰는지 측정합니다.")
+    if st.session_state.instances:
+        profile_instances = st.session_state.instances
+        profile_labels = [f"{inst['name']} (전투력: {format_korean_number(calculate_power_score(inst['stats']))})"
+                          for inst in profile_instances]
+        col_p1, col_p2, col_p3 = st.columns([2, 1, 1])
+        with col_p1:
+            profile_index = st.selectbox("개체", range(len(profile_instances)),
+                                         format_func=lambda i: profile_labels[i], key="profile_instance")
+        with col_p2:
+            profile_stage = st.number_input("스테이지", min_value=1, value=st.session_state.get("current_stage", 1),
+                                            key="profile_stage")
+        with col_p3:
+            profile_battles_count = st.number_input("전투 횟수", min_value=1, max_value=5000, value=200,
+                                                    key="profile_battles")
+        
+        if st.button("⏱️ 프로파일링 실행", use_container_width=True):
+            with st.spinner("전투 프로파일링 중..."):
+                st.session_state.battle_profile_result = profile_battles(
+                    profile_instances[profile_index], generate_stage_enemy(int(profile_stage)),
+                    n_battles=int(profile_battles_count), seed=0
+                )
+        
+        profile = st.session_state.get("battle_profile_result")
+        if profile:
+            st.caption(f"{profile['battles']}회 전투 · 승리 {profile['wins']}회 · 총 {profile['turns']:,}턴 · "
+                       f"{profile['total_time']*1000:.1f}ms "
+                       f"(전투당 {profile['total_time']/profile['battles']*1e6:.0f}µs)")
+            col_p1, col_p2 = st.columns(2)
+            for col, key, label in ((col_p1, "phases", "**단계별**"), (col_p2, "effects", "**효과 핸들러별**")):
+                with col:
+                    st.markdown(label)
+                    rows = [{"이름": name, "호출": entry["calls"], "누적(ms)": round(entry["time"] * 1000, 2),
+                             "호출당(µs)": round(entry["time"] / entry["calls"] * 1e6, 2)}
+                            for name, entry in profile[key].items()]
+                    if rows:
+                        st.dataframe(rows, use_container_width=True, hide_index=True)
+                    else:
+                        st.caption("기록 없음")
+    else:
+        st.caption("프로파일링할 개체가 없습니다.")
+    
+    # 전투 결과 캐시 (클리어 확률/최대 스테이지 계산 결과 공유)
+    cache_stats = get_battle_result_cache().stats()
+    col_c1, col_c2 = st.columns([3, 1])
+    with col_c1:
+        st.caption(f"🗃️ 전투 결과 캐시: {cache_stats['entries']}/{cache_stats['max_entries']}개 · "
+                   f"디스크 {cache_stats['disk_entries'] or 0}/{cache_stats['max_disk_entries']}개 · "
+                   f"메모리 적중 {cache_stats['hits']} · 디스크 적중 {cache_stats['disk_hits']} · "
+                   f"미스 {cache_stats['misses']}")
+    with col_c2:
+        if st.button("🧹 캐시 비우기", use_container_width=True, key="clear_battle_cache"):
+            get_battle_result_cache().clear(disk=True)
+            st.rerun()
+    
+    st.markdown("---")
+
     # 개체 수 제한 체크
     max_instances = st.session_state.get("max_instances", 200)
     if len(st.session_state.instances) >= max_instances:
@@ -599,6 +599,45 @@ def delete_mail(mail_id: str) -> bool:
         return False
 
 
+# ============================================================================
+# PvP 래더 (오프라인 시뮬레이션 결과)
+# ============================================================================
+
+def save_pvp_ladder(rows: List[Dict]) -> bool:
+    """PvP 래더 결과 저장 (기존 결과를 통째로 교체)
+
+    username 기준 upsert 후 이번 결과에 없는 유저만 삭제하므로
+    중간에 실패해도 래더가 비는 순간이 없다 (최악의 경우 이전 결과가 일부 남음).
+    """
+    try:
+        client = get_supabase_client()
+        if rows:
+            # updated_at 기본값은 INSERT 때만 채워지므로 upsert로 갱신되는 행도 직접 지정
+            updated_at = datetime.now().isoformat()
+            rows = [{**row, "updated_at": updated_at} for row in rows]
+            client.table("pvp_ladder").upsert(rows, on_conflict="username").execute()
+            usernames = [row["username"] for row in rows]
+            client.table("pvp_ladder").delete().not_.in_("username", usernames).execute()
+        else:
+            client.table("pvp_ladder").delete().neq("username", "").execute()
+        print(f"✅ PvP 래더 저장: {len(rows)}명")
+        return True
+    except Exception as e:
+        print(f"❌ PvP 래더 저장 실패: {e}")
+        return False
+
+
+def load_pvp_ladder() -> List[Dict]:
+    """PvP 래더 결과 로드 (레이팅 내림차순)"""
+    try:
+        client = get_supabase_client()
+        response = client.table("pvp_ladder").select("*").order("rating", desc=True).execute()
+        return response.data
+    except Exception as e:
+        print(f"❌ PvP 래더 로드 실패: {e}")
+        return []
+
+
 # ============================================================================
 # 초기화 함수
 # ============================================================================